@@ -1,15 +1,40 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 
 from .routers import display
+from .services import display_plans, feed_registry, prerender, push, readiness, station_index
+from .utils import metrics, tracing
 
 
 app = FastAPI(title="ESP32 MTA Display Backend")
+app.add_middleware(tracing.TracingMiddleware)
+app.add_middleware(metrics.InFlightMiddleware)
 
 
 @app.on_event("startup")
 async def startup_event() -> None:
     # Minimal startup hook so we know the app booted.
     print("[esp32-mta-display] FastAPI backend starting up...")
+    feed_registry.get_registry()
+    station_index.get_index()
+    invalid = display_plans.compile_all()
+    if invalid:
+        print(f"[esp32-mta-display] {len(invalid)} display config(s) failed validation: {sorted(invalid)}")
+    app.state.prerender_task = asyncio.create_task(prerender.run_prerender_loop())
+    app.state.push_task = asyncio.create_task(push.run_push_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    for name in ("prerender_task", "push_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
 
 
 @app.get("/health", tags=["health"])
@@ -17,4 +42,20 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/health/ready", tags=["health"])
+async def ready() -> JSONResponse:
+    """Per-feed freshness and circuit state; 503 once every known feed is failing."""
+
+    report = readiness.readiness_report()
+    status_code = 503 if report["status"] == "unavailable" else 200
+    return JSONResponse(report, status_code=status_code)
+
+
+@app.get("/metrics", tags=["health"], response_class=Response)
+async def get_metrics() -> Response:
+    """Prometheus scrape endpoint (feed, parse, render and response metrics)."""
+
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 app.include_router(display.router, prefix="/display", tags=["display"])
@@ -1,110 +1,341 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import List
+import re
+import uuid
+from typing import AsyncIterator, Callable, Dict, List, Set, Tuple
 
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from esp32_mta_display.models.arrivals import Arrival
-from esp32_mta_display.services import config_loader, feed_selector, mta, path, renderer
+from esp32_mta_display.services import admission, display_pipeline, display_plans, push, render_cache
+from esp32_mta_display.utils import fast_json, metrics, tracing
+from esp32_mta_display.utils.time import utc_now
 
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_DISPLAYS = 32
+# Kept under the usual 60 s proxy idle timeout.
+MAX_WAIT_SECONDS = 55.0
+# Batch ids end up in part headers, so keep them to file-name characters.
+_DISPLAY_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+# (display_id, kind, minute bucket) -> build shared by concurrent requests
+_IN_FLIGHT: Dict[Tuple[str, str, int], "asyncio.Task[memoryview]"] = {}
+BUILDS_IN_FLIGHT = metrics.Gauge(
+    "display_builds_in_flight", "Display builds shared by waiting requests.", collect=lambda: [((), len(_IN_FLIGHT))]
+)
+
+
+@router.get("/batch", response_class=Response)
+async def get_display_batch(
+    ids: List[str] = Query(default=[]),
+    format: str = Query(default="json"),
+) -> Response:
+    """Return several displays in one response, fetching each shared feed once.
+
+    ``format=json`` (default) answers ``{"displays": {id: payload}}`` with
+    the same payloads as ``/{display_id}/arrivals``; ``format=bmp`` answers
+    ``multipart/mixed`` with one ``image/bmp`` part per display, named by
+    its ``Content-ID``. A display that cannot be built is reported in place
+    (``{"error": ...}``) without failing the others.
+    """
+
+    display_ids = list(dict.fromkeys(display_id for display_id in ids if display_id))
+    if any(not _DISPLAY_ID.match(display_id) for display_id in display_ids):
+        raise HTTPException(status_code=400, detail={"error": "invalid display id"})
+    if not display_ids:
+        raise HTTPException(status_code=400, detail={"error": "no display ids"})
+    if len(display_ids) > MAX_BATCH_DISPLAYS:
+        raise HTTPException(
+            status_code=400, detail={"error": "too many display ids", "limit": MAX_BATCH_DISPLAYS}
+        )
+    if format not in ("json", "bmp"):
+        raise HTTPException(status_code=400, detail={"error": "unsupported format", "format": format})
+
+    plans = []
+    errors: Dict[str, dict] = {}
+    for display_id in display_ids:
+        try:
+            plans.append(_get_plan_or_error(display_id))
+        except HTTPException as exc:
+            errors[display_id] = exc.detail
+    if format == "bmp":
+        for plan in plans:
+            render_cache.mark_requested(plan.display_id)
+    results = await _build_batch(plans, format)
+
+    parts: Dict[str, bytes | memoryview] = {}
+    failed: Set[str] = set()
+    for display_id in display_ids:
+        result = results.get(display_id)
+        if isinstance(result, memoryview):
+            parts[display_id] = result
+        else:
+            detail = errors.get(display_id) or {"error": "render failed", "reason": str(result)}
+            parts[display_id] = fast_json.dumps(detail)
+            failed.add(display_id)
+
+    if format == "json":
+        body = _join_json_payloads(parts)
+        metrics.RESPONSE_BYTES.observe(len(body), "batch", "json")
+        return Response(content=body, media_type="application/json")
+    boundary = uuid.uuid4().hex
+    body = _join_multipart(parts, boundary, failed)
+    metrics.RESPONSE_BYTES.observe(len(body), "batch", "bmp")
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}")
+
 
 @router.get("/{display_id}.bmp", response_class=Response)
-async def get_display_bitmap(display_id: str) -> Response:
+async def get_display_bitmap(
+    display_id: str,
+    wait: float = Query(default=0.0, ge=0.0),
+    since: str | None = None,
+) -> Response:
     """Return a BMP image for the given display id.
 
     Implementation for this milestone:
-    - Load display config (station, lines, layout) from YAML.
-    - Render a simple test BMP using Pillow.
+    - Look up the compiled plan (stations, feeds, layout) for the display.
+    - Reuse cached feeds and frames; render with Pillow on a miss.
+
+    Every frame carries an ``ETag``. Long-polling clients pass it back as
+    ``since`` with ``wait`` seconds (capped at ``MAX_WAIT_SECONDS``): the
+    request is held until the frame changes, or answered ``304`` when the
+    wait runs out with nothing new.
     """
 
-    try:
-        display_config = config_loader.load_display_config(display_id)
-    except FileNotFoundError:
-        # Unknown display id -> 404 with JSON error body.
-        raise HTTPException(status_code=404, detail={"error": "unknown display id"})
+    plan = _get_plan_or_error(display_id)
+    render_cache.mark_requested(display_id)
+    # The frame is a view over the cached buffer; Response sends it as-is.
+    frame = await _build_shared(plan, "bmp", display_pipeline.build_display_frame)
+    etag = _frame_etag(frame)
+    known = _parse_etag(since) if since else None
+    if known == etag and wait > 0:
+        frame, etag = await _wait_for_new_frame(plan, known, min(wait, MAX_WAIT_SECONDS))
+    headers = {"ETag": f'"{etag}"'}
+    if known == etag:
+        return Response(status_code=304, headers=headers)
+    metrics.RESPONSE_BYTES.observe(len(frame), display_id, "bmp")
+    return Response(content=frame, media_type="image/bmp", headers=headers)
+
+
+@router.get("/{display_id}/arrivals", response_class=Response)
+async def get_display_arrivals(display_id: str) -> Response:
+    """Return the display's rows as compact JSON for clients that render locally.
+
+    Rows are sorted and truncated exactly like the bitmap:
+    ``{"display_id", "generated_at", "rows": [{"line", "destination", "minutes", "epoch"}]}``.
+    """
+
+    plan = _get_plan_or_error(display_id)
+    payload = await _build_shared(plan, "json", display_pipeline.build_arrivals_payload)
+    metrics.RESPONSE_BYTES.observe(len(payload), display_id, "json")
+    return Response(content=payload, media_type="application/json")
 
-    arrivals: List[Arrival] = []
 
-    mta_config = _get_agency_config(
-        display_config,
-        section_key="mta",
-        fallback={
-            "station_id": display_config.get("station_id"),
-            "lines": display_config.get("lines", []),
-        },
+@router.get("/{display_id}/events")
+async def stream_display_arrivals(display_id: str) -> StreamingResponse:
+    """Stream the display's rows as Server-Sent Events.
+
+    The current rows arrive immediately as an ``arrivals`` event (same
+    JSON as ``/{display_id}/arrivals``); further events are sent only when
+    the visible rows change. Idle connections get a comment every
+    ``push.KEEPALIVE_SECONDS``.
+    """
+
+    plan = _get_plan_or_error(display_id)
+    try:
+        subscription = await push.open_subscription(plan)
+    except admission.Overloaded as exc:
+        raise _overloaded_error(display_id, "sse", exc)
+    return StreamingResponse(
+        _sse_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    if mta_config:
-        arrivals.extend(_collect_arrivals(display_id, "mta", mta_config))
 
-    path_config = _get_agency_config(display_config, section_key="path")
-    if path_config:
-        arrivals.extend(_collect_arrivals(display_id, "path", path_config))
 
-    arrivals.sort(key=lambda a: a.arrival_time)
+async def _sse_events(subscription: push.Subscription) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            payload = await subscription.get(timeout=push.KEEPALIVE_SECONDS)
+            if payload is None:
+                yield b": keepalive\n\n"
+            else:
+                metrics.RESPONSE_BYTES.observe(len(payload), subscription.display_id, "sse")
+                yield b"event: arrivals\ndata: " + payload + b"\n\n"
+    finally:
+        push.close_subscription(subscription)
+
+
+async def _build_shared(
+    plan: display_plans.DisplayPlan,
+    kind: str,
+    build: Callable[[display_plans.DisplayPlan], memoryview],
+) -> memoryview:
+    """Run ``build(plan)`` off the event loop, once per display, kind and minute.
+
+    Requests arriving while a build is running await that build and get the
+    very same buffer, instead of each missing the render cache and doing the
+    config, fetch, parse and render work again.
+
+    New builds must get an ``admission.RENDERS`` slot; when none is free (or
+    the fetch stage is saturated) the request is shed: it gets the newest
+    cached frame, possibly from an earlier minute, or a 503 with
+    ``Retry-After``.
+    """
+
+    key = (plan.display_id, kind, render_cache.minute_bucket(utc_now()))
+    task = _IN_FLIGHT.get(key)
+    try:
+        if task is None:
+            if not admission.RENDERS.try_acquire():
+                raise admission.Overloaded("render")
+            # The task inherits this request's trace, so its stages show up here.
+            task = asyncio.ensure_future(asyncio.to_thread(build, plan))
+            _IN_FLIGHT[key] = task
+            task.add_done_callback(lambda _: _finish_build(key))
+            # Shielded so one client disconnecting does not cancel the others' build.
+            return await asyncio.shield(task)
+        with tracing.span("coalesced"):
+            return await asyncio.shield(task)
+    except admission.Overloaded as exc:
+        return _shed(plan.display_id, kind, exc)
+
+
+async def _build_batch(
+    plans: List[display_plans.DisplayPlan], kind: str
+) -> display_pipeline.BatchResult:
+    """Run a batch off the event loop under one ``admission.RENDERS`` slot.
 
-    bmp_bytes = renderer.render_display_bitmap(display_id, display_config, arrivals=arrivals)
-    return Response(content=bmp_bytes, media_type="image/bmp")
+    A saturated render or fetch stage sheds the batch like a single display:
+    every display gets its newest cached frame, or the request a 503.
+    """
 
+    if not plans:
+        return {}
+    try:
+        if not admission.RENDERS.try_acquire():
+            raise admission.Overloaded("render")
+        return await asyncio.to_thread(_run_batch, plans, kind)
+    except admission.Overloaded as exc:
+        return {plan.display_id: _shed(plan.display_id, kind, exc) for plan in plans}
 
-def _get_agency_config(
-    display_config: dict,
-    section_key: str,
-    fallback: dict | None = None,
-) -> dict | None:
-    section = (display_config.get(section_key) or {}).copy()
-    station_id = section.get("station_id")
-    lines = section.get("lines")
 
-    if not station_id and fallback:
-        station_id = fallback.get("station_id")
-    if not lines and fallback:
-        lines = fallback.get("lines")
+def _run_batch(plans: List[display_plans.DisplayPlan], kind: str) -> display_pipeline.BatchResult:
+    # Released here rather than by the awaiting request, so a client that
+    # disconnects cannot free the slot while the batch is still running.
+    try:
+        return display_pipeline.build_batch(plans, kind=kind)
+    finally:
+        admission.RENDERS.release()
 
-    if station_id and lines:
-        return {"station_id": station_id, "lines": lines}
-    return None
 
+def _finish_build(key: Tuple[str, str, int]) -> None:
+    _IN_FLIGHT.pop(key, None)
+    admission.RENDERS.release()
 
-def _collect_arrivals(display_id: str, agency: str, config: dict) -> List[Arrival]:
-    station_id = config.get("station_id")
-    lines = config.get("lines") or []
-    if not station_id or not lines:
-        return []
 
-    feed_url = _resolve_feed_url(agency, lines)
-    if not feed_url:
-        logger.warning("No feed URL found for %s routes: %s", agency.upper(), lines)
-        return []
+def _shed(display_id: str, kind: str, exc: admission.Overloaded) -> memoryview:
+    with tracing.span("shed"):
+        stale = render_cache.latest(display_id, kind)
+    if stale is not None:
+        return stale
+    raise _overloaded_error(display_id, kind, exc)
+
+
+def _overloaded_error(display_id: str, kind: str, exc: admission.Overloaded) -> HTTPException:
+    logger.warning("Shedding %s request for %s: %s", kind, display_id, exc)
+    return HTTPException(
+        status_code=503,
+        detail={"error": "overloaded", "stage": exc.stage},
+        headers={"Retry-After": str(admission.RETRY_AFTER_SECONDS)},
+    )
 
-    arrivals: List[Arrival] = []
-    fetch_fn, parse_fn = _get_agency_handlers(agency)
 
+async def _wait_for_new_frame(plan: display_plans.DisplayPlan, since: str, wait: float) -> tuple[memoryview, str]:
+    # The push stream wakes us only when the display's rows change, so an
+    # idle display costs one request per ``wait`` instead of per refresh.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
     try:
-        raw_feed = fetch_fn(feed_url)
-        arrivals.extend(
-            parse_fn(
-                raw_feed,
-                station_id=station_id,
-                allowed_routes=lines,
-            )
-        )
-    except Exception as exc:  # pragma: no cover - logging fallback
-        logger.warning("Failed to load %s feed %s for %s: %s", agency.upper(), feed_url, display_id, exc)
-    return arrivals
+        subscription = await push.open_subscription(plan)
+    except admission.Overloaded:
+        # Too busy to watch for changes; answer with the current frame now.
+        frame = await _build_shared(plan, "bmp", display_pipeline.build_display_frame)
+        return frame, _frame_etag(frame)
+    try:
+        # The first payload is the current rows, which ``since`` already shows.
+        await subscription.get(timeout=0)
+        frame, etag = None, since
+        while etag == since:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or await subscription.get(timeout=remaining) is None:
+                break
+            frame = await _build_shared(plan, "bmp", display_pipeline.build_display_frame)
+            etag = _frame_etag(frame)
+    finally:
+        push.close_subscription(subscription)
+    if frame is None:
+        frame = await _build_shared(plan, "bmp", display_pipeline.build_display_frame)
+        etag = _frame_etag(frame)
+    return frame, etag
+
+
+def _frame_etag(frame: memoryview) -> str:
+    return hashlib.blake2b(frame, digest_size=8).hexdigest()
 
 
-def _get_agency_handlers(agency: str):
-    if agency == "path":
-        return path.fetch_path_feed, path.parse_path_feed
-    return mta.fetch_mta_feed, mta.parse_mta_feed
+def _parse_etag(value: str) -> str:
+    value = value.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    return value.strip('"')
 
 
-def _resolve_feed_url(agency: str, lines: list[str]) -> str | None:
-    if agency == "path":
-        return feed_selector.find_path_feed(lines)
-    return feed_selector.find_mta_feed(lines)
+def _join_json_payloads(parts: Dict[str, bytes | memoryview]) -> bytes:
+    # Payloads are already encoded (and cached); splice them in rather than
+    # decoding and re-encoding each one.
+    chunks = [b'{"displays":{']
+    for index, (display_id, payload) in enumerate(parts.items()):
+        if index:
+            chunks.append(b",")
+        chunks.append(fast_json.dumps(display_id))
+        chunks.append(b":")
+        chunks.append(payload)
+    chunks.append(b"}}")
+    return b"".join(chunks)
+
+
+def _join_multipart(parts: Dict[str, bytes | memoryview], boundary: str, failed: Set[str]) -> bytes:
+    chunks = []
+    for display_id, payload in parts.items():
+        media_type = "application/json" if display_id in failed else "image/bmp"
+        chunks.append(
+            (
+                f"--{boundary}\r\n"
+                f"Content-Type: {media_type}\r\n"
+                f"Content-ID: <{display_id}>\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+            ).encode("ascii")
+        )
+        chunks.append(payload)
+        chunks.append(b"\r\n")
+    chunks.append(f"--{boundary}--\r\n".encode("ascii"))
+    return b"".join(chunks)
+
+
+def _get_plan_or_error(display_id: str) -> display_plans.DisplayPlan:
+    try:
+        with tracing.span("config"):
+            return display_plans.get_plan(display_id)
+    except FileNotFoundError:
+        # Unknown display id -> 404 with JSON error body.
+        raise HTTPException(status_code=404, detail={"error": "unknown display id"})
+    except display_plans.DisplayConfigError as exc:
+        logger.error("Invalid display config %s: %s", display_id, exc)
+        raise HTTPException(status_code=500, detail={"error": "invalid display config", "reason": str(exc)})
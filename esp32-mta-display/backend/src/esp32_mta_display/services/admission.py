@@ -0,0 +1,78 @@
+"""Admission control for the render and fetch stages.
+
+Each stage has a ``Limiter`` that refuses work beyond its limit instead of
+queueing it. A refused render is answered from the newest cached frame
+(possibly from an earlier minute) or with a quick 503 and ``Retry-After``;
+a refused fetch falls back to the cached, possibly stale, snapshot. Under
+a refresh storm most requests are served something right away and the
+rest are told to come back, instead of all of them timing out together.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import List, Tuple
+
+from esp32_mta_display.utils import metrics
+
+MAX_CONCURRENT_RENDERS = 8
+MAX_CONCURRENT_FETCHES = 4
+# How long a fetch may wait for a slot before settling for a stale snapshot.
+FETCH_WAIT_SECONDS = 1.0
+RETRY_AFTER_SECONDS = 5
+
+REJECTED = metrics.Counter("admission_rejected", "Work refused at a stage's concurrency limit.", ("stage",))
+
+
+class Overloaded(RuntimeError):
+    """Raised when a stage is at its concurrency limit."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"{stage} stage is at its concurrency limit")
+        self.stage = stage
+
+
+class Limiter:
+    """Counting limiter whose callers give up rather than wait indefinitely."""
+
+    def __init__(self, stage: str, limit: int) -> None:
+        self.stage = stage
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self, timeout: float = 0.0) -> bool:
+        with self._condition:
+            if self.in_use >= self.limit and timeout > 0:
+                self._condition.wait_for(lambda: self.in_use < self.limit, timeout)
+            if self.in_use >= self.limit:
+                REJECTED.inc(self.stage)
+                return False
+            self.in_use += 1
+            return True
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+
+RENDERS = Limiter("render", MAX_CONCURRENT_RENDERS)
+FETCHES = Limiter("fetch", MAX_CONCURRENT_FETCHES)
+
+
+def configure(max_renders: int | None = None, max_fetches: int | None = None) -> None:
+    """Change the stage limits; work already admitted is unaffected."""
+
+    for limiter, limit in ((RENDERS, max_renders), (FETCHES, max_fetches)):
+        if limit is not None:
+            with limiter._condition:
+                limiter.limit = limit
+                limiter._condition.notify_all()
+
+
+def _in_use() -> List[Tuple[Tuple[str, ...], float]]:
+    return [((limiter.stage,), limiter.in_use) for limiter in (RENDERS, FETCHES)]
+
+
+IN_USE = metrics.Gauge("admission_in_use", "Admitted work per stage.", ("stage",), collect=_in_use)
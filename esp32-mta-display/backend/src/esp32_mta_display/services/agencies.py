@@ -0,0 +1,150 @@
+"""Registry of transit agencies and the hooks the feed pipeline calls.
+
+Every agency supplies how to find the feed for a set of lines, fetch it,
+parse it for a stop, and normalize line tokens. The realtime CLI path,
+display plans and the display pipeline all dispatch through ``get`` so a
+new agency (LIRR or NJT from local GTFS-RT files, say) picks up the shared
+feed cache, render cache and subscriptions just by calling ``register``.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from esp32_mta_display.models.arrivals import Arrival
+from esp32_mta_display.services import feed_registry, feed_selector, mta, path
+
+FetchFn = Callable[[str], bytes]
+DecodeFn = Callable[[bytes], Any]
+ParseFn = Callable[..., List[Arrival]]
+
+DEFAULT_AGENCY = "MTA"
+
+
+def fetch_feed_url(feed_url: str, *, timeout: float = 5.0) -> bytes:
+    """Fetch a GTFS-RT payload over HTTP, or read it from a ``file://`` URL."""
+
+    if feed_url.startswith("file://"):
+        with open(feed_url[len("file://") :], "rb") as handle:
+            return handle.read()
+
+    import httpx
+
+    with httpx.Client(timeout=timeout) as client:
+        response = client.get(feed_url)
+        response.raise_for_status()
+        return response.content
+
+
+def _normalize_line(line: str) -> str:
+    return line.strip().upper()
+
+
+def _claims_nothing(line: str) -> bool:
+    return False
+
+
+@dataclass(frozen=True)
+class Agency:
+    code: str
+    fetch: FetchFn = fetch_feed_url
+    # Turns fetched bytes into what ``parse`` consumes; the result is cached
+    # per snapshot so every stop on a feed shares one decode.
+    decode: DecodeFn = mta.decode_feed
+    # parse(decoded_or_raw_feed, station_id=..., allowed_routes=...) -> arrivals
+    parse: ParseFn = mta.parse_mta_feed
+    # Maps a requested line to the token feeds.csv indexes it under.
+    normalize_line: Callable[[str], str] = _normalize_line
+    # Maps a requested line to the ``Arrival.line`` the parser reports.
+    arrival_line: Callable[[str], str] = _normalize_line
+    # Extra rule for recognising this agency's lines beyond feeds.csv.
+    claims_line: Callable[[str], bool] = _claims_nothing
+    find_feed_hook: Callable[[List[str]], str | None] | None = None
+
+    @property
+    def section_key(self) -> str:
+        """Key of this agency's section in display YAML (``mta:``, ``path:`` ...)."""
+
+        return self.code.lower()
+
+    def normalize_lines(self, lines: Iterable[str]) -> List[str]:
+        return [self.normalize_line(line) for line in lines if line and line.strip()]
+
+    def find_feed(self, lines: Sequence[str]) -> str | None:
+        """Return the feed serving ``lines`` (the earliest feeds.csv row wins)."""
+
+        normalized = self.normalize_lines(lines)
+        if self.find_feed_hook is not None:
+            return self.find_feed_hook(normalized)
+        return feed_registry.get_registry().find_first(self.code, normalized)
+
+    def serves_line(self, line: str) -> bool:
+        token = self.normalize_line(line)
+        return self.claims_line(token) or feed_registry.get_registry().find_feed(self.code, token) is not None
+
+
+def _builtin_agencies() -> Tuple[Agency, ...]:
+    # Hooks look the service functions up at call time so patching
+    # ``mta.fetch_mta_feed`` and friends keeps working.
+    return (
+        Agency(
+            code="MTA",
+            fetch=lambda url: mta.fetch_mta_feed(url),
+            decode=lambda raw: mta.decode_feed(raw),
+            parse=lambda raw, **kwargs: mta.parse_mta_feed(raw, **kwargs),
+            find_feed_hook=lambda lines: feed_selector.find_mta_feed(lines),
+        ),
+        Agency(
+            code="PATH",
+            fetch=lambda url: path.fetch_path_feed(url),
+            decode=lambda raw: mta.decode_feed(raw),
+            parse=lambda raw, **kwargs: path.parse_path_feed(raw, **kwargs),
+            normalize_line=lambda line: line.strip().upper().replace("_", "-"),
+            arrival_line=lambda line: path._normalize_route_code(line),
+            # PATH lines are named after their terminals ("JSQ-33").
+            claims_line=lambda line: "-" in line,
+            find_feed_hook=lambda lines: feed_selector.find_path_feed(lines),
+        ),
+    )
+
+
+_AGENCIES: Dict[str, Agency] = {agency.code: agency for agency in _builtin_agencies()}
+_LOCK = threading.Lock()
+
+
+def register(agency: Agency) -> None:
+    """Add (or replace) an agency; its code becomes a valid ``type``/YAML section."""
+
+    code = agency.code.strip().upper()
+    with _LOCK:
+        _AGENCIES[code] = replace(agency, code=code)
+
+
+def unregister(code: str) -> None:
+    with _LOCK:
+        if code.strip().upper() != DEFAULT_AGENCY:
+            _AGENCIES.pop(code.strip().upper(), None)
+
+
+def get(code: str | None) -> Agency | None:
+    return _AGENCIES.get((code or "").strip().upper())
+
+
+def all_agencies() -> Tuple[Agency, ...]:
+    """Return registered agencies, built-ins first."""
+
+    return tuple(_AGENCIES.values())
+
+
+def infer_agency(lines: Iterable[str] | None) -> str | None:
+    """Guess the agency from line names; anything unrecognised is MTA."""
+
+    tokens = [line for line in (lines or []) if line and line.strip()]
+    if not tokens:
+        return None
+    for agency in all_agencies():
+        if agency.code != DEFAULT_AGENCY and any(agency.serves_line(token) for token in tokens):
+            return agency.code
+    return DEFAULT_AGENCY
@@ -3,38 +3,48 @@
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from importlib import resources
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
-import yaml
+from esp32_mta_display.services import config_bundle, station_index
+from esp32_mta_display.utils.trigram import TrigramIndex
 
 AliasMap = Dict[str, Dict[str, str]]
 
+# Dice similarity a fuzzy match needs before it is used without asking.
+FUZZY_MATCH_SCORE = 0.6
+# Candidates at least this similar are offered as suggestions in errors.
+FUZZY_SUGGEST_SCORE = 0.35
+
+
+@dataclass(frozen=True)
+class StationMatch:
+    name: str
+    type_code: str
+    station_id: str
+    score: float
+
+
 _ALIAS_CACHE: AliasMap | None = None
+_ALIAS_INDEX: AliasMap = {}
 _CANONICAL_NAMES: Dict[str, str] | None = None
 _CANONICAL_DEFAULTS: Dict[str, str] = {}
+# (station index it was built against, trigram index over alias and station names)
+_SEARCH_INDEX: Tuple[object, TrigramIndex] | None = None
 
 
 def load_aliases() -> AliasMap:
     """Return the alias map defined in config/aliases.yml (cached)."""
 
-    global _ALIAS_CACHE, _CANONICAL_NAMES, _CANONICAL_DEFAULTS
+    global _ALIAS_CACHE, _ALIAS_INDEX, _CANONICAL_NAMES, _CANONICAL_DEFAULTS, _SEARCH_INDEX
     if _ALIAS_CACHE is not None:
         return _ALIAS_CACHE
 
-    package = "esp32_mta_display.config"
-    filename = "aliases.yml"
-
-    try:
-        file_ref = resources.files(package).joinpath(filename)
-        stream = file_ref.open("r", encoding="utf-8")
-    except Exception:
-        base_dir = os.path.join(os.path.dirname(__file__), "..", "config")
-        fallback_path = os.path.abspath(os.path.join(base_dir, filename))
-        stream = open(fallback_path, "r", encoding="utf-8")
-
-    with stream as handle:
-        data = yaml.safe_load(handle) or {}
+    data = config_bundle.load_source("aliases.yml")
+    if data is None:
+        data = _read_aliases_file()
     aliases = data.get("aliases") or {}
     canonical_names = data.get("canonical_names") or {}
 
@@ -79,12 +89,39 @@ def load_aliases() -> AliasMap:
     for key, label in canonical_defaults.items():
         canonical_map.setdefault(key, label)
 
+    # One lookup key per alias: "Grove St", "grove-st" and "grove_st" all
+    # collapse to "grovest". The first alias listed wins on collisions.
+    alias_index: AliasMap = {}
+    for alias_key, type_map in normalized.items():
+        alias_index.setdefault(_normalize_alias_key(alias_key), type_map)
+
     _ALIAS_CACHE = normalized
+    _ALIAS_INDEX = alias_index
     _CANONICAL_NAMES = canonical_map
     _CANONICAL_DEFAULTS = canonical_defaults
+    _SEARCH_INDEX = None
+    _canonical_label.cache_clear()
     return _ALIAS_CACHE
 
 
+def _read_aliases_file() -> dict:
+    import yaml
+
+    package = "esp32_mta_display.config"
+    filename = "aliases.yml"
+
+    try:
+        file_ref = resources.files(package).joinpath(filename)
+        stream = file_ref.open("r", encoding="utf-8")
+    except Exception:
+        base_dir = os.path.join(os.path.dirname(__file__), "..", "config")
+        fallback_path = os.path.abspath(os.path.join(base_dir, filename))
+        stream = open(fallback_path, "r", encoding="utf-8")
+
+    with stream as handle:
+        return yaml.safe_load(handle) or {}
+
+
 def resolve_station(raw_name: str) -> Tuple[str, str]:
     """Resolve a user-provided alias like "grove" into (system, station_id)."""
 
@@ -101,22 +138,93 @@ def _resolve_station(raw_name: str, preferred_type: str | None) -> Tuple[str, st
     if not raw_name:
         raise ValueError("station alias is required")
 
-    alias_map = load_aliases()
-    candidates = _candidate_keys(raw_name)
-    preferred_key = (preferred_type or "").strip().upper() or None
-
-    for candidate in candidates:
-        type_map = alias_map.get(candidate)
-        if not type_map:
-            continue
+    load_aliases()
+    type_map = _ALIAS_INDEX.get(_normalize_alias_key(raw_name))
+    if type_map:
+        preferred_key = (preferred_type or "").strip().upper() or None
         canonical = _select_canonical(type_map, preferred_key)
         if canonical:
-            system, station = _split_canonical_id(canonical)
-            return system, station
-
+            return _split_canonical_id(canonical)
+
+    # Fall back to the imported MTA stops when the name is unambiguous.
+    if (preferred_type or "MTA").strip().upper() == "MTA":
+        stop_id = station_index.get_index().resolve_stop(raw_name)
+        if stop_id:
+            return "MTA", stop_id
+
+    # Then to a typo-tolerant match, provided one candidate clearly wins.
+    matches = search_stations(raw_name, preferred_type, limit=3)
+    best = matches[0] if matches else None
+    if best and best.score >= FUZZY_MATCH_SCORE and (len(matches) == 1 or matches[1].score < best.score):
+        return best.type_code, best.station_id
+
+    suggestions = [match.name for match in matches if match.score >= FUZZY_SUGGEST_SCORE]
+    if suggestions:
+        raise ValueError(f"Unknown station alias: {raw_name} (did you mean {', '.join(suggestions)}?)")
     raise ValueError(f"Unknown station alias: {raw_name}")
 
 
+def search_stations(query: str, preferred_type: str | None = None, limit: int = 5) -> List[StationMatch]:
+    """Return up to ``limit`` stations whose names resemble ``query``, best first.
+
+    Covers every alias in aliases.yml plus the imported GTFS station names.
+    With ``preferred_type`` only stations of that agency are returned.
+    """
+
+    key = station_index.normalize_name(query)
+    if not key:
+        return []
+    type_key = (preferred_type or "").strip().upper() or None
+
+    matches: List[StationMatch] = []
+    seen = set()
+    # Several aliases usually share a station, so over-fetch before de-duplicating.
+    for score, _, (name, type_map) in _get_search_index().search(key, limit=limit * 8):
+        canonical = _select_canonical(type_map, type_key)
+        if not canonical:
+            continue
+        system, station_id = _split_canonical_id(canonical)
+        if (type_key and system != type_key) or (system, station_id) in seen:
+            continue
+        seen.add((system, station_id))
+        matches.append(StationMatch(name=name, type_code=system, station_id=station_id, score=score))
+        if len(matches) == limit:
+            break
+    return matches
+
+
+def _get_search_index() -> TrigramIndex:
+    global _SEARCH_INDEX
+    load_aliases()
+    stations = station_index.get_index()
+    cached = _SEARCH_INDEX
+    if cached is not None and cached[0] is stations:
+        return cached[1]
+
+    entries = []
+    named = set()
+    for alias_key, type_map in (_ALIAS_CACHE or {}).items():
+        key = station_index.normalize_name(alias_key)
+        entries.append((key, (_beautify_alias(alias_key), type_map)))
+        named.update((canonical.split(":", 1)[0], key) for canonical in type_map.values())
+    # Display names reach stations no alias covers ("Hoboken"); the first
+    # platform listed stands in for a name shared by both directions.
+    for canonical_key, label in (_CANONICAL_NAMES or {}).items():
+        system = canonical_key.split(":", 1)[0]
+        key = station_index.normalize_name(label)
+        if (system, key) not in named:
+            named.add((system, key))
+            entries.append((key, (label, {system: canonical_key})))
+    for stop_ids in stations.names.values():
+        for stop_id in stop_ids:
+            stop = stations.stops[stop_id]
+            platform = f"{stop_id}N" if f"{stop_id}N" in stations.stops else stop_id
+            entries.append((station_index.normalize_name(stop.name), (stop.name, {"MTA": f"MTA:{platform}"})))
+    index = TrigramIndex(entries)
+    _SEARCH_INDEX = (stations, index)
+    return index
+
+
 def _apply_type_entry(type_map: Dict[str, str], label: str | None, canonical: str | None) -> None:
     if canonical is None:
         return
@@ -137,6 +245,11 @@ def _select_canonical(type_map: Dict[str, str], preferred_type: str | None) -> s
 
 def canonical_to_human(type_code: str | None, station_id: str | None, fallback: str | None = None) -> str:
     load_aliases()
+    return _canonical_label(type_code, station_id, fallback)
+
+
+@lru_cache(maxsize=4096)
+def _canonical_label(type_code: str | None, station_id: str | None, fallback: str | None) -> str:
     canonical_key = _canonical_key(type_code, station_id)
 
     label = None
@@ -144,6 +257,9 @@ def canonical_to_human(type_code: str | None, station_id: str | None, fallback:
         label = _CANONICAL_NAMES.get(canonical_key)
     if not label and canonical_key:
         label = _CANONICAL_DEFAULTS.get(canonical_key)
+    if not label and canonical_key and canonical_key.startswith("MTA:"):
+        stop = station_index.get_index().get(canonical_key[4:])
+        label = stop.name if stop else None
     if not label:
         label = fallback or (canonical_key or None)
     if not label:
@@ -179,15 +295,11 @@ def _beautify_alias(alias_key: str) -> str:
     return " ".join(word.capitalize() for word in cleaned.split())
 
 
-def _candidate_keys(raw_name: str) -> list[str]:
-    cleaned = (raw_name or "").strip().lower()
-    variants = {cleaned}
-    variants.add(cleaned.replace(" ", "_"))
-    variants.add(cleaned.replace(" ", ""))
-    variants.add(cleaned.replace("-", "_"))
-    variants.add(cleaned.replace("-", ""))
-    variants.add(cleaned.replace("_", ""))
-    return list(variants)
+_ALIAS_KEY_TABLE = str.maketrans("", "", " -_")
+
+
+def _normalize_alias_key(raw_name: str) -> str:
+    return (raw_name or "").strip().lower().translate(_ALIAS_KEY_TABLE)
 
 
 def _split_canonical_id(value: str) -> Tuple[str, str]:
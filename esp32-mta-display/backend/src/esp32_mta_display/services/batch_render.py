@@ -0,0 +1,89 @@
+"""Render many display profiles in parallel across a process pool.
+
+Feeds are fetched once in the calling process and handed to each worker
+through the pool initializer, so workers only parse and render. Feeds that
+failed to fetch are handed over too, with their circuits opened, so the
+workers skip them instead of all refetching a struggling feed at once.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import repeat
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from esp32_mta_display.services import config_loader, display_pipeline, display_plans, feed_cache
+
+
+@dataclass
+class BatchResult:
+    display_id: str
+    frame: bytes | None
+    elapsed: float
+    error: str | None = None
+
+
+def render_displays(
+    display_ids: Iterable[str] | None = None,
+    workers: int | None = None,
+    now: datetime | None = None,
+) -> List[BatchResult]:
+    """Render ``display_ids`` (default: every bundled profile) and return results in order.
+
+    ``workers`` defaults to the CPU count; ``0`` or ``1`` renders inline.
+    """
+
+    ids = list(display_ids) if display_ids is not None else config_loader.list_display_ids()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    snapshots, failures = _prefetch_feeds(ids)
+    if workers <= 1 or len(ids) <= 1:
+        _seed_worker(snapshots, failures)
+        return [_render_in_worker(display_id, now) for display_id in ids]
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ids)),
+        initializer=_seed_worker,
+        initargs=(snapshots, failures),
+    ) as pool:
+        return list(pool.map(_render_in_worker, ids, repeat(now)))
+
+
+def _prefetch_feeds(display_ids: Sequence[str]) -> Tuple[List[feed_cache.FeedSnapshot], Dict[str, str]]:
+    """Fetch every feed the batch needs exactly once.
+
+    Returns the snapshots and ``{feed_url: error}`` for feeds that failed.
+    """
+
+    sources = display_plans.live_sources(display_ids)
+    snapshots = display_pipeline.load_snapshots("batch", sources.values(), feed_cache.FEED_TTL_SECONDS)
+    status = feed_cache.feed_status()
+    failures = {
+        url: (status[url].last_error if url in status else None) or "prefetch failed"
+        for url in sources
+        if url not in snapshots
+    }
+    return list(snapshots.values()), failures
+
+
+def _seed_worker(snapshots: Sequence[feed_cache.FeedSnapshot], failures: Mapping[str, str]) -> None:
+    for snapshot in snapshots:
+        feed_cache.store(snapshot)
+    for feed_url, error in failures.items():
+        feed_cache.hold_off(feed_url, error)
+
+
+def _render_in_worker(display_id: str, now: datetime | None) -> BatchResult:
+    started = time.perf_counter()
+    try:
+        plan = display_plans.get_plan(display_id)
+        frame = display_pipeline.build_display_frame(plan, now=now, max_feed_age=float("inf"))
+    except Exception as exc:
+        return BatchResult(display_id, None, time.perf_counter() - started, error=str(exc))
+    # Views cannot cross the process boundary, so results carry a copy.
+    return BatchResult(display_id, bytes(frame), time.perf_counter() - started)
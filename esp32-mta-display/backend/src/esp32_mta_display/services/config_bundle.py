@@ -0,0 +1,171 @@
+"""Precompiled bundle of the bundled config files.
+
+``run_build_config_bundle.py`` parses ``feeds.csv``, ``aliases.yml`` and
+every display YAML once and writes the results, with each source's
+``(mtime_ns, size)``, into a single marshal file in the config directory.
+Loaders ask ``load_source`` for a parsed file before reading it themselves;
+the bundle is read with one ``read`` the first time and entries whose
+source has changed since the build are ignored, so an outdated bundle only
+costs the usual parse for the edited files.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import marshal
+import os
+import sys
+import threading
+from importlib import resources
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_FILENAME = "config.bundle"
+
+# relative name -> ((mtime_ns, size), parsed value)
+Entries = Dict[str, Tuple[Tuple[int, int], Any]]
+
+_ENTRIES: Entries | None = None
+_LOCK = threading.Lock()
+
+
+def load_source(relname: str, path: str | None = None, stat: os.stat_result | None = None) -> Any | None:
+    """Return the bundled parse of ``relname`` (e.g. ``"displays/example.yml"``).
+
+    ``None`` means the caller has to parse the file: there is no bundle, the
+    entry is missing, ``path`` is not the bundled file, or the file changed
+    since the bundle was built. Pass ``stat`` when the caller already has it.
+    """
+
+    entries = _get_entries()
+    entry = entries.get(relname)
+    if entry is None:
+        return None
+    source_path = os.path.join(config_dir(), relname)
+    if path is not None and os.path.abspath(path) != os.path.abspath(source_path):
+        return None
+    if stat is None:
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+    signature, value = entry
+    if signature != (stat.st_mtime_ns, stat.st_size):
+        return None
+    return value
+
+
+def build_bundle(root: str | None = None) -> Entries:
+    """Parse every bundled config file under ``root`` (default: the config directory)."""
+
+    import yaml
+
+    root = root or config_dir()
+    sources: List[str] = ["feeds.csv", "aliases.yml"]
+    displays_dir = os.path.join(root, "displays")
+    if os.path.isdir(displays_dir):
+        sources.extend(f"displays/{name}" for name in sorted(os.listdir(displays_dir)) if name.endswith(".yml"))
+
+    entries: Entries = {}
+    for relname in sources:
+        path = os.path.join(root, relname)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if relname.endswith(".csv"):
+            with open(path, "r", encoding="utf-8", newline="") as handle:
+                value: Any = parse_feeds_csv(handle)
+        else:
+            with open(path, "rb") as handle:
+                value = yaml.safe_load(handle) or {}
+        try:
+            marshal.dumps(value)
+        except ValueError:
+            # e.g. YAML timestamps; the loader parses these files itself.
+            logger.warning("Leaving %s out of the config bundle: unsupported value types", relname)
+            continue
+        entries[relname] = ((stat.st_mtime_ns, stat.st_size), value)
+    return entries
+
+
+def write_bundle(entries: Entries, path: str | None = None) -> str:
+    path = path or os.path.join(config_dir(), BUNDLE_FILENAME)
+    payload = {
+        "version": BUNDLE_FORMAT_VERSION,
+        # marshal's format is only stable within one Python version.
+        "python": tuple(sys.version_info[:2]),
+        "entries": entries,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(marshal.dumps(payload))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_bundle(path: str) -> Entries:
+    """Read a bundle file; raise ``ValueError`` if it was built for another format."""
+
+    with open(path, "rb") as handle:
+        data = handle.read()
+    try:
+        payload = marshal.loads(data)
+    except (EOFError, TypeError, ValueError) as exc:
+        raise ValueError(f"unreadable config bundle: {exc}") from exc
+    if not isinstance(payload, dict) or payload.get("version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError("unsupported config bundle format")
+    if payload.get("python") != tuple(sys.version_info[:2]):
+        raise ValueError(f"config bundle was built for Python {payload.get('python')}")
+    return payload["entries"]
+
+
+def clear() -> None:
+    global _ENTRIES
+    with _LOCK:
+        _ENTRIES = None
+
+
+def parse_feeds_csv(handle) -> List[Dict[str, str]]:
+    rows: List[Dict[str, str]] = []
+    for raw in csv.DictReader(handle):
+        rows.append(
+            {
+                "feed_type": (raw.get("feed_type") or "").strip(),
+                "route": (raw.get("route") or "").strip(),
+                "feed_url": (raw.get("feed_url") or "").strip(),
+            }
+        )
+    return rows
+
+
+def config_dir() -> str:
+    """Return the on-disk config directory, preferring package resources."""
+
+    try:
+        resource_dir = resources.files("esp32_mta_display.config")
+        if isinstance(resource_dir, Path) and resource_dir.is_dir():
+            return str(resource_dir)
+    except Exception:
+        pass
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+
+
+def _get_entries() -> Entries:
+    global _ENTRIES
+    if _ENTRIES is None:
+        with _LOCK:
+            if _ENTRIES is None:
+                path = os.path.join(config_dir(), BUNDLE_FILENAME)
+                try:
+                    _ENTRIES = read_bundle(path)
+                except FileNotFoundError:
+                    _ENTRIES = {}
+                except ValueError as exc:
+                    logger.warning("Ignoring config bundle %s: %s", path, exc)
+                    _ENTRIES = {}
+    return _ENTRIES
@@ -1,35 +1,142 @@
-"""YAML configuration loader for display profiles."""
+"""YAML configuration loader for display profiles.
+
+Parsed configs are kept in memory. The displays directory and each file
+are re-checked with a cheap ``stat`` at most once per
+``RELOAD_CHECK_INTERVAL`` seconds, so edits, new profiles and deletions are
+picked up without a restart while hot requests never touch the disk.
+"""
 
 import os
+import threading
+import time
+from dataclasses import dataclass
 from importlib import resources
-from typing import Any
+from pathlib import Path
+from typing import Any, Dict, List
+
+from esp32_mta_display.services import config_bundle
+
+RELOAD_CHECK_INTERVAL = 1.0
+
 
-import yaml
+@dataclass
+class _CachedConfig:
+    path: str
+    mtime_ns: int
+    size: int
+    config: dict[str, Any]
+    checked_at: float
+
+
+_INDEX: Dict[str, str] = {}
+_INDEX_MTIME_NS: int | None = None
+_INDEX_CHECKED_AT = 0.0
+_CACHE: Dict[str, _CachedConfig] = {}
+_LOCK = threading.RLock()
 
 
 def load_display_config(display_id: str) -> dict[str, Any]:
     """Load YAML config for a specific display id.
 
-    First tries to load from installed package resources. If that fails
-    (e.g. during local editable development where resources aren't
-    packaged), falls back to a filesystem path relative to this file.
+    Configs come from the installed package resources when they live on the
+    filesystem, falling back to the source tree during editable development.
+    The returned dict is shared between callers and must not be mutated.
     """
 
-    filename = f"{display_id}.yml"
-    package = "esp32_mta_display.config.displays"
+    now = time.monotonic()
+    with _LOCK:
+        path = _lookup_path(display_id, now)
+        if path is None:
+            _CACHE.pop(display_id, None)
+            raise FileNotFoundError(f"Display config not found for id: {display_id}")
+
+        cached = _CACHE.get(display_id)
+        if cached is not None and cached.path == path and now - cached.checked_at < RELOAD_CHECK_INTERVAL:
+            return cached.config
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            _CACHE.pop(display_id, None)
+            _INDEX.pop(display_id, None)
+            raise FileNotFoundError(f"Display config not found for id: {display_id}") from None
+
+        unchanged = cached is not None and cached.path == path
+        if unchanged and (cached.mtime_ns, cached.size) == (stat.st_mtime_ns, stat.st_size):
+            cached.checked_at = now
+            return cached.config
+
+        config = config_bundle.load_source(f"displays/{display_id}.yml", path=path, stat=stat)
+        if config is None:
+            import yaml
+
+            with open(path, "rb") as f:
+                config = yaml.safe_load(f) or {}
+        _CACHE[display_id] = _CachedConfig(path, stat.st_mtime_ns, stat.st_size, config, now)
+        return config
+
+
+def list_display_ids() -> List[str]:
+    """Return the ids of every bundled display profile, sorted."""
 
-    # Try importlib.resources first.
+    with _LOCK:
+        _refresh_index(time.monotonic())
+        return sorted(_INDEX)
+
+
+def clear_cache() -> None:
+    """Drop every cached config and the directory index."""
+
+    global _INDEX_MTIME_NS, _INDEX_CHECKED_AT
+    with _LOCK:
+        _INDEX.clear()
+        _CACHE.clear()
+        _INDEX_MTIME_NS = None
+        _INDEX_CHECKED_AT = 0.0
+
+
+def _lookup_path(display_id: str, now: float) -> str | None:
+    # Unknown ids are answered from the index until the next re-check.
+    _refresh_index(now)
+    return _INDEX.get(display_id)
+
+
+def _refresh_index(now: float) -> None:
+    global _INDEX_MTIME_NS, _INDEX_CHECKED_AT
+    if _INDEX_MTIME_NS is not None and now - _INDEX_CHECKED_AT < RELOAD_CHECK_INTERVAL:
+        return
+
+    displays_dir = _displays_dir()
     try:
-        with resources.files(package).joinpath(filename).open("rb") as f:
-            return yaml.safe_load(f) or {}
-    except Exception:
-        # Fallback: resolve relative to the source tree.
-        base_dir = os.path.dirname(os.path.dirname(__file__))
-        displays_dir = os.path.join(base_dir, "config", "displays")
-        path = os.path.join(displays_dir, filename)
+        mtime_ns = os.stat(displays_dir).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = -1
+    _INDEX_CHECKED_AT = now
+    if mtime_ns == _INDEX_MTIME_NS:
+        return
 
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Display config not found for id: {display_id}")
+    index: Dict[str, str] = {}
+    if mtime_ns != -1:
+        for name in os.listdir(displays_dir):
+            if name.endswith(".yml"):
+                index[name[: -len(".yml")]] = os.path.join(displays_dir, name)
+    _INDEX.clear()
+    _INDEX.update(index)
+    _INDEX_MTIME_NS = mtime_ns
+    for display_id in [display_id for display_id in _CACHE if display_id not in index]:
+        del _CACHE[display_id]
+
+
+def _displays_dir() -> str:
+    """Return the on-disk displays directory, preferring package resources."""
 
-        with open(path, "rb") as f:
-            return yaml.safe_load(f) or {}
+    package = "esp32_mta_display.config.displays"
+    try:
+        resource_dir = resources.files(package)
+        if isinstance(resource_dir, Path) and resource_dir.is_dir():
+            return str(resource_dir)
+    except Exception:
+        pass
+    # Fallback: resolve relative to the source tree.
+    base_dir = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(base_dir, "config", "displays")
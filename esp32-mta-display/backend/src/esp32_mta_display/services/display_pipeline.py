@@ -0,0 +1,205 @@
+"""Shared pipeline that turns a compiled display plan into a rendered frame.
+
+Both the HTTP router and the minute-boundary pre-renderer go through
+``build_display_frame`` so they share the feed and render caches;
+``build_batch`` does the same for many displays over one set of feeds.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence
+
+from esp32_mta_display.models.arrivals import Arrival
+from esp32_mta_display.services import admission, agencies, feed_cache, render_cache, renderer, shared_cache
+from esp32_mta_display.services.display_plans import DisplayPlan, FeedSource
+from esp32_mta_display.utils import fast_json, metrics, tracing
+from esp32_mta_display.utils.time import utc_now
+
+logger = logging.getLogger(__name__)
+
+BatchResult = Dict[str, "memoryview | Exception"]
+
+
+def build_display_frame(
+    plan: DisplayPlan,
+    now: datetime | None = None,
+    max_feed_age: float = feed_cache.FEED_TTL_SECONDS,
+) -> memoryview:
+    """Return the BMP frame for ``plan`` at the minute containing ``now``.
+
+    The result is a read-only view of the cached buffer; callers that need
+    to keep or ship the frame elsewhere should copy it with ``bytes()``.
+    """
+
+    return _build_cached(plan, "bmp", _render_bitmap, now, max_feed_age)
+
+
+def build_arrivals_payload(
+    plan: DisplayPlan,
+    now: datetime | None = None,
+    max_feed_age: float = feed_cache.FEED_TTL_SECONDS,
+) -> memoryview:
+    """Return the rows ``plan`` shows at the minute containing ``now`` as compact JSON.
+
+    The encoded bytes are cached like frames, so every client polling the
+    same display within a minute gets the same buffer.
+    """
+
+    return _build_cached(plan, "json", _render_arrivals_json, now, max_feed_age)
+
+
+def build_batch(
+    plans: Sequence[DisplayPlan],
+    kind: str = "json",
+    now: datetime | None = None,
+    max_feed_age: float = feed_cache.FEED_TTL_SECONDS,
+) -> BatchResult:
+    """Build frames (``kind="bmp"``) or arrival payloads (``"json"``) for many plans.
+
+    The plans' feeds are resolved as one deduplicated set and loaded once up
+    front, so a feed shared by several displays is fetched, decoded and
+    cached a single time; every display is rendered against the same
+    snapshots and minute. A display that fails to render maps to its
+    exception instead of failing the whole batch.
+    """
+
+    render = _RENDERERS.get(kind)
+    if render is None:
+        raise ValueError(f"unknown batch format {kind!r}")
+    if now is None:
+        now = utc_now()
+
+    sources: Dict[str, FeedSource] = {}
+    for plan in plans:
+        for source in plan.sources:
+            sources.setdefault(source.feed_url, source)
+    label = ",".join(plan.display_id for plan in plans)
+    snapshots = load_snapshots(label, sources.values(), max_feed_age)
+
+    results: BatchResult = {}
+    for plan in plans:
+        try:
+            results[plan.display_id] = _build_cached(plan, kind, render, now, max_feed_age, snapshots=snapshots)
+        except Exception as exc:
+            logger.warning("Failed to build %s for %s in batch: %s", kind, plan.display_id, exc)
+            results[plan.display_id] = exc
+    return results
+
+
+def _build_cached(
+    plan: DisplayPlan,
+    kind: str,
+    render: Callable[[DisplayPlan, List[Arrival], datetime], memoryview],
+    now: datetime | None,
+    max_feed_age: float,
+    snapshots: Mapping[str, feed_cache.FeedSnapshot] | None = None,
+) -> memoryview:
+    if now is None:
+        now = utc_now()
+    bucket = render_cache.minute_bucket(now)
+    display_id = plan.display_id
+
+    if snapshots is None:
+        snapshots = load_snapshots(display_id, plan.sources, max_feed_age)
+    else:
+        # Preloaded by a batch: keep only this plan's feeds so the render
+        # cache token matches the single-display path.
+        snapshots = {url: snapshots[url] for url in plan.feed_urls if url in snapshots}
+    token = tuple(sorted((url, snapshot.fetched_at) for url, snapshot in snapshots.items()))
+
+    cached = render_cache.get(display_id, bucket, token, kind=kind)
+    if cached is not None:
+        return cached
+    # Another worker may already have rendered these exact snapshots.
+    cached = shared_cache.load_frame(display_id, kind, bucket, token)
+    if cached is not None:
+        render_cache.put(display_id, bucket, token, cached, kind=kind)
+        return cached
+
+    arrivals: List[Arrival] = []
+    for source in plan.sources:
+        snapshot = snapshots.get(source.feed_url)
+        if snapshot is not None:
+            arrivals.extend(_parse_arrivals(display_id, source, snapshot))
+    arrivals.sort(key=lambda a: a.arrival_time)
+
+    started = time.perf_counter()
+    with tracing.span("render"):
+        result = render(plan, arrivals, render_cache.bucket_start(bucket))
+    metrics.RENDER_SECONDS.observe(time.perf_counter() - started, display_id, kind)
+    render_cache.put(display_id, bucket, token, result, kind=kind)
+    shared_cache.publish_frame(display_id, kind, bucket, token, result)
+    return result
+
+
+def _render_bitmap(plan: DisplayPlan, arrivals: List[Arrival], at: datetime) -> memoryview:
+    return renderer.render_display_frame(plan.display_id, plan.config, arrivals=arrivals, now=at)
+
+
+def _render_arrivals_json(plan: DisplayPlan, arrivals: List[Arrival], at: datetime) -> memoryview:
+    rows = [
+        {
+            "line": arrival.line,
+            "destination": arrival.destination,
+            "minutes": minutes,
+            "epoch": int(arrival.arrival_time.timestamp()),
+        }
+        for arrival, minutes in renderer.select_rows(plan.config, arrivals, at)
+    ]
+    payload = {"display_id": plan.display_id, "generated_at": int(at.timestamp()), "rows": rows}
+    return memoryview(fast_json.dumps(payload))
+
+
+_RENDERERS: Dict[str, Callable[[DisplayPlan, List[Arrival], datetime], memoryview]] = {
+    "bmp": _render_bitmap,
+    "json": _render_arrivals_json,
+}
+
+
+def load_snapshots(
+    display_id: str,
+    sources: Iterable[FeedSource],
+    max_feed_age: float,
+) -> Dict[str, feed_cache.FeedSnapshot]:
+    """Return cached-or-fetched snapshots for ``sources`` keyed by feed URL."""
+
+    snapshots: Dict[str, feed_cache.FeedSnapshot] = {}
+    for source in sources:
+        if source.feed_url in snapshots:
+            continue
+        try:
+            agency = _agency(source)
+            snapshots[source.feed_url] = feed_cache.get_snapshot(source.feed_url, agency.fetch, max_age=max_feed_age)
+        except admission.Overloaded:
+            # Rendering without the feed would cache a frame missing its rows.
+            raise
+        except Exception as exc:  # pragma: no cover - logging fallback
+            logger.warning(
+                "Failed to load %s feed %s for %s: %s", source.agency.upper(), source.feed_url, display_id, exc
+            )
+    return snapshots
+
+
+def _parse_arrivals(display_id: str, source: FeedSource, snapshot: feed_cache.FeedSnapshot) -> List[Arrival]:
+    try:
+        agency = _agency(source)
+        decoded = feed_cache.decoded(snapshot, agency.decode)
+        with tracing.span("parse"):
+            return agency.parse(decoded, station_id=source.station_id, allowed_routes=source.lines)
+    except Exception as exc:  # pragma: no cover - logging fallback
+        logger.warning(
+            "Failed to parse %s feed %s for %s: %s", source.agency.upper(), source.feed_url, display_id, exc
+        )
+        return []
+
+
+def _agency(source: FeedSource) -> agencies.Agency:
+    # Plans are compiled ahead of time, so the agency may have been
+    # unregistered since; callers log this like any other feed failure.
+    agency = agencies.get(source.agency)
+    if agency is None:
+        raise LookupError(f"agency {source.agency.upper()} is not registered")
+    return agency
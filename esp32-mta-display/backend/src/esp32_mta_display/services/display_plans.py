@@ -0,0 +1,192 @@
+"""Compiled, validated display plans.
+
+A plan is everything the request path needs from a display YAML: the
+resolved station ids, the feed each set of lines comes from and the route
+filters. Plans are compiled for every profile at startup so broken configs
+surface immediately, and recompiled only when the config loader hands
+back a reloaded config; each (re)compile refreshes the feed subscription
+index.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from esp32_mta_display.services import agencies, config_loader, feed_registry, renderer, subscriptions
+
+logger = logging.getLogger(__name__)
+
+
+class DisplayConfigError(ValueError):
+    """Raised when a display YAML cannot be compiled into a plan."""
+
+
+@dataclass(frozen=True)
+class FeedSource:
+    agency: str
+    station_id: str
+    lines: Tuple[str, ...]
+    feed_url: str
+
+
+@dataclass(frozen=True)
+class DisplayPlan:
+    display_id: str
+    config: dict
+    sources: Tuple[FeedSource, ...]
+
+    @property
+    def feed_urls(self) -> FrozenSet[str]:
+        return frozenset(source.feed_url for source in self.sources)
+
+    @property
+    def subscriptions(self) -> FrozenSet[Tuple[str, str]]:
+        """(feed_url, stop_id) pairs this display reads."""
+
+        return frozenset((source.feed_url, source.station_id) for source in self.sources)
+
+
+_PLANS: Dict[str, DisplayPlan] = {}
+_LOCK = threading.Lock()
+
+
+def get_plan(display_id: str) -> DisplayPlan:
+    """Return the plan for ``display_id``.
+
+    Raises ``FileNotFoundError`` for unknown ids and ``DisplayConfigError``
+    for configs that fail validation.
+    """
+
+    try:
+        config = config_loader.load_display_config(display_id)
+    except FileNotFoundError:
+        _forget(display_id)
+        raise
+    plan = _PLANS.get(display_id)
+    if plan is not None and plan.config is config:
+        return plan
+
+    try:
+        plan = compile_plan(display_id, config)
+    except DisplayConfigError:
+        _forget(display_id)
+        raise
+    with _LOCK:
+        _PLANS[display_id] = plan
+    subscriptions.update_display(display_id, plan.subscriptions)
+    return plan
+
+
+def compile_all() -> Dict[str, str]:
+    """Compile every profile in config/displays/; return ``{display_id: error}`` for failures."""
+
+    errors: Dict[str, str] = {}
+    for display_id in config_loader.list_display_ids():
+        try:
+            get_plan(display_id)
+        except (DisplayConfigError, FileNotFoundError) as exc:
+            errors[display_id] = str(exc)
+            logger.error("Invalid display config %s: %s", display_id, exc)
+        except Exception as exc:  # pragma: no cover - YAML syntax errors etc.
+            errors[display_id] = str(exc)
+            logger.error("Failed to load display config %s: %s", display_id, exc)
+    return errors
+
+
+def live_sources(display_ids: Iterable[str] | None = None) -> Dict[str, FeedSource]:
+    """Return one source per feed needed by ``display_ids``, keyed by feed URL.
+
+    Defaults to every compiled plan; ids whose config is missing or invalid
+    are skipped. Prefetchers fetch each returned feed once.
+    """
+
+    if display_ids is None:
+        with _LOCK:
+            plans = list(_PLANS.values())
+    else:
+        plans = []
+        for display_id in display_ids:
+            try:
+                plans.append(get_plan(display_id))
+            except (DisplayConfigError, FileNotFoundError):
+                continue
+    sources: Dict[str, FeedSource] = {}
+    for plan in plans:
+        for source in plan.sources:
+            sources.setdefault(source.feed_url, source)
+    return sources
+
+
+def clear() -> None:
+    with _LOCK:
+        display_ids = list(_PLANS)
+        _PLANS.clear()
+    for display_id in display_ids:
+        subscriptions.remove_display(display_id)
+
+
+def _forget(display_id: str) -> None:
+    with _LOCK:
+        _PLANS.pop(display_id, None)
+    subscriptions.remove_display(display_id)
+
+
+def compile_plan(display_id: str, config: dict) -> DisplayPlan:
+    """Validate ``config`` and resolve its stations, feeds and route filters."""
+
+    if not isinstance(config, dict):
+        raise DisplayConfigError(f"{display_id}: config must be a mapping")
+    try:
+        renderer.validate_display_config(config)
+    except (TypeError, ValueError) as exc:
+        raise DisplayConfigError(f"{display_id}: {exc}") from exc
+
+    registry = feed_registry.get_registry()
+    sources: List[FeedSource] = []
+    for agency in agencies.all_agencies():
+        # Legacy configs put the MTA station and lines at the top level.
+        fallback = None
+        if agency.code == agencies.DEFAULT_AGENCY:
+            fallback = {"station_id": config.get("station_id"), "lines": config.get("lines", [])}
+        section = _get_agency_config(display_id, config, section_key=agency.section_key, fallback=fallback)
+        if not section:
+            continue
+        station_id, lines = section
+        lines = agency.normalize_lines(lines)
+        # Mixed-route sections (e.g. A + 1) need one feed per line group.
+        grouped = registry.feeds_by_route(agency.code, lines)
+        unknown = [line for line in lines if not any(line in members for members in grouped.values())]
+        if unknown:
+            raise DisplayConfigError(f"{display_id}: no {agency.code} feed serves lines {unknown}")
+        for feed_url, members in grouped.items():
+            sources.append(FeedSource(agency.section_key, station_id, tuple(members), feed_url))
+
+    return DisplayPlan(display_id=display_id, config=config, sources=tuple(sources))
+
+
+def _get_agency_config(
+    display_id: str,
+    display_config: dict,
+    section_key: str,
+    fallback: dict | None = None,
+) -> Tuple[str, List[str]] | None:
+    section = display_config.get(section_key) or {}
+    if not isinstance(section, dict):
+        raise DisplayConfigError(f"{display_id}: '{section_key}' section must be a mapping")
+    station_id = section.get("station_id")
+    lines = section.get("lines")
+
+    if not station_id and fallback:
+        station_id = fallback.get("station_id")
+    if not lines and fallback:
+        lines = fallback.get("lines")
+
+    if not station_id or not lines:
+        return None
+    if isinstance(lines, str) or not isinstance(lines, list):
+        raise DisplayConfigError(f"{display_id}: '{section_key}.lines' must be a list")
+    normalized = [str(line).strip().upper() for line in lines if str(line).strip()]
+    return str(station_id).strip(), normalized
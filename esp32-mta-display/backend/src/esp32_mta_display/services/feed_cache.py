@@ -0,0 +1,256 @@
+"""In-memory cache of raw GTFS-RT feed payloads keyed by feed URL.
+
+Each feed also keeps its fetch health: last fetch duration, consecutive
+failures and a circuit breaker. After ``CIRCUIT_FAILURE_THRESHOLD``
+failures in a row the circuit opens and fetches fail fast with
+``CircuitOpenError`` for ``CIRCUIT_OPEN_SECONDS``; then a single request
+probes upstream again and closes the circuit on success.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple
+
+from esp32_mta_display.services import admission, shared_cache, subscriptions
+from esp32_mta_display.utils import metrics, tracing
+
+FEED_TTL_SECONDS = 30.0
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 30.0
+
+FetchFn = Callable[[str], bytes]
+
+
+@dataclass(frozen=True)
+class FeedSnapshot:
+    url: str
+    payload: bytes
+    fetched_at: float
+
+    def age(self, now: float | None = None) -> float:
+        return (now if now is not None else time.time()) - self.fetched_at
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of fetching while a feed's circuit is open."""
+
+
+@dataclass(frozen=True)
+class FeedStatus:
+    url: str
+    # Seconds since the cached snapshot was fetched; ``None`` before the first success.
+    age: float | None
+    # ``header.timestamp`` of the last decoded snapshot (epoch seconds).
+    header_timestamp: int | None
+    last_fetch_seconds: float | None
+    error_streak: int
+    circuit: str
+    last_error: str | None
+
+
+@dataclass
+class _FeedHealth:
+    last_fetch_seconds: float | None = None
+    last_error: str | None = None
+    error_streak: int = 0
+    open_until: float = 0.0
+    probing: bool = False
+    header_timestamp: int | None = None
+
+    def circuit(self, now: float) -> str:
+        if self.error_streak < CIRCUIT_FAILURE_THRESHOLD:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+
+_SNAPSHOTS: Dict[str, FeedSnapshot] = {}
+_HEALTH: Dict[str, _FeedHealth] = {}
+# url -> (fetched_at, decoded payload) for the latest decoded snapshot
+_DECODED: Dict[str, Tuple[float, Any]] = {}
+_LOCK = threading.Lock()
+
+
+def get_snapshot(feed_url: str, fetch_fn: FetchFn, max_age: float = FEED_TTL_SECONDS) -> FeedSnapshot:
+    """Return a snapshot no older than ``max_age`` seconds, fetching if needed.
+
+    With a shared cache configured, a snapshot another worker fetched is
+    adopted instead, and only the worker holding the feed's lease fetches.
+    """
+
+    snapshot = peek(feed_url)
+    if snapshot is not None and snapshot.age() <= max_age:
+        metrics.CACHE_REQUESTS.inc("feed", "hit")
+        return snapshot
+
+    metrics.CACHE_REQUESTS.inc("feed", "miss")
+    shared = shared_cache.load_snapshot(feed_url, max_age)
+    leader = shared is None and shared_cache.acquire_fetch(feed_url)
+    if shared is None and not leader:
+        # Another worker is fetching this feed; wait for it to publish.
+        with tracing.span("fetch"):
+            shared = shared_cache.wait_for_snapshot(feed_url, max_age)
+    if shared is not None:
+        snapshot = FeedSnapshot(url=feed_url, payload=shared[0], fetched_at=shared[1])
+        store(snapshot)
+        return snapshot
+
+    try:
+        return _fetch_snapshot(feed_url, fetch_fn, snapshot)
+    finally:
+        if leader:
+            shared_cache.release_fetch(feed_url)
+
+
+def _fetch_snapshot(feed_url: str, fetch_fn: FetchFn, cached: FeedSnapshot | None) -> FeedSnapshot:
+    if not admission.FETCHES.try_acquire(admission.FETCH_WAIT_SECONDS):
+        # Too many fetches in flight: a stale snapshot beats queueing.
+        if cached is not None:
+            return cached
+        raise admission.Overloaded("fetch")
+    try:
+        _admit(feed_url)
+        started = time.perf_counter()
+        try:
+            with tracing.span("fetch"):
+                payload = fetch_fn(feed_url)
+        except Exception as exc:
+            _record_fetch(feed_url, time.perf_counter() - started, exc)
+            raise
+    finally:
+        admission.FETCHES.release()
+    elapsed = time.perf_counter() - started
+    _record_fetch(feed_url, elapsed, None)
+    metrics.FEED_FETCH_SECONDS.observe(elapsed, feed_url)
+    metrics.FEED_BYTES.observe(len(payload), feed_url)
+    snapshot = FeedSnapshot(url=feed_url, payload=payload, fetched_at=time.time())
+    store(snapshot)
+    shared_cache.publish_snapshot(feed_url, payload, snapshot.fetched_at)
+    return snapshot
+
+
+def get_feed(feed_url: str, fetch_fn: FetchFn, max_age: float = FEED_TTL_SECONDS) -> bytes:
+    """Return raw feed bytes, reusing a cached copy while it is fresh."""
+
+    return get_snapshot(feed_url, fetch_fn, max_age=max_age).payload
+
+
+def peek(feed_url: str) -> FeedSnapshot | None:
+    """Return the cached snapshot for a feed without fetching, even if stale."""
+
+    with _LOCK:
+        return _SNAPSHOTS.get(feed_url)
+
+
+def decoded(snapshot: FeedSnapshot, decode_fn: Callable[[bytes], Any]) -> Any:
+    """Return ``decode_fn(snapshot.payload)``, decoding each snapshot only once."""
+
+    with _LOCK:
+        entry = _DECODED.get(snapshot.url)
+    if entry is not None and entry[0] == snapshot.fetched_at:
+        metrics.CACHE_REQUESTS.inc("parse", "hit")
+        return entry[1]
+    metrics.CACHE_REQUESTS.inc("parse", "miss")
+    started = time.perf_counter()
+    with tracing.span("parse"):
+        value = decode_fn(snapshot.payload)
+    metrics.FEED_PARSE_SECONDS.observe(time.perf_counter() - started, snapshot.url)
+    entities = getattr(value, "entity", None)
+    if entities is not None:
+        metrics.FEED_ENTITIES.observe(len(entities), snapshot.url)
+    header = getattr(value, "header", None)
+    if header is not None and getattr(header, "timestamp", 0):
+        with _LOCK:
+            _HEALTH.setdefault(snapshot.url, _FeedHealth()).header_timestamp = int(header.timestamp)
+    with _LOCK:
+        current = _DECODED.get(snapshot.url)
+        if current is None or current[0] <= snapshot.fetched_at:
+            _DECODED[snapshot.url] = (snapshot.fetched_at, value)
+    return value
+
+
+def feed_status(now: float | None = None) -> Dict[str, FeedStatus]:
+    """Return the health of every feed fetched so far, from memory only."""
+
+    if now is None:
+        now = time.time()
+    with _LOCK:
+        urls = sorted(set(_SNAPSHOTS) | set(_HEALTH))
+        statuses = {}
+        for url in urls:
+            snapshot = _SNAPSHOTS.get(url)
+            health = _HEALTH.get(url) or _FeedHealth()
+            statuses[url] = FeedStatus(
+                url=url,
+                age=snapshot.age(now) if snapshot is not None else None,
+                header_timestamp=health.header_timestamp,
+                last_fetch_seconds=health.last_fetch_seconds,
+                error_streak=health.error_streak,
+                circuit=health.circuit(now),
+                last_error=health.last_error,
+            )
+    return statuses
+
+
+def _admit(feed_url: str) -> None:
+    """Raise ``CircuitOpenError`` unless ``feed_url`` may be fetched now."""
+
+    now = time.time()
+    with _LOCK:
+        health = _HEALTH.setdefault(feed_url, _FeedHealth())
+        state = health.circuit(now)
+        if state == "closed":
+            return
+        if state == "open" or health.probing:
+            raise CircuitOpenError(f"circuit open for {feed_url} after {health.error_streak} failures")
+        # Half-open: let exactly one request probe upstream.
+        health.probing = True
+
+
+def _record_fetch(feed_url: str, elapsed: float, error: Exception | None) -> None:
+    now = time.time()
+    with _LOCK:
+        health = _HEALTH.setdefault(feed_url, _FeedHealth())
+        health.last_fetch_seconds = elapsed
+        health.probing = False
+        if error is None:
+            health.error_streak = 0
+            health.open_until = 0.0
+            return
+        health.error_streak += 1
+        health.last_error = f"{type(error).__name__}: {error}"
+        if health.error_streak >= CIRCUIT_FAILURE_THRESHOLD:
+            health.open_until = now + CIRCUIT_OPEN_SECONDS
+
+
+def hold_off(feed_url: str, reason: str, seconds: float = CIRCUIT_OPEN_SECONDS) -> None:
+    """Open ``feed_url``'s circuit for ``seconds`` without fetching it.
+
+    For processes told that another one just failed to fetch the feed, so
+    they fail fast instead of all retrying it at once.
+    """
+
+    with _LOCK:
+        health = _HEALTH.setdefault(feed_url, _FeedHealth())
+        health.error_streak = max(health.error_streak, CIRCUIT_FAILURE_THRESHOLD)
+        health.open_until = max(health.open_until, time.time() + seconds)
+        health.last_error = reason
+
+
+def store(snapshot: FeedSnapshot) -> None:
+    """Insert a snapshot and notify dependent displays if its payload changed."""
+
+    with _LOCK:
+        previous = _SNAPSHOTS.get(snapshot.url)
+        _SNAPSHOTS[snapshot.url] = snapshot
+    if previous is not None and previous.payload != snapshot.payload:
+        subscriptions.feed_changed(snapshot.url)
+
+
+def clear() -> None:
+    with _LOCK:
+        _SNAPSHOTS.clear()
+        _DECODED.clear()
+        _HEALTH.clear()
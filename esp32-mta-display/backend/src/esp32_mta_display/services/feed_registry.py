@@ -0,0 +1,128 @@
+"""Precomputed route -> GTFS-RT feed index built once from feeds.csv.
+
+MTA feeds are published per line group (``ACE``, ``BDFM`` ...), so each
+group row is expanded into one entry per member line. Lookups are plain
+dict hits keyed by ``(agency, route)``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from importlib import resources
+from typing import Dict, Iterable, List, Tuple
+
+from esp32_mta_display.services import config_bundle
+
+MTA_GROUP_LINES: Dict[str, List[str]] = {
+    "ACE": ["A", "C", "E", "SR"],
+    "BDFM": ["B", "D", "F", "M", "SF"],
+    "G": ["G"],
+    "JZ": ["J", "Z"],
+    "NQRW": ["N", "Q", "R", "W"],
+    "L": ["L"],
+    "1234567S": ["1", "2", "3", "4", "5", "6", "7", "S", "7X"],
+    "SIR": ["SI", "SIR"],
+}
+
+
+@dataclass(frozen=True)
+class FeedRegistry:
+    rows: List[Dict[str, str]]
+    # (agency, route) -> (csv row index, feed_url); the index keeps the
+    # "first matching row wins" order of the original CSV scan.
+    routes: Dict[Tuple[str, str], Tuple[int, str]] = field(default_factory=dict)
+
+    def find_feed(self, agency: str, route: str) -> str | None:
+        entry = self.routes.get((agency.strip().upper(), route.strip().upper()))
+        return entry[1] if entry else None
+
+    def find_first(self, agency: str, lines: Iterable[str]) -> str | None:
+        """Return the feed of the earliest CSV row serving any of ``lines``."""
+
+        agency_key = agency.strip().upper()
+        best: Tuple[int, str] | None = None
+        for line in _normalized(lines):
+            entry = self.routes.get((agency_key, line))
+            if entry and (best is None or entry[0] < best[0]):
+                best = entry
+        return best[1] if best else None
+
+    def feeds_by_route(self, agency: str, lines: Iterable[str]) -> Dict[str, List[str]]:
+        """Group ``lines`` by the feed that serves them, in first-seen order."""
+
+        agency_key = agency.strip().upper()
+        grouped: Dict[str, List[str]] = {}
+        for line in _normalized(lines):
+            entry = self.routes.get((agency_key, line))
+            if entry:
+                grouped.setdefault(entry[1], []).append(line)
+        return grouped
+
+    def feeds_for_routes(self, routes: Iterable[str], agency: str | None = None) -> List[str]:
+        """Return every unique feed needed for ``routes``, across agencies unless one is given."""
+
+        agencies = [agency.strip().upper()] if agency else sorted({key[0] for key in self.routes})
+        ordered: Dict[str, None] = {}
+        for route in _normalized(routes):
+            for agency_key in agencies:
+                entry = self.routes.get((agency_key, route))
+                if entry:
+                    ordered.setdefault(entry[1], None)
+        return list(ordered)
+
+
+_REGISTRY: FeedRegistry | None = None
+_LOCK = threading.Lock()
+
+
+def get_registry() -> FeedRegistry:
+    """Return the process-wide registry, building it on first use."""
+
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _LOCK:
+            if _REGISTRY is None:
+                _REGISTRY = build_registry(_load_rows())
+    return _REGISTRY
+
+
+def build_registry(rows: List[Dict[str, str]]) -> FeedRegistry:
+    routes: Dict[Tuple[str, str], Tuple[int, str]] = {}
+    for index, row in enumerate(rows):
+        agency = row["feed_type"].upper()
+        route = row["route"].upper()
+        feed_url = row["feed_url"]
+        if not agency or not route or not feed_url:
+            continue
+        members = [route]
+        if agency == "MTA":
+            members.extend(MTA_GROUP_LINES.get(route, []))
+        for member in members:
+            routes.setdefault((agency, member), (index, feed_url))
+    return FeedRegistry(rows=rows, routes=routes)
+
+
+def _load_rows() -> List[Dict[str, str]]:
+    rows = config_bundle.load_source("feeds.csv")
+    if rows is not None:
+        return rows
+
+    package = "esp32_mta_display.config"
+    filename = "feeds.csv"
+
+    try:
+        file_ref = resources.files(package).joinpath(filename)
+        stream = file_ref.open("r", encoding="utf-8")
+    except Exception:
+        base_dir = os.path.join(os.path.dirname(__file__), "..", "config")
+        fallback_path = os.path.abspath(os.path.join(base_dir, filename))
+        stream = open(fallback_path, "r", encoding="utf-8")
+
+    with stream as csvfile:
+        return config_bundle.parse_feeds_csv(csvfile)
+
+
+def _normalized(values: Iterable[str]) -> List[str]:
+    return [value.strip().upper() for value in values if value and value.strip()]
@@ -3,33 +3,44 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Iterable, List, Sequence
-
-import httpx
-from google.transit import gtfs_realtime_pb2
+from typing import TYPE_CHECKING, Iterable, List, Sequence
 
 from esp32_mta_display.models.arrivals import Arrival
 
+if TYPE_CHECKING:
+    from google.transit import gtfs_realtime_pb2
+
 
 def fetch_mta_feed(feed_url: str, *, timeout: float = 5.0) -> bytes:
     """Fetch raw GTFS-RT bytes from the given URL using httpx."""
 
+    import httpx
+
     with httpx.Client(timeout=timeout) as client:
         response = client.get(feed_url)
         response.raise_for_status()
         return response.content
 
 
+def decode_feed(raw_feed: bytes) -> gtfs_realtime_pb2.FeedMessage:
+    """Decode GTFS-RT bytes into a ``FeedMessage``."""
+
+    from google.transit import gtfs_realtime_pb2
+
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.ParseFromString(raw_feed)
+    return feed
+
+
 def parse_mta_feed(
-    raw_feed: bytes,
+    raw_feed: bytes | gtfs_realtime_pb2.FeedMessage,
     station_id: str,
     allowed_routes: Sequence[str] | None = None,
 ) -> List[Arrival]:
-    """Parse GTFS-RT feed bytes into normalized Arrival objects."""
+    """Parse GTFS-RT feed bytes (or an already decoded feed) into normalized Arrival objects."""
 
     allowed = {route.strip().upper() for route in (allowed_routes or []) if route}
-    feed = gtfs_realtime_pb2.FeedMessage()
-    feed.ParseFromString(raw_feed)
+    feed = decode_feed(raw_feed) if isinstance(raw_feed, (bytes, bytearray, memoryview)) else raw_feed
 
     arrivals: List[Arrival] = []
     for entity in feed.entity:
@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Iterable, List, Sequence
-
-import httpx
-from google.transit import gtfs_realtime_pb2
+from typing import TYPE_CHECKING, Iterable, List, Sequence
 
 from esp32_mta_display.models.arrivals import Arrival
+from esp32_mta_display.services.mta import decode_feed
+
+if TYPE_CHECKING:
+    from google.transit import gtfs_realtime_pb2
 
 _PATH_STATION_ALIASES = {
     "14": "26722",
@@ -62,6 +63,7 @@ _PATH_ROUTE_ALIASES = {
     "HOB33": "859",
     "HOB_WTC": "860",
     "HOB-WTC": "860",
+    "HOBWTC": "860",
     "JSQ-33": "861",
     "JSQ33": "861",
     "NWK-WTC": "862",
@@ -74,6 +76,8 @@ _PATH_ROUTE_ALIASES = {
 def fetch_path_feed(feed_url: str, *, timeout: float = 5.0) -> bytes:
     """Fetch PATH GTFS-RT data over HTTP."""
 
+    import httpx
+
     with httpx.Client(timeout=timeout) as client:
         response = client.get(feed_url)
         response.raise_for_status()
@@ -81,19 +85,18 @@ def fetch_path_feed(feed_url: str, *, timeout: float = 5.0) -> bytes:
 
 
 def parse_path_feed(
-    raw_feed: bytes,
+    raw_feed: bytes | gtfs_realtime_pb2.FeedMessage,
     station_id: str,
     allowed_routes: Sequence[str] | None = None,
 ) -> List[Arrival]:
-    """Parse PATH GTFS-RT data into Arrival objects.
+    """Parse PATH GTFS-RT data (raw bytes or a decoded feed) into Arrival objects.
 
     PATH route_ids look like "JSQ-33" or "NWK-WTC"; stop_ids are values such as "33" or "HOB".
     We normalize comparisons to uppercase-only to avoid mismatches while keeping values human-readable.
     """
 
     allowed = {_normalize_route_code(route) for route in (allowed_routes or []) if route}
-    feed = gtfs_realtime_pb2.FeedMessage()
-    feed.ParseFromString(raw_feed)
+    feed = decode_feed(raw_feed) if isinstance(raw_feed, (bytes, bytearray, memoryview)) else raw_feed
 
     arrivals: List[Arrival] = []
     for entity in feed.entity:
@@ -0,0 +1,57 @@
+"""Ahead-of-time rendering of display frames for the next minute.
+
+Every countdown changes at the top of the minute, so all devices see a
+stale frame at the same moment. A few seconds before each boundary we
+render the next minute's frame for every recently requested display and
+park it in the render cache, turning the refresh spike into cache hits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List
+
+from esp32_mta_display.services import display_pipeline, display_plans, feed_cache, render_cache
+from esp32_mta_display.utils.time import utc_now
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_LEAD_SECONDS = 5.0
+
+
+def prerender_next_minute(now: datetime | None = None, lead_seconds: float = PRERENDER_LEAD_SECONDS) -> List[str]:
+    """Render the next minute's frame for each active display; return their ids."""
+
+    if now is None:
+        now = utc_now()
+    boundary = render_cache.bucket_start(render_cache.minute_bucket(now) + 1)
+
+    # Cached feeds are reused unless they would expire shortly after the
+    # boundary, in which case the request path would refetch and miss.
+    max_feed_age = max(feed_cache.FEED_TTL_SECONDS - 2 * lead_seconds, 0.0)
+
+    rendered: List[str] = []
+    for display_id in render_cache.active_displays():
+        try:
+            plan = display_plans.get_plan(display_id)
+            display_pipeline.build_display_frame(plan, now=boundary, max_feed_age=max_feed_age)
+        except Exception as exc:  # pragma: no cover - logging fallback
+            logger.warning("Pre-render failed for %s: %s", display_id, exc)
+            continue
+        rendered.append(display_id)
+    return rendered
+
+
+async def run_prerender_loop(lead_seconds: float = PRERENDER_LEAD_SECONDS) -> None:
+    """Run ``prerender_next_minute`` ``lead_seconds`` before every minute."""
+
+    while True:
+        current = time.time()
+        wait = (current // 60 + 1) * 60 - lead_seconds - current
+        if wait < 0:
+            wait += 60
+        await asyncio.sleep(wait)
+        await asyncio.to_thread(prerender_next_minute, None, lead_seconds)
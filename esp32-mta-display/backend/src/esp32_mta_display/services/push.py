@@ -0,0 +1,201 @@
+"""Push of display row changes to streaming clients.
+
+One refresh loop (``run_push_loop``) produces for every display that has
+at least one open stream: it keeps the display's feeds fresh, rebuilds the
+arrivals payload and fans it out only when the visible rows changed. The
+loop wakes on its interval, at each minute boundary (countdowns tick) and
+as soon as ``subscriptions`` reports a changed feed for a streamed display.
+
+Each connection owns a ``Subscription`` holding at most one pending
+payload, so a slow client never blocks the producer or other clients; it
+just skips straight to the newest rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Set
+
+from esp32_mta_display.services import display_pipeline, display_plans, subscriptions
+from esp32_mta_display.services.display_plans import DisplayPlan
+
+logger = logging.getLogger(__name__)
+
+PUSH_INTERVAL_SECONDS = 10.0
+KEEPALIVE_SECONDS = 15.0
+
+
+class Subscription:
+    """One client's mailbox for a display's arrival payloads."""
+
+    def __init__(self, display_id: str) -> None:
+        self.display_id = display_id
+        # Payloads replaced before the client read them.
+        self.dropped = 0
+        self._pending: bytes | None = None
+        self._ready = asyncio.Event()
+
+    def offer(self, payload: bytes) -> None:
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = payload
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> bytes | None:
+        """Wait for the next payload; ``None`` if ``timeout`` passes first."""
+
+        if self._pending is None:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        payload, self._pending = self._pending, None
+        self._ready.clear()
+        return payload
+
+
+@dataclass
+class _Stream:
+    subscribers: Set[Subscription] = field(default_factory=set)
+    rows: Any = None
+    payload: bytes | None = None
+
+
+_STREAMS: Dict[str, _Stream] = {}
+_LOCK = threading.Lock()
+_LOOP: asyncio.AbstractEventLoop | None = None
+_WAKE: asyncio.Event | None = None
+
+
+async def open_subscription(plan: DisplayPlan) -> Subscription:
+    """Subscribe to ``plan``'s display; the current rows are the first payload.
+
+    If those rows cannot be built the subscription is closed again and the
+    error propagates, so a failed connection leaves nothing to refresh.
+    """
+
+    subscription = Subscription(plan.display_id)
+    with _LOCK:
+        stream = _STREAMS.setdefault(plan.display_id, _Stream())
+        stream.subscribers.add(subscription)
+        payload = stream.payload
+    if payload is None:
+        try:
+            payload = bytes(await asyncio.to_thread(display_pipeline.build_arrivals_payload, plan))
+        except BaseException:
+            close_subscription(subscription)
+            raise
+        with _LOCK:
+            if stream.payload is None:
+                stream.payload, stream.rows = payload, _visible_rows(payload)
+            payload = stream.payload
+    subscription.offer(payload)
+    return subscription
+
+
+def close_subscription(subscription: Subscription) -> None:
+    with _LOCK:
+        stream = _STREAMS.get(subscription.display_id)
+        if stream is None:
+            return
+        stream.subscribers.discard(subscription)
+        if not stream.subscribers:
+            del _STREAMS[subscription.display_id]
+
+
+def streamed_displays() -> FrozenSet[str]:
+    with _LOCK:
+        return frozenset(_STREAMS)
+
+
+def collect_changes(now: datetime | None = None, max_feed_age: float = PUSH_INTERVAL_SECONDS) -> Dict[str, bytes]:
+    """Rebuild every streamed display; return the payloads whose rows changed.
+
+    Blocking (it may fetch feeds), so the loop runs it in a worker thread.
+    """
+
+    changes: Dict[str, bytes] = {}
+    for display_id in streamed_displays():
+        try:
+            plan = display_plans.get_plan(display_id)
+            payload = bytes(display_pipeline.build_arrivals_payload(plan, now=now, max_feed_age=max_feed_age))
+        except Exception as exc:  # pragma: no cover - logging fallback
+            logger.warning("Push refresh failed for %s: %s", display_id, exc)
+            continue
+        rows = _visible_rows(payload)
+        with _LOCK:
+            stream = _STREAMS.get(display_id)
+            if stream is None or stream.rows == rows:
+                continue
+            stream.rows, stream.payload = rows, payload
+        changes[display_id] = payload
+    return changes
+
+
+def publish(changes: Dict[str, bytes]) -> int:
+    """Hand each changed payload to its subscribers; return how many were offered."""
+
+    offered = 0
+    for display_id, payload in changes.items():
+        with _LOCK:
+            stream = _STREAMS.get(display_id)
+            targets: List[Subscription] = list(stream.subscribers) if stream else []
+        for subscription in targets:
+            subscription.offer(payload)
+        offered += len(targets)
+    return offered
+
+
+async def refresh_once(now: datetime | None = None, max_feed_age: float = PUSH_INTERVAL_SECONDS) -> List[str]:
+    changes = await asyncio.to_thread(collect_changes, now, max_feed_age)
+    publish(changes)
+    return sorted(changes)
+
+
+async def run_push_loop(interval: float = PUSH_INTERVAL_SECONDS) -> None:
+    """Refresh streamed displays every ``interval`` seconds, on minute boundaries and on feed changes."""
+
+    global _LOOP, _WAKE
+    _LOOP = asyncio.get_running_loop()
+    _WAKE = asyncio.Event()
+    subscriptions.add_listener(_on_feed_changed)
+    try:
+        while True:
+            # Cleared before refreshing so changes seen mid-refresh trigger another pass.
+            _WAKE.clear()
+            if streamed_displays():
+                try:
+                    await refresh_once(max_feed_age=interval)
+                except Exception as exc:  # pragma: no cover - logging fallback
+                    logger.warning("Push refresh failed: %s", exc)
+            current = time.time()
+            wait = min(interval, (current // 60 + 1) * 60 - current + 0.05)
+            try:
+                await asyncio.wait_for(_WAKE.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        subscriptions.remove_listener(_on_feed_changed)
+        _LOOP = _WAKE = None
+
+
+def clear() -> None:
+    with _LOCK:
+        _STREAMS.clear()
+
+
+def _on_feed_changed(feed_url: str, display_ids: FrozenSet[str]) -> None:
+    loop, wake = _LOOP, _WAKE
+    if loop is None or wake is None or not display_ids & streamed_displays():
+        return
+    loop.call_soon_threadsafe(wake.set)
+
+
+def _visible_rows(payload: bytes) -> Any:
+    return json.loads(payload)["rows"]
@@ -0,0 +1,49 @@
+"""Readiness report built from in-memory feed state.
+
+Nothing here touches upstream, so load balancers can probe it as often as
+they like. A feed is degraded when its last fetch failed (or it has never
+been fetched successfully) or its circuit is not closed; the service is
+unavailable when every feed it has seen is degraded.
+
+Feeds are only refreshed when a request needs them, so an old snapshot on
+an idle instance says nothing about upstream. Snapshots older than
+``STALE_FEED_SECONDS`` are flagged ``stale`` for operators but do not
+count against readiness; otherwise an idle instance would fail its probe
+and be taken out of rotation with no traffic left to bring it back.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import asdict
+from typing import Any, Dict
+
+from esp32_mta_display.services import feed_cache
+
+STALE_FEED_SECONDS = 120.0
+
+
+def readiness_report(now: float | None = None) -> Dict[str, Any]:
+    """Return ``{"status": "ok"|"degraded"|"unavailable", "feeds": {url: {...}}}``."""
+
+    if now is None:
+        now = time.time()
+    feeds: Dict[str, Dict[str, Any]] = {}
+    degraded = 0
+    for url, status in feed_cache.feed_status(now).items():
+        entry = asdict(status)
+        del entry["url"]
+        entry["stale"] = status.age is not None and status.age > STALE_FEED_SECONDS
+        entry["degraded"] = status.age is None or status.error_streak > 0 or status.circuit != "closed"
+        if entry["age"] is not None:
+            entry["age"] = round(entry["age"], 3)
+        degraded += entry["degraded"]
+        feeds[url] = entry
+
+    if not degraded:
+        overall = "ok"
+    elif degraded == len(feeds):
+        overall = "unavailable"
+    else:
+        overall = "degraded"
+    return {"status": overall, "feeds": feeds}
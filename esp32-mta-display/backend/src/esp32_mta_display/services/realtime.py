@@ -3,20 +3,21 @@
 from __future__ import annotations
 
 import logging
-from typing import Callable, Dict, Iterable, List, Sequence, Union
+from typing import Dict, Iterable, List, Union
 
 from esp32_mta_display.models.arrivals import Arrival
-from esp32_mta_display.services import alias_resolver, feed_selector, mta, path
+from esp32_mta_display.services import agencies, alias_resolver, feed_cache
 
 logger = logging.getLogger(__name__)
 
 ArrivalResult = Union[str, List[Arrival]]
-FetchFn = Callable[[str], bytes]
-ParseFn = Callable[[bytes, str, Sequence[str]], List[Arrival]]
 
 
 def get_realtime_arrivals(stations_and_lines: List[Dict]) -> Dict[str, ArrivalResult]:
-    """Fetch arrivals for a batch of stations without raising exceptions."""
+    """Fetch arrivals for a batch of stations without raising exceptions.
+
+    Stations on the same feed share one fetch through the feed cache.
+    """
 
     entries = stations_and_lines or []
     results: Dict[str, ArrivalResult] = {}
@@ -28,7 +29,7 @@ def get_realtime_arrivals(stations_and_lines: List[Dict]) -> Dict[str, ArrivalRe
         lines = _normalize_lines(entry.get("lines"))
 
         if alias_source and (not entry_type or not station_id):
-            preferred_type = _infer_type_from_lines(lines)
+            preferred_type = agencies.infer_agency(lines)
             try:
                 resolved_type, resolved_station = alias_resolver.resolve_station_with_type(
                     alias_source, preferred_type
@@ -45,20 +46,15 @@ def get_realtime_arrivals(stations_and_lines: List[Dict]) -> Dict[str, ArrivalRe
             results[key] = "NO_FEED"
             continue
 
-        feed_url = _select_feed(entry_type, lines)
+        agency = agencies.get(entry_type)
+        feed_url = agency.find_feed(lines) if agency is not None else None
         if not feed_url:
             results[key] = "NO_FEED"
             continue
 
-        handlers = _get_handlers(entry_type)
-        if handlers is None:
-            results[key] = "NO_FEED"
-            continue
-
-        fetch_fn, parse_fn = handlers
         try:
-            raw_feed = fetch_fn(feed_url)
-            arrivals = parse_fn(raw_feed, station_id=station_id, allowed_routes=lines)
+            raw_feed = feed_cache.get_feed(feed_url, agency.fetch)
+            arrivals = agency.parse(raw_feed, station_id=station_id, allowed_routes=lines)
             arrivals.sort(key=lambda arrival: arrival.arrival_time)
             results[key] = arrivals
         except Exception as exc:  # pragma: no cover - safety net
@@ -76,29 +72,3 @@ def _normalize_lines(lines: Iterable[str] | None) -> List[str]:
     if not lines:
         return []
     return [line.strip().upper() for line in lines if line and line.strip()]
-
-
-def _infer_type_from_lines(lines: List[str]) -> str | None:
-    if not lines:
-        return None
-    for line in lines:
-        token = line.upper()
-        if "-" in token or token in {"JSQ-33", "HOB-33", "HOB-WTC", "NWK-WTC", "NWK_WTC", "JSQ-HOB"}:
-            return "PATH"
-    return "MTA"
-
-
-def _select_feed(entry_type: str, lines: List[str]) -> str | None:
-    if entry_type == "MTA":
-        return feed_selector.find_mta_feed(lines)
-    if entry_type == "PATH":
-        return feed_selector.find_path_feed(lines)
-    return None
-
-
-def _get_handlers(entry_type: str) -> tuple[FetchFn, ParseFn] | None:
-    if entry_type == "MTA":
-        return mta.fetch_mta_feed, mta.parse_mta_feed
-    if entry_type == "PATH":
-        return path.fetch_path_feed, path.parse_path_feed
-    return None
@@ -0,0 +1,108 @@
+"""Cache of rendered display frames keyed by display id and minute bucket.
+
+Countdowns are whole minutes, so a frame only changes when the minute
+rolls over or one of the feeds it was built from is refreshed. Each entry
+records the feed snapshot versions it used so newer data forces a render.
+Frames of different kinds (``"bmp"``, ``"json"``) are cached side by side.
+
+The newest frame of each display and kind is also kept apart from the
+cache itself, so ``latest`` can still hand it to a shedding request after
+a feed change has invalidated the display's entries.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Tuple
+
+from esp32_mta_display.utils import metrics
+
+ACTIVE_WINDOW_SECONDS = 180.0
+
+SnapshotToken = Tuple[Tuple[str, float], ...]
+
+
+@dataclass(frozen=True)
+class CachedFrame:
+    token: SnapshotToken
+    frame: memoryview
+
+
+# display_id -> {(bucket, kind): frame}, so writes and invalidation only
+# touch one display's handful of entries.
+_FRAMES: Dict[str, Dict[Tuple[int, str], CachedFrame]] = {}
+# (display_id, kind) -> (bucket, frame); survives ``invalidate``.
+_LATEST: Dict[Tuple[str, str], Tuple[int, memoryview]] = {}
+_LAST_REQUESTED: Dict[str, float] = {}
+_LOCK = threading.Lock()
+
+
+def minute_bucket(now: datetime) -> int:
+    """Return the epoch minute containing ``now``."""
+
+    return int(now.timestamp() // 60)
+
+
+def bucket_start(bucket: int) -> datetime:
+    return datetime.fromtimestamp(bucket * 60, tz=timezone.utc)
+
+
+def get(display_id: str, bucket: int, token: SnapshotToken, kind: str = "bmp") -> memoryview | None:
+    with _LOCK:
+        entry = _FRAMES.get(display_id, {}).get((bucket, kind))
+    if entry is None or entry.token != token:
+        metrics.CACHE_REQUESTS.inc("render", "miss")
+        return None
+    metrics.CACHE_REQUESTS.inc("render", "hit")
+    return entry.frame
+
+
+def latest(display_id: str, kind: str = "bmp") -> memoryview | None:
+    """Return the newest cached frame for ``display_id`` whatever its minute or feeds."""
+
+    with _LOCK:
+        entry = _LATEST.get((display_id, kind))
+    return entry[1] if entry is not None else None
+
+
+def put(display_id: str, bucket: int, token: SnapshotToken, frame: memoryview, kind: str = "bmp") -> None:
+    with _LOCK:
+        entries = _FRAMES.setdefault(display_id, {})
+        entries[(bucket, kind)] = CachedFrame(token=token, frame=frame)
+        newest = _LATEST.get((display_id, kind))
+        if newest is None or newest[0] <= bucket:
+            _LATEST[(display_id, kind)] = (bucket, frame)
+        # Only the current and the pre-rendered next minute are ever served.
+        for key in [key for key in entries if key[0] < bucket - 1]:
+            del entries[key]
+
+
+def invalidate(display_ids: Iterable[str]) -> None:
+    """Drop every cached frame for ``display_ids``; ``latest`` still answers."""
+
+    with _LOCK:
+        for display_id in display_ids:
+            _FRAMES.pop(display_id, None)
+
+
+def mark_requested(display_id: str) -> None:
+    with _LOCK:
+        _LAST_REQUESTED[display_id] = time.time()
+
+
+def active_displays(window: float = ACTIVE_WINDOW_SECONDS) -> List[str]:
+    """Return display ids requested within the last ``window`` seconds."""
+
+    cutoff = time.time() - window
+    with _LOCK:
+        return [display_id for display_id, seen in _LAST_REQUESTED.items() if seen >= cutoff]
+
+
+def clear() -> None:
+    with _LOCK:
+        _FRAMES.clear()
+        _LATEST.clear()
+        _LAST_REQUESTED.clear()
@@ -6,15 +6,21 @@ ESP32 client can display something real end-to-end.
 
 from __future__ import annotations
 
-from io import BytesIO
-from typing import Any, Sequence, Tuple
-
-from PIL import Image, ImageDraw, ImageFont
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
 
 from esp32_mta_display.models.arrivals import Arrival
+from esp32_mta_display.utils.bmp import (
+    SUPPORTED_INDEXED_BITS,
+    encode_indexed_bmp,
+    encode_truecolor_bmp,
+)
 from esp32_mta_display.utils.color import parse_hex_color
 from esp32_mta_display.utils.time import minutes_until, utc_now
 
+if TYPE_CHECKING:
+    from PIL import ImageDraw, ImageFont
+
 
 DEFAULT_TEMPLATE = {
     "background": "#000000",
@@ -24,6 +30,13 @@ DEFAULT_TEMPLATE = {
     "row_spacing": 4,
 }
 
+DEFAULT_OUTPUT = {
+    "bits_per_pixel": 24,
+    "compression": "none",
+}
+
+Color = Tuple[int, int, int]
+
 
 def _get_layout_size(config: dict[str, Any]) -> Tuple[int, int]:
     """Return (width, height) from config or default to 240x320."""
@@ -34,22 +47,104 @@ def _get_layout_size(config: dict[str, Any]) -> Tuple[int, int]:
     return width, height
 
 
+def _get_output_format(config: dict[str, Any]) -> Tuple[int, bool]:
+    """Return (bits_per_pixel, rle) from the optional ``output`` section."""
+
+    output = {**DEFAULT_OUTPUT, **(config.get("output") or {})}
+    bits = int(output.get("bits_per_pixel") or 24)
+    compression = str(output.get("compression") or "none").strip().lower()
+
+    if bits != 24 and bits not in SUPPORTED_INDEXED_BITS:
+        raise ValueError(f"Unsupported bits_per_pixel: {bits}")
+    if compression not in {"none", "rle"}:
+        raise ValueError(f"Unsupported compression: {compression}")
+    rle = compression == "rle"
+    if rle and bits not in (4, 8):
+        raise ValueError("RLE compression is only available for 4-bit and 8-bit output")
+    return bits, rle
+
+
+def _compile_palette(colors: Sequence[Color]) -> Tuple[List[Color], Dict[Color, int]]:
+    """Return the unique template colors in order plus a color -> index map."""
+
+    palette: List[Color] = []
+    indices: Dict[Color, int] = {}
+    for color in colors:
+        if color not in indices:
+            indices[color] = len(palette)
+            palette.append(color)
+    return palette, indices
+
+
+def validate_display_config(config: dict[str, Any]) -> None:
+    """Raise ``ValueError`` if the layout, template or output settings cannot render."""
+
+    width, height = _get_layout_size(config)
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Layout size must be positive, got {width}x{height}")
+
+    template = {**DEFAULT_TEMPLATE, **(config.get("template") or {})}
+    colors = []
+    for key in ("background", "text_color"):
+        value = template.get(key)
+        color = parse_hex_color(value, None)  # type: ignore[arg-type]
+        if color is None:
+            raise ValueError(f"Invalid template color for {key}: {value!r}")
+        colors.append(color)
+    for key in ("max_rows", "row_spacing"):
+        int(template.get(key, DEFAULT_TEMPLATE[key]))
+
+    bits, _rle = _get_output_format(config)
+    palette, _indices = _compile_palette(colors)
+    if bits != 24 and len(palette) > 1 << bits:
+        raise ValueError(f"Template needs {len(palette)} colors; {bits}-bit output holds {1 << bits}")
+
+
 def render_display_bitmap(
     display_id: str,
     display_config: dict[str, Any],
     arrivals: Sequence[Arrival] | None = None,
+    now: datetime | None = None,
 ) -> bytes:
     """Render a simple template-driven BMP image for the given display."""
 
+    return bytes(render_display_frame(display_id, display_config, arrivals=arrivals, now=now))
+
+
+def render_display_frame(
+    display_id: str,
+    display_config: dict[str, Any],
+    arrivals: Sequence[Arrival] | None = None,
+    now: datetime | None = None,
+) -> memoryview:
+    """Render a display into a read-only view over a preallocated BMP buffer.
+
+    Output defaults to 24-bit; an ``output`` section can request a 1/4/8-bit
+    palette (optionally RLE compressed) built from the template colors.
+    """
+
+    # Pillow is the slowest import in the package; only rendering needs it.
+    from PIL import Image, ImageDraw, ImageFont
+
     width, height = _get_layout_size(display_config)
+    bits, rle = _get_output_format(display_config)
     template = {**DEFAULT_TEMPLATE, **(display_config.get("template") or {})}
 
     background_color = parse_hex_color(template.get("background"), (0, 0, 0))
     text_color = parse_hex_color(template.get("text_color"), (255, 255, 255))
-    max_rows = int(template.get("max_rows", DEFAULT_TEMPLATE["max_rows"]))
     row_spacing = int(template.get("row_spacing", DEFAULT_TEMPLATE["row_spacing"]))
 
-    image = Image.new("RGB", (width, height), color=background_color)
+    if bits == 24:
+        image = Image.new("RGB", (width, height), color=background_color)
+        ink: Any = text_color
+    else:
+        # Drawing palette indices directly keeps text aliasing off, so the
+        # frame never holds colors outside the compiled palette.
+        palette, indices = _compile_palette([background_color, text_color])
+        if len(palette) > 1 << bits:
+            raise ValueError(f"Template needs {len(palette)} colors; {bits}-bit output holds {1 << bits}")
+        image = Image.new("P", (width, height), color=indices[background_color])
+        ink = indices[text_color]
     draw = ImageDraw.Draw(image)
 
     font = ImageFont.load_default()
@@ -58,24 +153,35 @@ def render_display_bitmap(
     y = padding
 
     title = (display_config.get("layout", {}) or {}).get("title") or f"Display {display_id}"
-    _draw_text(draw, title, font, text_color, padding, y, width - padding * 2)
+    _draw_text(draw, title, font, ink, padding, y, width - padding * 2)
     y += line_height + row_spacing * 2
 
-    arrivals = list(arrivals or [])
-    now = utc_now()
-
-    if not arrivals:
-        _draw_centered_text(draw, "NO DATA", font, text_color, width, height)
+    rows = select_rows(display_config, arrivals, now)
+    if not rows:
+        _draw_centered_text(draw, "NO DATA", font, ink, width, height)
     else:
-        for arrival in arrivals[:max_rows]:
-            minutes = max(minutes_until(arrival.arrival_time, now), 0)
+        for arrival, minutes in rows:
             row_text = f"{arrival.line:<3} {minutes:>2} min  {arrival.destination}"
-            _draw_text(draw, row_text, font, text_color, padding, y, width - padding * 2)
+            _draw_text(draw, row_text, font, ink, padding, y, width - padding * 2)
             y += line_height + row_spacing
 
-    buffer = BytesIO()
-    image.save(buffer, format="BMP")
-    return buffer.getvalue()
+    if bits == 24:
+        return encode_truecolor_bmp(image)
+    return encode_indexed_bmp(image, palette, bits, compress=rle)
+
+
+def select_rows(
+    display_config: dict,
+    arrivals: Sequence[Arrival] | None,
+    now: datetime | None = None,
+) -> List[Tuple[Arrival, int]]:
+    """Return the ``(arrival, minutes)`` rows a display shows, in order."""
+
+    template = display_config.get("template") or {}
+    max_rows = int(template.get("max_rows", DEFAULT_TEMPLATE["max_rows"]))
+    if now is None:
+        now = utc_now()
+    return [(arrival, max(minutes_until(arrival.arrival_time, now), 0)) for arrival in list(arrivals or [])[:max_rows]]
 
 
 def _measure_text_height(font: ImageFont.ImageFont) -> int:
@@ -91,7 +197,7 @@ def _draw_text(
     draw: ImageDraw.ImageDraw,
     text: str,
     font: ImageFont.ImageFont,
-    color: Tuple[int, int, int],
+    color: Color | int,
     x: int,
     y: int,
     max_width: int,
@@ -139,7 +245,7 @@ def _draw_centered_text(
     draw: ImageDraw.ImageDraw,
     text: str,
     font: ImageFont.ImageFont,
-    color: Tuple[int, int, int],
+    color: Color | int,
     width: int,
     height: int,
 ) -> None:
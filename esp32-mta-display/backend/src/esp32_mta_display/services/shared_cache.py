@@ -0,0 +1,414 @@
+"""Cache tier shared by every worker of a multi-process deployment.
+
+With ``uvicorn --workers N`` each worker has its own feed and render
+caches. When a shared store is configured, workers first look for feed
+snapshots and rendered frames there. A per-feed lease elects a single
+worker to fetch from upstream while the others wait briefly for its
+snapshot, and frames rendered by one worker are reused by the rest
+because snapshots read from the store carry the same ``fetched_at``.
+
+Stores implement ``get``/``set``/``add``/``delete``/``delete_if`` with TTLs:
+
+* ``FileStore`` keeps one memory-mapped file per key in a shared directory
+  (``/dev/shm`` on Linux), so readers share the pages instead of copying.
+* ``RedisStore`` speaks to Redis, or anything with redis-py's API.
+* ``MemoryStore`` is the in-process stand-in used in tests.
+
+Configure with ``configure(store)`` or the ``ESP32_MTA_SHARED_CACHE``
+environment variable (``file:/dev/shm/esp32-mta-display``,
+``redis://localhost:6379/0`` or ``memory``). Without either, every helper
+here is a no-op and each worker uses its local caches only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ENV = "ESP32_MTA_SHARED_CACHE"
+# Upper bound on one upstream fetch; the lease expires on its own after this.
+FETCH_LEASE_SECONDS = 10.0
+# How long a worker that lost the election waits for the winner's snapshot.
+LEASE_WAIT_SECONDS = 2.0
+LEASE_POLL_SECONDS = 0.05
+SNAPSHOT_TTL_SECONDS = 300.0
+FRAME_TTL_SECONDS = 120.0
+# How often a FileStore writer also clears out expired and abandoned files.
+SWEEP_INTERVAL_SECONDS = 30.0
+
+# Identifies this process as a lease holder.
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}".encode("ascii")
+
+_EXPIRY = struct.Struct("<d")
+_FETCHED_AT = struct.Struct("<d")
+
+
+class MemoryStore:
+    """In-process store with the same semantics as the shared backends."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._values[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._values[key] = (time.time() + ttl, bytes(value))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set ``key`` only if it is absent (or expired); return whether it was set."""
+
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and entry[0] > time.time():
+                return False
+            self._values[key] = (time.time() + ttl, bytes(value))
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        """Delete ``key`` only while it still holds ``value``; return whether it did."""
+
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None or entry[0] <= time.time() or entry[1] != value:
+                return False
+            del self._values[key]
+            return True
+
+
+class FileStore:
+    """One memory-mapped file per key under ``directory``.
+
+    Each file starts with its expiry time. Writes go to a temporary file
+    that is renamed (or, for ``add``, hard-linked) into place, so readers
+    never see a partial value and mappings of replaced files stay valid. Expired files are unlinked when
+    read, and writers ``sweep`` the directory every
+    ``SWEEP_INTERVAL_SECONDS`` so keys nobody reads again (old frames) do
+    not pile up in tmpfs.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+
+    def get(self, key: str) -> memoryview | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                inode = os.fstat(handle.fileno()).st_ino
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError: empty file, left behind by something other than us.
+            return None
+        view = memoryview(mapped)
+        if len(view) < _EXPIRY.size:
+            return None
+        if _EXPIRY.unpack_from(view)[0] <= time.time():
+            _unlink_if_same(path, inode)
+            return None
+        return view[_EXPIRY.size :]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        path = self._path(key)
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, "wb") as handle:
+            handle.write(_EXPIRY.pack(time.time() + ttl))
+            handle.write(value)
+        os.replace(tmp_path, path)
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Unlink expired values and abandoned temporary files; return how many."""
+
+        now = time.time()
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.name.endswith(".tmp"):
+                    # Writers rename within milliseconds; older ones crashed.
+                    expired = entry.stat().st_mtime < now - SWEEP_INTERVAL_SECONDS
+                else:
+                    with open(entry.path, "rb") as handle:
+                        header = handle.read(_EXPIRY.size)
+                    expired = len(header) == _EXPIRY.size and _EXPIRY.unpack(header)[0] <= now
+                if expired and _unlink_if_same(entry.path, entry.inode()):
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        # The lease is written in full under a temporary name and hard-linked
+        # into place, so it appears complete or not at all and only one
+        # writer's link can succeed.
+        path = self._path(key)
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, "wb") as handle:
+            handle.write(_EXPIRY.pack(time.time() + ttl))
+            handle.write(value)
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, path)
+                    return True
+                except FileExistsError:
+                    if not _clear_expired(path):
+                        return False
+            return False
+        finally:
+            os.unlink(tmp_path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                inode = os.fstat(handle.fileno()).st_ino
+                data = handle.read()
+        except FileNotFoundError:
+            return False
+        if data[_EXPIRY.size :] != value:
+            return False
+        return _unlink_if_same(path, inode)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest())
+
+
+def _tmp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _clear_expired(path: str) -> bool:
+    """Unlink ``path`` if its value has expired; return whether it is gone.
+
+    A file too short to hold an expiry is treated as live: it can only be
+    a value someone else is still writing.
+    """
+
+    try:
+        with open(path, "rb") as handle:
+            inode = os.fstat(handle.fileno()).st_ino
+            header = handle.read(_EXPIRY.size)
+    except FileNotFoundError:
+        return True
+    if len(header) < _EXPIRY.size or _EXPIRY.unpack(header)[0] > time.time():
+        return False
+    return _unlink_if_same(path, inode)
+
+
+def _unlink_if_same(path: str, inode: int) -> bool:
+    # Skip files replaced since we looked at them (a fresh value or lease).
+    try:
+        if os.stat(path).st_ino != inode:
+            return False
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+# Compare-and-delete in one round trip, so it cannot race another client.
+_DELETE_IF_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisStore:
+    """Store backed by Redis (or any client exposing redis-py's ``get``/``set``/``delete``)."""
+
+    def __init__(self, client=None, url: str | None = None) -> None:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(key, bytes(value), px=int(ttl * 1000))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(self.client.set(key, bytes(value), px=int(ttl * 1000), nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        return bool(self.client.eval(_DELETE_IF_SCRIPT, 1, key, bytes(value)))
+
+
+_STORE: MemoryStore | FileStore | RedisStore | None = None
+_CONFIGURED = False
+_LOCK = threading.Lock()
+
+
+def store_from_url(url: str) -> MemoryStore | FileStore | RedisStore:
+    if url == "memory":
+        return MemoryStore()
+    if url.startswith("file:"):
+        path = url[len("file:") :]
+        # file:///dev/shm/x and file:/dev/shm/x both name /dev/shm/x.
+        return FileStore(path[2:] if path.startswith("//") else path)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url=url)
+    raise ValueError(f"unsupported shared cache URL {url!r}")
+
+
+def configure(store: MemoryStore | FileStore | RedisStore | None) -> None:
+    """Use ``store`` as the shared tier (``None`` disables it)."""
+
+    global _STORE, _CONFIGURED
+    with _LOCK:
+        _STORE = store
+        _CONFIGURED = True
+
+
+def get_store() -> MemoryStore | FileStore | RedisStore | None:
+    global _STORE, _CONFIGURED
+    if not _CONFIGURED:
+        with _LOCK:
+            if not _CONFIGURED:
+                url = os.environ.get(SHARED_CACHE_ENV)
+                if url:
+                    try:
+                        _STORE = store_from_url(url)
+                    except Exception as exc:
+                        logger.warning("Shared cache %s unavailable, using local caches only: %s", url, exc)
+                _CONFIGURED = True
+    return _STORE
+
+
+def clear() -> None:
+    """Forget the configured store so the environment is read again (tests)."""
+
+    global _STORE, _CONFIGURED
+    with _LOCK:
+        _STORE = None
+        _CONFIGURED = False
+
+
+# --- Feed snapshots --------------------------------------------------------
+
+
+def load_snapshot(feed_url: str, max_age: float) -> Tuple[bytes, float] | None:
+    """Return ``(payload, fetched_at)`` of a shared snapshot no older than ``max_age``."""
+
+    store = get_store()
+    if store is None:
+        return None
+    value = _safe_call(store.get, f"feed:{feed_url}")
+    if value is None or len(value) < _FETCHED_AT.size:
+        return None
+    fetched_at = _FETCHED_AT.unpack_from(value)[0]
+    if time.time() - fetched_at > max_age:
+        return None
+    return bytes(value[_FETCHED_AT.size :]), fetched_at
+
+
+def publish_snapshot(feed_url: str, payload: bytes, fetched_at: float) -> None:
+    store = get_store()
+    if store is not None:
+        _safe_call(store.set, f"feed:{feed_url}", _FETCHED_AT.pack(fetched_at) + payload, SNAPSHOT_TTL_SECONDS)
+
+
+def acquire_fetch(feed_url: str) -> bool:
+    """Try to become the worker that fetches ``feed_url``; ``True`` without a shared store."""
+
+    store = get_store()
+    if store is None:
+        return True
+    added = _safe_call(store.add, f"lease:{feed_url}", WORKER_ID, FETCH_LEASE_SECONDS)
+    # A broken store must not stop fetching altogether.
+    return True if added is None else bool(added)
+
+
+def release_fetch(feed_url: str) -> None:
+    """Drop this worker's lease; one that expired and was taken over stays put."""
+
+    store = get_store()
+    if store is not None:
+        _safe_call(store.delete_if, f"lease:{feed_url}", WORKER_ID)
+
+
+def wait_for_snapshot(feed_url: str, max_age: float, timeout: float = LEASE_WAIT_SECONDS) -> Tuple[bytes, float] | None:
+    """Poll for the elected fetcher's snapshot for up to ``timeout`` seconds."""
+
+    deadline = time.monotonic() + timeout
+    while True:
+        shared = load_snapshot(feed_url, max_age)
+        if shared is not None or time.monotonic() >= deadline:
+            return shared
+        time.sleep(LEASE_POLL_SECONDS)
+
+
+# --- Rendered frames -------------------------------------------------------
+
+
+def load_frame(display_id: str, kind: str, bucket: int, token: Tuple[Tuple[str, float], ...]) -> memoryview | None:
+    store = get_store()
+    if store is None:
+        return None
+    value = _safe_call(store.get, _frame_key(display_id, kind, bucket, token))
+    return memoryview(value) if value is not None else None
+
+
+def publish_frame(
+    display_id: str, kind: str, bucket: int, token: Tuple[Tuple[str, float], ...], frame: memoryview
+) -> None:
+    store = get_store()
+    if store is not None:
+        _safe_call(store.set, _frame_key(display_id, kind, bucket, token), bytes(frame), FRAME_TTL_SECONDS)
+
+
+def _frame_key(display_id: str, kind: str, bucket: int, token: Tuple[Tuple[str, float], ...]) -> str:
+    digest = hashlib.blake2b(repr(token).encode("utf-8"), digest_size=12).hexdigest()
+    return f"frame:{display_id}:{kind}:{bucket}:{digest}"
+
+
+def _safe_call(method, *args):
+    # The shared tier is an optimization; on errors fall back to local work.
+    try:
+        return method(*args)
+    except Exception as exc:  # pragma: no cover - logging fallback
+        logger.warning("Shared cache %s failed: %s", getattr(method, "__name__", "call"), exc)
+        return None
@@ -0,0 +1,219 @@
+"""MTA station index compiled from a static GTFS zip.
+
+``run_import_gtfs.py`` reads ``stops.txt`` and ``routes.txt`` (plus
+``trips.txt``/``stop_times.txt`` when present, for the routes serving each
+stop) from a local GTFS zip and writes a compact marshal file next to the
+other config. The server loads that file once; name lookups are a single
+normalization and a dict hit, and nothing here touches the network.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import marshal
+import re
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+INDEX_FILENAME = "station_index.bin"
+
+# GTFS stop names abbreviate ("23 St", "Times Sq-42 St"); people don't.
+_NAME_TOKENS = {
+    "street": "st",
+    "avenue": "av",
+    "ave": "av",
+    "square": "sq",
+    "road": "rd",
+    "place": "pl",
+    "boulevard": "blvd",
+    "parkway": "pkwy",
+    "heights": "hts",
+    "center": "ctr",
+    "centre": "ctr",
+}
+_ORDINAL = re.compile(r"^(\d+)(st|nd|rd|th)$")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class StationStop:
+    stop_id: str
+    name: str
+    parent_station: str
+    # Trailing direction letter of a platform id (MTA "F23N" -> "N").
+    direction: str
+    routes: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class StationIndex:
+    stops: Dict[str, StationStop] = field(default_factory=dict)
+    # normalized name -> station-level stop ids, in stops.txt order
+    names: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    route_names: Dict[str, str] = field(default_factory=dict)
+
+    def get(self, stop_id: str) -> StationStop | None:
+        return self.stops.get(stop_id)
+
+    def find_stations(self, name: str) -> Tuple[StationStop, ...]:
+        """Return every station whose name normalizes to the same key as ``name``."""
+
+        return tuple(self.stops[stop_id] for stop_id in self.names.get(normalize_name(name), ()))
+
+    def resolve_stop(self, name: str, route: str | None = None, direction: str = "N") -> str | None:
+        """Return the platform id for ``name`` served by ``route``, or ``None``.
+
+        ``None`` is returned both for unknown names and for names shared by
+        several stations that ``route`` does not narrow down to one.
+        """
+
+        candidates = self.find_stations(name)
+        route_key = (route or "").strip().upper()
+        if route_key and len(candidates) > 1:
+            candidates = tuple(stop for stop in candidates if route_key in stop.routes)
+        if len(candidates) != 1:
+            return None
+        station = candidates[0]
+        platform = f"{station.stop_id}{direction.strip().upper()}" if direction else station.stop_id
+        return platform if platform in self.stops else station.stop_id
+
+    def __len__(self) -> int:
+        return len(self.stops)
+
+
+_INDEX: StationIndex | None = None
+_LOCK = threading.Lock()
+
+
+def get_index() -> StationIndex:
+    """Return the process-wide index, loading the compiled file on first use.
+
+    A missing or outdated file yields an empty index so alias lookups keep
+    working from ``aliases.yml`` alone.
+    """
+
+    global _INDEX
+    if _INDEX is None:
+        with _LOCK:
+            if _INDEX is None:
+                path = _default_index_path()
+                try:
+                    _INDEX = load_index(path)
+                except FileNotFoundError:
+                    logger.info("No station index at %s; run run_import_gtfs.py to build one", path)
+                    _INDEX = StationIndex()
+                except (ValueError, EOFError, KeyError, TypeError) as exc:
+                    logger.warning("Ignoring station index %s: %s", path, exc)
+                    _INDEX = StationIndex()
+    return _INDEX
+
+
+def clear() -> None:
+    global _INDEX
+    with _LOCK:
+        _INDEX = None
+
+
+def load_index(path: Path) -> StationIndex:
+    """Load an index written by ``write_index``; raise ``ValueError`` if incompatible."""
+
+    data = marshal.loads(Path(path).read_bytes())
+    if not isinstance(data, dict) or data.get("version") != INDEX_FORMAT_VERSION:
+        raise ValueError("unsupported station index format")
+    stops = {row[0]: StationStop(*row) for row in data["stops"]}
+    return StationIndex(stops=stops, names=data["names"], route_names=data["route_names"])
+
+
+def write_index(index: StationIndex, path: Path) -> None:
+    payload = {
+        "version": INDEX_FORMAT_VERSION,
+        "stops": [
+            (stop.stop_id, stop.name, stop.parent_station, stop.direction, stop.routes)
+            for stop in index.stops.values()
+        ],
+        "names": index.names,
+        "route_names": index.route_names,
+    }
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(marshal.dumps(payload))
+    tmp_path.replace(path)
+
+
+def build_index(zip_path: Path) -> StationIndex:
+    """Compile a ``StationIndex`` from a static GTFS zip."""
+
+    with zipfile.ZipFile(zip_path) as archive:
+        members = set(archive.namelist())
+        if "stops.txt" not in members:
+            raise ValueError(f"{zip_path} has no stops.txt")
+        stop_rows = list(_read_csv(archive, "stops.txt"))
+        route_names: Dict[str, str] = {}
+        if "routes.txt" in members:
+            for row in _read_csv(archive, "routes.txt"):
+                route_id = row["route_id"]
+                route_names[route_id] = row.get("route_short_name") or row.get("route_long_name") or route_id
+        stop_routes = _routes_by_stop(archive) if {"trips.txt", "stop_times.txt"} <= members else {}
+
+    parents = {row["stop_id"]: (row.get("parent_station") or "").strip() for row in stop_rows}
+    # Stations inherit the routes of their platforms.
+    for stop_id, parent in parents.items():
+        if parent and stop_id in stop_routes:
+            stop_routes.setdefault(parent, set()).update(stop_routes[stop_id])
+
+    stops: Dict[str, StationStop] = {}
+    names: Dict[str, List[str]] = {}
+    for row in stop_rows:
+        stop_id = row["stop_id"]
+        name = (row.get("stop_name") or "").strip()
+        parent = parents[stop_id]
+        direction = ""
+        if parent and stop_id.startswith(parent) and len(stop_id) == len(parent) + 1:
+            direction = stop_id[-1].upper()
+        routes = tuple(sorted(stop_routes.get(stop_id, ())))
+        stops[stop_id] = StationStop(stop_id, name, parent, direction, routes)
+        if not parent and name:
+            names.setdefault(normalize_name(name), []).append(stop_id)
+
+    return StationIndex(
+        stops=stops,
+        names={key: tuple(ids) for key, ids in names.items()},
+        route_names=route_names,
+    )
+
+
+def normalize_name(name: str) -> str:
+    words = []
+    for word in _WORD.findall((name or "").lower()):
+        ordinal = _ORDINAL.match(word)
+        if ordinal:
+            word = ordinal.group(1)
+        words.append(_NAME_TOKENS.get(word, word))
+    return "".join(words)
+
+
+def _routes_by_stop(archive: zipfile.ZipFile) -> Dict[str, Set[str]]:
+    trip_routes = {row["trip_id"]: row["route_id"] for row in _read_csv(archive, "trips.txt")}
+    stop_routes: Dict[str, Set[str]] = {}
+    for row in _read_csv(archive, "stop_times.txt"):
+        route_id = trip_routes.get(row["trip_id"])
+        if route_id:
+            stop_routes.setdefault(row["stop_id"], set()).add(route_id)
+    return stop_routes
+
+
+def _read_csv(archive: zipfile.ZipFile, name: str) -> Iterable[Dict[str, str]]:
+    with archive.open(name) as raw:
+        yield from csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+
+
+def _default_index_path() -> Path:
+    return Path(__file__).resolve().parent.parent / "config" / INDEX_FILENAME
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Dict, Iterable, List
 
-from esp32_mta_display.services import alias_resolver, realtime
+from esp32_mta_display.services import agencies, alias_resolver, realtime, station_index
 from esp32_mta_display.utils import time as time_utils
 
 PATH_STATION_NAME_MAP = {
@@ -22,23 +22,9 @@ PATH_STATION_NAME_MAP = {
     "NWK": "NWK",
     "WTC": "WTC",
     "WORLDTRADECENTER": "WTC",
-    "WORLTRTRADECENTER": "WTC",
     "WORLDTRADECENTRE": "WTC",
 }
 
-PATH_LINE_TO_ROUTE_ID = {
-    "HOB-33": "859",
-    "HOB33": "859",
-    "JSQ-33": "861",
-    "JSQ33": "861",
-    "HOB-WTC": "860",
-    "HOBWTC": "860",
-    "NWK-WTC": "862",
-    "NWKWTC": "862",
-    "JSQ-HOB": "1024",
-    "JSQHOB": "1024",
-}
-
 MTA_STATION_NAME_MAP = {
     "23ST": "F23N",
     "23STREET": "F23N",
@@ -64,8 +50,12 @@ def compile_realtime_status(pairs: List[dict]) -> List[dict]:
         if alias_type and not type_code:
             type_code = alias_type
 
-        station_id = (pair.get("station_id") or "").strip() or alias_station_id or _resolve_station_id(type_code, station_name)
         line_token = _normalize_line_token(line_name)
+        station_id = (
+            (pair.get("station_id") or "").strip()
+            or alias_station_id
+            or _resolve_station_id(type_code, station_name, line_token)
+        )
         arrival_match = _resolve_arrival_line_match(type_code, line_token)
 
         entry = {
@@ -124,22 +114,24 @@ def compile_realtime_status(pairs: List[dict]) -> List[dict]:
 def _normalize_type(value: str | None) -> str | None:
     if not value:
         return None
-    normalized = value.strip().upper()
-    return normalized if normalized in {"MTA", "PATH"} else None
+    agency = agencies.get(value)
+    return agency.code if agency is not None else None
 
 
 def _normalize_station_key(value: str) -> str:
     return "".join(ch for ch in value.upper() if ch.isalnum())
 
 
-def _resolve_station_id(type_code: str | None, station_name: str) -> str | None:
+def _resolve_station_id(type_code: str | None, station_name: str, line_token: str | None = None) -> str | None:
     if not type_code or not station_name:
         return None
     key = _normalize_station_key(station_name)
     if type_code == "PATH":
         return PATH_STATION_NAME_MAP.get(key)
     if type_code == "MTA":
-        return MTA_STATION_NAME_MAP.get(key, "F23N")
+        # Unknown names resolve through the imported GTFS stops (using the
+        # line to pick between same-named stations) rather than guessing.
+        return MTA_STATION_NAME_MAP.get(key) or station_index.get_index().resolve_stop(station_name, route=line_token)
     return None
 
 
@@ -152,10 +144,8 @@ def _normalize_line_token(line_name: str) -> str | None:
 def _resolve_arrival_line_match(type_code: str | None, line_token: str | None) -> str | None:
     if not type_code or not line_token:
         return None
-    if type_code == "PATH":
-        key = line_token.replace(" ", "")
-        return PATH_LINE_TO_ROUTE_ID.get(key, line_token)
-    return line_token
+    agency = agencies.get(type_code)
+    return agency.arrival_line(line_token) if agency is not None else line_token
 
 
 def _find_matching_arrival(arrivals: Iterable, match_line: str | None):
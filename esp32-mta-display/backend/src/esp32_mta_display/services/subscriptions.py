@@ -0,0 +1,112 @@
+"""Reverse index from feeds and stops to the displays that depend on them.
+
+``display_plans`` keeps the index current as plans are compiled and
+recompiled. When the feed cache stores a snapshot whose payload differs
+from the previous one, only the dependent displays have their cached
+frames dropped and change listeners notified.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from esp32_mta_display.services import render_cache
+
+logger = logging.getLogger(__name__)
+
+ChangeListener = Callable[[str, FrozenSet[str]], None]
+
+_BY_FEED: Dict[str, Set[str]] = {}
+_BY_STOP: Dict[Tuple[str, str], Set[str]] = {}
+_BY_DISPLAY: Dict[str, Set[Tuple[str, str]]] = {}
+_LISTENERS: List[ChangeListener] = []
+_LOCK = threading.Lock()
+
+
+def update_display(display_id: str, subscriptions: Iterable[Tuple[str, str]]) -> None:
+    """Replace the (feed_url, stop_id) pairs ``display_id`` depends on."""
+
+    wanted = set(subscriptions)
+    with _LOCK:
+        if _BY_DISPLAY.get(display_id, set()) == wanted:
+            return
+        for feed_url, stop_id in _BY_DISPLAY.pop(display_id, set()):
+            _discard(_BY_FEED, feed_url, display_id)
+            _discard(_BY_STOP, (feed_url, stop_id), display_id)
+        for feed_url, stop_id in wanted:
+            _BY_FEED.setdefault(feed_url, set()).add(display_id)
+            _BY_STOP.setdefault((feed_url, stop_id), set()).add(display_id)
+        if wanted:
+            _BY_DISPLAY[display_id] = wanted
+
+
+def remove_display(display_id: str) -> None:
+    update_display(display_id, ())
+
+
+def displays_for_feed(feed_url: str) -> FrozenSet[str]:
+    with _LOCK:
+        return frozenset(_BY_FEED.get(feed_url, ()))
+
+
+def displays_for_stop(feed_url: str, stop_id: str) -> FrozenSet[str]:
+    with _LOCK:
+        return frozenset(_BY_STOP.get((feed_url, stop_id), ()))
+
+
+def add_listener(listener: ChangeListener) -> None:
+    """Call ``listener(feed_url, display_ids)`` whenever dependent data changes."""
+
+    with _LOCK:
+        _LISTENERS.append(listener)
+
+
+def remove_listener(listener: ChangeListener) -> None:
+    with _LOCK:
+        if listener in _LISTENERS:
+            _LISTENERS.remove(listener)
+
+
+def feed_changed(feed_url: str, stop_ids: Iterable[str] | None = None) -> FrozenSet[str]:
+    """Invalidate displays that depend on ``feed_url`` (optionally only ``stop_ids``).
+
+    Returns the affected display ids.
+    """
+
+    with _LOCK:
+        if stop_ids is None:
+            affected = frozenset(_BY_FEED.get(feed_url, ()))
+        else:
+            affected = frozenset(
+                display_id for stop_id in stop_ids for display_id in _BY_STOP.get((feed_url, stop_id), ())
+            )
+        listeners = list(_LISTENERS)
+
+    if not affected:
+        return affected
+    render_cache.invalidate(affected)
+    for listener in listeners:
+        try:
+            listener(feed_url, affected)
+        except Exception as exc:  # pragma: no cover - listener safety
+            logger.warning("Feed change listener failed for %s: %s", feed_url, exc)
+    return affected
+
+
+def clear() -> None:
+    with _LOCK:
+        _BY_FEED.clear()
+        _BY_STOP.clear()
+        _BY_DISPLAY.clear()
+        _LISTENERS.clear()
+
+
+def _discard(index: dict, key, display_id: str) -> None:
+    members = index.get(key)
+    if members is None:
+        return
+    members.discard(display_id)
+    if not members:
+        del index[key]
@@ -0,0 +1,216 @@
+"""Low-level BMP encoding helpers.
+
+Pillow only writes 1-bit and 8-bit uncompressed palette BMPs, so the
+4-bit and RLE4/RLE8 variants are assembled here from raw pixel indices.
+Every encoder writes headers and pixels into one preallocated buffer and
+returns a read-only ``memoryview`` so frames can be served without copies.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+from typing import TYPE_CHECKING, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+BI_RGB = 0
+BI_RLE8 = 1
+BI_RLE4 = 2
+
+SUPPORTED_INDEXED_BITS = (1, 4, 8)
+
+_FILE_HEADER = struct.Struct("<2sIHHI")
+_INFO_HEADER = struct.Struct("<IiiHHIIiiII")
+_PIXELS_PER_METER = 3780  # 96 DPI, matches Pillow's default
+_RUN_PATTERN = re.compile(rb"(.)\1*", re.DOTALL)
+_RAWMODES = {1: "P;1", 4: "P;4", 8: "P"}
+
+
+def encode_truecolor_bmp(image: Image.Image) -> memoryview:
+    """Encode an "RGB" image as a 24-bit BMP in a single preallocated buffer."""
+
+    width, height = image.size
+    stride = _row_stride(width, 24)
+    frame, offset = _allocate_frame(width, height, 24, (), BI_RGB, stride * height)
+    frame[offset:] = image.tobytes("raw", ("BGR", stride, -1))
+    return memoryview(frame).toreadonly()
+
+
+def encode_indexed_bmp(
+    image: Image.Image,
+    palette: Sequence[Tuple[int, int, int]],
+    bits: int,
+    compress: bool = False,
+) -> memoryview:
+    """Encode a "P" mode image as a 1/4/8-bit BMP with the given palette.
+
+    ``compress`` selects BI_RLE8 for 8-bit and BI_RLE4 for 4-bit output;
+    the BMP format has no run-length mode for 1-bit images.
+    """
+
+    if bits not in SUPPORTED_INDEXED_BITS:
+        raise ValueError(f"Unsupported palette depth: {bits}")
+    _check_palette(palette, bits)
+    if compress and bits == 1:
+        raise ValueError("RLE compression requires a 4-bit or 8-bit palette")
+
+    width, height = image.size
+    if compress:
+        compression = BI_RLE8 if bits == 8 else BI_RLE4
+        frame, offset = _allocate_frame(width, height, bits, palette, compression, 0)
+        _encode_rle(frame, image.tobytes(), width, height, bits)
+        _write_headers(frame, width, height, bits, palette, compression, len(frame) - offset)
+    else:
+        stride = _row_stride(width, bits)
+        frame, offset = _allocate_frame(width, height, bits, palette, BI_RGB, stride * height)
+        frame[offset:] = image.tobytes("raw", (_RAWMODES[bits], stride, -1))
+    return memoryview(frame).toreadonly()
+
+
+def _row_stride(width: int, bits: int) -> int:
+    return ((width * bits + 31) // 32) * 4
+
+
+def _check_palette(palette: Sequence[Tuple[int, int, int]], bits: int) -> None:
+    if len(palette) > 1 << bits:
+        raise ValueError(f"{len(palette)} colors do not fit in a {bits}-bit palette")
+
+
+def _allocate_frame(
+    width: int,
+    height: int,
+    bits: int,
+    palette: Sequence[Tuple[int, int, int]],
+    compression: int,
+    pixel_size: int,
+) -> Tuple[bytearray, int]:
+    """Return a buffer sized for headers, palette and pixels plus the pixel offset."""
+
+    offset = _FILE_HEADER.size + _INFO_HEADER.size + 4 * len(palette)
+    frame = bytearray(offset + pixel_size)
+    _write_headers(frame, width, height, bits, palette, compression, pixel_size)
+    return frame, offset
+
+
+def _write_headers(
+    frame: bytearray,
+    width: int,
+    height: int,
+    bits: int,
+    palette: Sequence[Tuple[int, int, int]],
+    compression: int,
+    pixel_size: int,
+) -> None:
+    offset = _FILE_HEADER.size + _INFO_HEADER.size + 4 * len(palette)
+    _FILE_HEADER.pack_into(frame, 0, b"BM", offset + pixel_size, 0, 0, offset)
+    _INFO_HEADER.pack_into(
+        frame,
+        _FILE_HEADER.size,
+        _INFO_HEADER.size,
+        width,
+        height,
+        1,
+        bits,
+        compression,
+        pixel_size,
+        _PIXELS_PER_METER,
+        _PIXELS_PER_METER,
+        len(palette),
+        len(palette),
+    )
+    table_start = _FILE_HEADER.size + _INFO_HEADER.size
+    for index, (r, g, b) in enumerate(palette):
+        frame[table_start + 4 * index : table_start + 4 * index + 4] = bytes((b, g, r, 0))
+
+
+def _encode_rle(out: bytearray, indices: bytes, width: int, height: int, bits: int) -> None:
+    """Append top-down 8-bit indices to ``out`` as bottom-up RLE8/RLE4 rows."""
+
+    encode_row = _encode_rle8_row if bits == 8 else _encode_rle4_row
+    previous_row: bytes | None = None
+    previous_encoded = b""
+    for y in range(height - 1, -1, -1):
+        row = indices[y * width : (y + 1) * width]
+        # Background rows repeat a lot; reuse the last encoding when possible.
+        if row != previous_row:
+            previous_row = row
+            previous_encoded = encode_row(row)
+        out += previous_encoded
+        out += b"\x00\x00"  # end of line
+    out[-2:] = b"\x00\x01"  # last end-of-line becomes end of bitmap
+
+
+def _split_runs(row: bytes) -> list[tuple[int, int]]:
+    return [(match.end() - match.start(), row[match.start()]) for match in _RUN_PATTERN.finditer(row)]
+
+
+def _encode_rle8_row(row: bytes) -> bytes:
+    out = bytearray()
+    literal = bytearray()
+    for count, value in _split_runs(row):
+        if count == 1:
+            literal.append(value)
+            continue
+        _flush_literal(out, literal, 255, _pack_rle8_literal)
+        while count:
+            step = min(count, 255)
+            out.extend((step, value))
+            count -= step
+    _flush_literal(out, literal, 255, _pack_rle8_literal)
+    return bytes(out)
+
+
+def _encode_rle4_row(row: bytes) -> bytes:
+    out = bytearray()
+    literal = bytearray()
+    for count, value in _split_runs(row):
+        if count == 1:
+            literal.append(value)
+            continue
+        _flush_literal(out, literal, 252, _pack_rle4_literal, even=True)
+        pair = (value << 4) | value
+        while count:
+            step = min(count, 255)
+            out.extend((step, pair))
+            count -= step
+    _flush_literal(out, literal, 252, _pack_rle4_literal, even=True)
+    return bytes(out)
+
+
+def _flush_literal(out: bytearray, literal: bytearray, limit: int, pack, even: bool = False) -> None:
+    """Emit pending single pixels in absolute mode (or as runs of one).
+
+    ``even`` keeps absolute runs to an even pixel count; several RLE4
+    decoders (Pillow's included) drop the final nibble of odd runs.
+    """
+
+    while literal:
+        size = min(len(literal), limit)
+        if even and size % 2:
+            size -= 1
+        # Absolute mode needs at least three pixels; shorter stretches are
+        # cheaper as encoded runs of length one.
+        if size < 3:
+            size = min(len(literal), 2)
+            for value in literal[:size]:
+                out.extend((1, pack(bytes((value,)))[0]))
+            del literal[:size]
+            continue
+        chunk = bytes(literal[:size])
+        del literal[:size]
+        packed = pack(chunk)
+        out.extend((0, len(chunk)))
+        out.extend(packed)
+        if len(packed) % 2:
+            out.append(0)  # absolute runs are padded to a word boundary
+
+
+def _pack_rle8_literal(chunk: bytes) -> bytes:
+    return chunk
+
+
+def _pack_rle4_literal(chunk: bytes) -> bytes:
+    padded = chunk + b"\x00" if len(chunk) % 2 else chunk
+    return bytes((padded[i] << 4) | padded[i + 1] for i in range(0, len(padded), 2))
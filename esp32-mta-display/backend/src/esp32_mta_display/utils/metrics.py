@@ -0,0 +1,245 @@
+"""Minimal in-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms with fixed label names, cheap enough to
+record on every request: an observation is a dict lookup, a ``bisect``
+and a few additions under a per-metric lock. ``/metrics`` serves
+``render()``. The instruments the backend records are defined at the
+bottom so every module shares the same series.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_REGISTRY: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def reset(self) -> None:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def _check(self, labels: LabelValues) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            values = self._values
+            if labels not in values:
+                self._check(labels)
+                values[labels] = 0.0
+            values[labels] += amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(f"{self.name}_total", labels, value) for labels, value in items]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """A settable gauge, or one computed at scrape time by ``collect``."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, *labels: str) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        if self._collect is not None:
+            return [(self.name, labels, value) for labels, value in self._collect()]
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, labels, value) for labels, value in items]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                self._check(labels)
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            row = self._values.get(labels)
+            return int(sum(row[:-1])) if row else 0
+
+    def samples(self) -> Iterable[Tuple[str, LabelValues, float]]:
+        with self._lock:
+            items = [(labels, list(row)) for labels, row in self._values.items()]
+        out: List[Tuple[str, LabelValues, float]] = []
+        for labels, row in items:
+            cumulative = 0.0
+            for bound, hits in zip(self.buckets + (math.inf,), row[:-1]):
+                cumulative += hits
+                out.append((f"{self.name}_bucket", labels + (_format_value(bound),), cumulative))
+            out.append((f"{self.name}_count", labels, cumulative))
+            out.append((f"{self.name}_sum", labels, row[-1]))
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+def render() -> str:
+    """Return every registered metric in the Prometheus text format."""
+
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for sample_name, labels, value in metric.samples():
+            names = metric.labelnames + (("le",) if sample_name.endswith("_bucket") else ())
+            lines.append(f"{sample_name}{_format_labels(names, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Zero every metric (tests)."""
+
+    for metric in _REGISTRY:
+        metric.reset()
+
+
+def _format_labels(names: Sequence[str], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# --- Instruments -----------------------------------------------------------
+
+_SECONDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+FEED_FETCH_SECONDS = Histogram("feed_fetch_seconds", "Time to fetch a feed payload.", ("feed",), _SECONDS)
+FEED_BYTES = Histogram("feed_bytes", "Size of fetched feed payloads.", ("feed",), _BYTES)
+FEED_PARSE_SECONDS = Histogram("feed_parse_seconds", "Time to decode a feed snapshot.", ("feed",), _SECONDS)
+FEED_ENTITIES = Histogram(
+    "feed_entities", "Entities per decoded feed snapshot.", ("feed",), (0, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+RENDER_SECONDS = Histogram("render_seconds", "Time to render a display.", ("display", "format"), _SECONDS)
+RESPONSE_BYTES = Histogram("response_bytes", "Size of display response bodies.", ("display", "format"), _BYTES)
+CACHE_REQUESTS = Counter("cache_requests", "Cache lookups by cache and result.", ("cache", "result"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+
+def _cache_hit_ratios() -> List[Tuple[LabelValues, float]]:
+    ratios = []
+    for cache in ("feed", "parse", "render"):
+        hits = CACHE_REQUESTS.value(cache, "hit")
+        total = hits + CACHE_REQUESTS.value(cache, "miss")
+        if total:
+            ratios.append(((cache,), hits / total))
+    return ratios
+
+
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio", "Share of cache lookups served from cache since start.", ("cache",), collect=_cache_hit_ratios
+)
+
+
+class InFlightMiddleware:
+    """ASGI middleware keeping ``http_requests_in_flight`` current."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
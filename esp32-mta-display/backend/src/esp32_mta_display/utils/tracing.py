@@ -0,0 +1,154 @@
+"""Per-request stage timing for ``Server-Timing`` headers and a trace log.
+
+``TracingMiddleware`` starts a ``Trace`` for each HTTP request; code on the
+request path wraps its stages in ``span("fetch")`` and friends. Spans with
+the same name are summed, so a display reading two feeds reports one
+``fetch`` entry. The context variable follows ``asyncio.to_thread``, so
+work done in worker threads lands in the request's trace; outside a
+request ``span`` costs a single context variable lookup.
+
+Set ``ESP32_MTA_TRACE_LOG`` (or call ``configure``) to also append one JSON
+line per request to a local file, so slow requests can be picked out later.
+Lines go through a ``QueueHandler`` and a listener thread does the file
+I/O, so a slow disk never blocks the event loop.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from esp32_mta_display.utils import fast_json
+
+TRACE_LOG_ENV = "ESP32_MTA_TRACE_LOG"
+
+_CURRENT: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("trace", default=None)
+_LOG_PATH: str | None = None
+_LOG_LOCK = threading.Lock()
+_LISTENER: logging.handlers.QueueListener | None = None
+# Carries trace-log lines only; never propagates to the application's logs.
+_TRACE_LOGGER = logging.getLogger(f"{__name__}.log")
+_TRACE_LOGGER.propagate = False
+_TRACE_LOGGER.setLevel(logging.INFO)
+
+
+class Trace:
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.started = time.perf_counter()
+        # name -> accumulated seconds, in first-seen order
+        self.spans: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Return the ``Server-Timing`` header value, durations in milliseconds."""
+
+        with self._lock:
+            items: List[Tuple[str, float]] = list(self.spans.items())
+        items.append(("total", self.elapsed()))
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in items)
+
+
+def current() -> Trace | None:
+    return _CURRENT.get()
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name`` of the current request, if any."""
+
+    trace = _CURRENT.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def configure(log_path: str | None) -> None:
+    """Enable (path) or disable (``None``) the JSON-lines trace log.
+
+    Disabling flushes lines still queued before returning.
+    """
+
+    global _LOG_PATH, _LISTENER
+    with _LOG_LOCK:
+        for handler in list(_TRACE_LOGGER.handlers):
+            _TRACE_LOGGER.removeHandler(handler)
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            for handler in _LISTENER.handlers:
+                handler.close()
+            _LISTENER = None
+        _LOG_PATH = log_path or None
+        if _LOG_PATH is None:
+            return
+        file_handler = logging.FileHandler(_LOG_PATH, encoding="utf-8", delay=True)
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        lines: queue.SimpleQueue = queue.SimpleQueue()
+        _TRACE_LOGGER.addHandler(logging.handlers.QueueHandler(lines))
+        _LISTENER = logging.handlers.QueueListener(lines, file_handler)
+        _LISTENER.start()
+
+
+def write_log(trace: Trace, status: int) -> None:
+    if _LOG_PATH is None:
+        return
+    record = {
+        "ts": round(time.time(), 3),
+        "request": trace.label,
+        "status": status,
+        "total_ms": round(trace.elapsed() * 1000, 2),
+        "spans_ms": {name: round(seconds * 1000, 2) for name, seconds in list(trace.spans.items())},
+    }
+    _TRACE_LOGGER.info(fast_json.dumps(record).decode("utf-8"))
+
+
+class TracingMiddleware:
+    """ASGI middleware: one trace per HTTP request, reported as ``Server-Timing``."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace = Trace(f"{scope.get('method', '')} {scope.get('path', '')}")
+        token = _CURRENT.set(trace)
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _CURRENT.reset(token)
+            write_log(trace, status)
+
+
+configure(os.environ.get(TRACE_LOG_ENV))
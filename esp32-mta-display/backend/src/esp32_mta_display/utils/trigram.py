@@ -0,0 +1,59 @@
+"""Typo-tolerant string search backed by a trigram inverted index."""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from itertools import chain
+from typing import Dict, Generic, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def trigrams(key: str) -> frozenset:
+    """Return the trigrams of ``key`` padded so short keys still get some."""
+
+    padded = f"^{key}$"
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex(Generic[T]):
+    """Rank stored keys by Dice similarity of their trigram sets.
+
+    Keys are expected to be normalized already; each key carries an
+    arbitrary payload returned with its score.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, T]]) -> None:
+        self._keys: List[str] = []
+        self._payloads: List[T] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for key, payload in entries:
+            if not key:
+                continue
+            grams = trigrams(key)
+            position = len(self._keys)
+            self._keys.append(key)
+            self._payloads.append(payload)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, key: str, limit: int = 5, min_score: float = 0.0) -> List[Tuple[float, str, T]]:
+        """Return up to ``limit`` ``(score, key, payload)`` tuples, best first."""
+
+        grams = trigrams(key)
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in grams))
+        query_size = len(grams)
+        sizes = self._sizes
+        scored = (
+            (2.0 * count / (query_size + sizes[position]), -position)
+            for position, count in shared.items()
+        )
+        # Ties go to the entry indexed first so results are deterministic.
+        best = heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+        return [(score, self._keys[-neg], self._payloads[-neg]) for score, neg in best]
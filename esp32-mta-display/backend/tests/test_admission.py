@@ -0,0 +1,92 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.main import app
+from esp32_mta_display.services import admission, feed_cache, render_cache
+
+FEED = "https://feeds.example/a"
+
+EMPTY_FEED = gtfs_realtime_pb2.FeedMessage()
+EMPTY_FEED.header.gtfs_realtime_version = "2.0"
+EMPTY_BYTES = EMPTY_FEED.SerializeToString()
+
+
+class LimiterTests(unittest.TestCase):
+    def test_refuses_beyond_limit_until_released(self) -> None:
+        limiter = admission.Limiter("test", 2)
+        self.assertTrue(limiter.try_acquire())
+        self.assertTrue(limiter.try_acquire())
+        self.assertFalse(limiter.try_acquire(timeout=0.01))
+        limiter.release()
+        self.assertTrue(limiter.try_acquire())
+        self.assertEqual(limiter.in_use, 2)
+
+
+class LoadSheddingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+        self.addCleanup(feed_cache.clear)
+        self.addCleanup(admission.configure, admission.MAX_CONCURRENT_RENDERS, admission.MAX_CONCURRENT_FETCHES)
+
+    def test_saturated_fetch_stage_serves_stale_snapshot(self) -> None:
+        feed_cache.get_snapshot(FEED, lambda url: b"old")
+        admission.configure(max_fetches=0)
+        fetch = Mock(return_value=b"new")
+
+        with patch.object(admission, "FETCH_WAIT_SECONDS", 0.0):
+            snapshot = feed_cache.get_snapshot(FEED, fetch, max_age=0)
+            self.assertEqual(snapshot.payload, b"old")
+            with self.assertRaises(admission.Overloaded):
+                feed_cache.get_snapshot("https://feeds.example/cold", fetch)
+        fetch.assert_not_called()
+
+    def test_saturated_render_stage_serves_cached_frame_or_503(self) -> None:
+        client = TestClient(app)
+        now = datetime.now(timezone.utc)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            fresh = client.get("/display/example.bmp")
+            admission.configure(max_renders=0)
+            with patch("esp32_mta_display.routers.display.utc_now", return_value=now + timedelta(minutes=2)):
+                stale = client.get("/display/example.bmp")
+            render_cache.clear()
+            refused = client.get("/display/example.bmp")
+
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.content, fresh.content)
+        self.assertIn("shed;dur=", stale.headers["server-timing"])
+        self.assertEqual(refused.status_code, 503)
+        self.assertEqual(refused.headers["retry-after"], str(admission.RETRY_AFTER_SECONDS))
+        self.assertEqual(refused.json(), {"detail": {"error": "overloaded", "stage": "render"}})
+
+    def test_saturated_batch_serves_cached_parts_or_503(self) -> None:
+        client = TestClient(app)
+        admission.configure(max_fetches=0)
+        with patch.object(admission, "FETCH_WAIT_SECONDS", 0.0), patch(
+            "esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES
+        ) as fetch, patch("esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES):
+            refused = client.get("/display/batch", params={"ids": ["example"]})
+            self.assertEqual(refused.status_code, 503)
+            self.assertEqual(refused.headers["retry-after"], str(admission.RETRY_AFTER_SECONDS))
+            self.assertEqual(refused.json(), {"detail": {"error": "overloaded", "stage": "fetch"}})
+            fetch.assert_not_called()
+
+            admission.configure(max_fetches=admission.MAX_CONCURRENT_FETCHES)
+            fresh = client.get("/display/batch", params={"ids": ["example"]})
+            admission.configure(max_renders=0)
+            stale = client.get("/display/batch", params={"ids": ["example"]})
+
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.json(), fresh.json())
+        self.assertEqual(admission.RENDERS.in_use, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.services import (
+    agencies,
+    display_pipeline,
+    display_plans,
+    feed_cache,
+    feed_registry,
+    realtime,
+    render_cache,
+)
+
+
+def build_feed(route_id: str, stop_id: str, when: datetime) -> bytes:
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    feed.header.timestamp = int(when.timestamp())
+    entity = feed.entity.add(id="1")
+    entity.trip_update.trip.route_id = route_id
+    update = entity.trip_update.stop_time_update.add(stop_id=stop_id)
+    update.arrival.time = int(when.timestamp())
+    return feed.SerializeToString()
+
+
+class AgencyRegistryTests(unittest.TestCase):
+    def test_infer_agency_uses_feed_index_and_line_rules(self) -> None:
+        self.assertEqual(agencies.infer_agency(["1", "JSQ-33"]), "PATH")
+        self.assertEqual(agencies.infer_agency(["nwk_wtc"]), "PATH")
+        self.assertEqual(agencies.infer_agency(["A"]), "MTA")
+        self.assertEqual(agencies.infer_agency(["unknown"]), "MTA")
+        self.assertIsNone(agencies.infer_agency([]))
+        self.assertEqual(agencies.get("path").arrival_line("NWK-WTC"), "862")
+
+
+class LocalFeedAgencyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.arrival_time = datetime(2030, 1, 1, 12, 5, tzinfo=timezone.utc)
+        feed_path = Path(self._tmp.name) / "lirr.pb"
+        feed_path.write_bytes(build_feed("BABYLON", "LIRR1", self.arrival_time))
+        self.feed_url = f"file://{feed_path}"
+
+        registry = feed_registry.get_registry()
+        rows = registry.rows + [{"feed_type": "LIRR", "route": "BABYLON", "feed_url": self.feed_url}]
+        patcher = patch.object(feed_registry, "_REGISTRY", feed_registry.build_registry(rows))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        agencies.register(agencies.Agency(code="lirr"))
+        self.addCleanup(agencies.unregister, "LIRR")
+        for cache in (feed_cache, display_plans, render_cache):
+            cache.clear()
+            self.addCleanup(cache.clear)
+
+    def test_registered_agency_flows_through_realtime_and_plans(self) -> None:
+        result = realtime.get_realtime_arrivals([{"type": "LIRR", "station_id": "LIRR1", "lines": ["babylon"]}])
+        self.assertEqual([arrival.arrival_time for arrival in result["LIRR:LIRR1"]], [self.arrival_time])
+        self.assertIsNotNone(feed_cache.peek(self.feed_url))
+
+        plan = display_plans.compile_plan("lirr", {"lirr": {"station_id": "LIRR1", "lines": ["Babylon"]}})
+        self.assertEqual(plan.sources, (display_plans.FeedSource("lirr", "LIRR1", ("BABYLON",), self.feed_url),))
+        with patch("esp32_mta_display.services.renderer.render_display_frame", return_value=memoryview(b"BM")) as render:
+            display_pipeline.build_display_frame(plan, now=self.arrival_time)
+        self.assertEqual([arrival.line for arrival in render.call_args.kwargs["arrivals"]], ["BABYLON"])
+
+    def test_plan_outliving_its_agency_renders_without_its_rows(self) -> None:
+        plan = display_plans.compile_plan("lirr", {"lirr": {"station_id": "LIRR1", "lines": ["Babylon"]}})
+        agencies.unregister("LIRR")
+        render_frame = patch("esp32_mta_display.services.renderer.render_display_frame", return_value=memoryview(b"BM"))
+        with render_frame as render, self.assertLogs(display_pipeline.logger, "WARNING") as logs:
+            display_pipeline.build_display_frame(plan, now=self.arrival_time)
+
+        self.assertEqual(render.call_args.kwargs["arrivals"], [])
+        self.assertIn("agency LIRR is not registered", logs.output[0])
+        self.assertIsNone(feed_cache.peek(self.feed_url))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,18 @@
+import asyncio
+import time
 import unittest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
 from unittest.mock import patch
 
+import httpx
 from fastapi.testclient import TestClient
 from google.transit import gtfs_realtime_pb2
+from PIL import Image
 
 from esp32_mta_display.main import app
 from esp32_mta_display.models.arrivals import Arrival
-from esp32_mta_display.services import renderer
+from esp32_mta_display.services import display_pipeline, display_plans, feed_cache, mta, prerender, render_cache, renderer
 from esp32_mta_display.services.config_loader import load_display_config
 
 EMPTY_FEED = gtfs_realtime_pb2.FeedMessage()
@@ -16,6 +21,18 @@ EMPTY_FEED.header.incrementality = gtfs_realtime_pb2.FeedHeader.FULL_DATASET
 EMPTY_FEED.header.timestamp = 0
 EMPTY_BYTES = EMPTY_FEED.SerializeToString()
 
+
+def build_feed(route_id: str, stop_id: str, times) -> bytes:
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    for index, when in enumerate(times):
+        entity = feed.entity.add(id=str(index))
+        entity.trip_update.trip.route_id = route_id
+        update = entity.trip_update.stop_time_update.add(stop_id=stop_id)
+        update.arrival.time = int(when.timestamp())
+    return feed.SerializeToString()
+
+
 class RendererTests(unittest.TestCase):
     def test_renderer_outputs_bmp_header(self) -> None:
         config = load_display_config("example")
@@ -23,8 +40,65 @@ class RendererTests(unittest.TestCase):
         data = renderer.render_display_bitmap("example", config, arrivals=[arrival])
         self.assertTrue(data.startswith(b"BM"))
 
+    def test_renderer_indexed_output_matches_truecolor_palette(self) -> None:
+        config = load_display_config("example")
+        arrival = Arrival(line="1", destination="Test", arrival_time=datetime.now(timezone.utc))
+        full = renderer.render_display_bitmap("example", config, arrivals=[arrival])
+
+        decoded = {}
+        for bits, compression in ((1, "none"), (4, "none"), (4, "rle"), (8, "rle")):
+            indexed_config = {**config, "output": {"bits_per_pixel": bits, "compression": compression}}
+            data = renderer.render_display_bitmap("example", indexed_config, arrivals=[arrival])
+            self.assertTrue(data.startswith(b"BM"))
+            self.assertLess(len(data), len(full) // 5)
+
+            image = Image.open(BytesIO(data))
+            self.assertEqual(image.size, (240, 320))
+            rgb = image.convert("RGB")
+            self.assertEqual({color for _, color in rgb.getcolors()}, {(0, 0, 0), (0, 255, 0)})
+            decoded[(bits, compression)] = rgb.tobytes()
+
+        self.assertEqual(len(set(decoded.values())), 1)
+
+    def test_truecolor_frame_matches_pillow_encoder(self) -> None:
+        config = load_display_config("example")
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        arrival = Arrival(line="1", destination="Test", arrival_time=now + timedelta(minutes=3))
+        frame = renderer.render_display_frame("example", config, arrivals=[arrival], now=now)
+        self.assertTrue(frame.readonly)
+
+        expected = BytesIO()
+        Image.open(BytesIO(bytes(frame))).save(expected, format="BMP")
+        self.assertEqual(bytes(frame), expected.getvalue())
+
+    def test_uncompressed_8bit_frame_round_trips(self) -> None:
+        config = load_display_config("example")
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        arrival = Arrival(line="1", destination="Test", arrival_time=now + timedelta(minutes=3))
+        rle_config = {**config, "output": {"bits_per_pixel": 8, "compression": "rle"}}
+        rle = renderer.render_display_frame("example", rle_config, arrivals=[arrival], now=now)
+        indexed_config = {**config, "output": {"bits_per_pixel": 8, "compression": "none"}}
+        frame = renderer.render_display_frame("example", indexed_config, arrivals=[arrival], now=now)
+        again = renderer.render_display_frame("example", indexed_config, arrivals=[arrival], now=now)
+        self.assertTrue(frame.readonly)
+        self.assertEqual(bytes(frame), bytes(again))
+
+        image = Image.open(BytesIO(bytes(frame)))
+        self.assertEqual((image.mode, image.size, image.info.get("compression")), ("P", (240, 320), 0))
+        self.assertEqual(len(frame), 14 + 40 + 4 * 2 + 240 * 320)
+        self.assertEqual(image.convert("RGB").tobytes(), Image.open(BytesIO(bytes(rle))).convert("RGB").tobytes())
+
+    def test_renderer_rejects_unsupported_output(self) -> None:
+        config = {**load_display_config("example"), "output": {"bits_per_pixel": 1, "compression": "rle"}}
+        with self.assertRaises(ValueError):
+            renderer.render_display_bitmap("example", config, arrivals=[])
+
 
 class DisplayEndpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+
     def test_display_endpoint_returns_bmp(self) -> None:
         client = TestClient(app)
         with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
@@ -34,6 +108,147 @@ class DisplayEndpointTests(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response.content.startswith(b"BM"))
 
+    def test_arrivals_endpoint_returns_the_rendered_rows(self) -> None:
+        client = TestClient(app)
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        times = [now + timedelta(minutes=minutes) for minutes in range(8, 0, -1)]
+        with patch(
+            "esp32_mta_display.services.mta.fetch_mta_feed", return_value=build_feed("1", "123N", times)
+        ), patch("esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.display_pipeline.utc_now", return_value=now + timedelta(seconds=5)
+        ):
+            response = client.get("/display/example/arrivals")
+            missing = client.get("/display/nope/arrivals")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/json")
+        self.assertEqual(missing.status_code, 404)
+        body = response.json()
+        self.assertEqual(body["display_id"], "example")
+        self.assertEqual(len(body["rows"]), 6)
+        self.assertEqual([row["minutes"] for row in body["rows"]][:3], [1, 2, 3])
+        self.assertEqual(body["rows"][0]["epoch"], int(times[-1].timestamp()))
+        self.assertEqual(set(body["rows"][0]), {"line", "destination", "minutes", "epoch"})
+        self.assertLess(len(response.content), 600)
+
+    def test_arrivals_payload_is_shared_within_a_minute(self) -> None:
+        plan = display_plans.get_plan("example")
+        now = datetime(2025, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            first = display_pipeline.build_arrivals_payload(plan, now=now)
+            second = display_pipeline.build_arrivals_payload(plan, now=now + timedelta(seconds=30))
+        self.assertIs(first, second)
+        self.assertEqual(bytes(first), b'{"display_id":"example","generated_at":1735732800,"rows":[]}')
+
+    def test_batch_fetches_each_shared_feed_once(self) -> None:
+        example = display_plans.get_plan("example")
+        other = display_plans.compile_plan("other", dict(example.config, display_id="other"))
+        now = datetime(2025, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES) as fetch_mta, patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ) as fetch_path, patch("esp32_mta_display.services.mta.decode_feed", wraps=mta.decode_feed) as decode:
+            results = display_pipeline.build_batch([example, other], kind="bmp", now=now)
+
+        self.assertEqual(set(results), {"example", "other"})
+        self.assertTrue(all(bytes(frame).startswith(b"BM") for frame in results.values()))
+        self.assertEqual(fetch_mta.call_count, 1)
+        self.assertEqual(fetch_path.call_count, 1)
+        self.assertEqual(decode.call_count, 2)
+
+    def test_batch_endpoint_reports_each_display(self) -> None:
+        client = TestClient(app)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            response = client.get("/display/batch", params={"ids": ["example", "nope", "example"]})
+            frames = client.get("/display/batch", params={"ids": ["example"], "format": "bmp"})
+            empty = client.get("/display/batch")
+
+        self.assertEqual(response.status_code, 200)
+        displays = response.json()["displays"]
+        self.assertEqual(list(displays), ["example", "nope"])
+        self.assertEqual(displays["example"]["rows"], [])
+        self.assertEqual(displays["nope"], {"error": "unknown display id"})
+        self.assertEqual(frames.status_code, 200)
+        self.assertTrue(frames.headers["content-type"].startswith("multipart/mixed; boundary="))
+        self.assertIn(b"Content-ID: <example>\r\nContent-Length: ", frames.content)
+        self.assertIn(b"\r\n\r\nBM", frames.content)
+        self.assertEqual(empty.status_code, 400)
+
+
+class RequestCoalescingTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+
+    async def test_concurrent_requests_share_one_build(self) -> None:
+        build = display_pipeline.build_display_frame
+
+        def slow_build(*args, **kwargs):
+            time.sleep(0.05)
+            return build(*args, **kwargs)
+
+        transport = httpx.ASGITransport(app=app)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ), patch(
+            "esp32_mta_display.services.display_pipeline.build_display_frame", side_effect=slow_build
+        ) as built:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(*(client.get("/display/example.bmp") for _ in range(5)))
+
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertEqual(len({response.content for response in responses}), 1)
+        self.assertEqual(built.call_count, 1)
+
+
+class PrerenderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+
+    def test_prerendered_frame_is_served_after_boundary(self) -> None:
+        now = datetime(2025, 1, 1, 12, 0, 55, tzinfo=timezone.utc)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            render_cache.mark_requested("example")
+            self.assertEqual(prerender.prerender_next_minute(now=now), ["example"])
+
+            with patch("esp32_mta_display.services.renderer.render_display_frame") as mock_render:
+                frame = display_pipeline.build_display_frame(
+                    display_plans.get_plan("example"), now=now + timedelta(seconds=10)
+                )
+
+        mock_render.assert_not_called()
+        self.assertEqual(bytes(frame[:2]), b"BM")
+
+    def test_inactive_displays_are_skipped(self) -> None:
+        self.assertEqual(prerender.prerender_next_minute(), [])
+
+
+class RenderCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        render_cache.clear()
+        self.addCleanup(render_cache.clear)
+
+    def test_pruning_and_invalidation_stay_within_one_display(self) -> None:
+        render_cache.put("kiosk", 10, (), memoryview(b"kiosk"))
+        for bucket in range(10, 14):
+            for kind in ("bmp", "json"):
+                render_cache.put("lobby", bucket, (), memoryview(b"%d" % bucket), kind=kind)
+
+        self.assertIsNone(render_cache.get("lobby", 11, (), kind="json"))
+        self.assertEqual(bytes(render_cache.get("lobby", 12, ())), b"12")
+        self.assertEqual(bytes(render_cache.get("kiosk", 10, ())), b"kiosk")
+        self.assertEqual(bytes(render_cache.latest("lobby", "json")), b"13")
+
+        render_cache.invalidate(["lobby"])
+        self.assertIsNone(render_cache.get("lobby", 13, ()))
+        self.assertEqual(bytes(render_cache.get("kiosk", 10, ())), b"kiosk")
+
 
 if __name__ == "__main__":
     unittest.main()
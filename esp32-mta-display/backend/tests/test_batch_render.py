@@ -0,0 +1,65 @@
+# pyright: reportMissingImports=false
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from google.transit import gtfs_realtime_pb2
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from esp32_mta_display.services import batch_render, feed_cache, render_cache
+import run_batch_render
+
+MAIN_FEED = "https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs"
+
+EMPTY_FEED = gtfs_realtime_pb2.FeedMessage()
+EMPTY_FEED.header.gtfs_realtime_version = "2.0"
+EMPTY_FEED.header.timestamp = 0
+EMPTY_BYTES = EMPTY_FEED.SerializeToString()
+
+
+@patch("esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES)
+@patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES)
+class BatchRenderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+
+    def test_pool_fetches_each_feed_once(self, mock_fetch_mta, mock_fetch_path) -> None:
+        results = batch_render.render_displays(["example", "example", "missing"], workers=2)
+
+        self.assertEqual([result.display_id for result in results], ["example", "example", "missing"])
+        self.assertTrue(results[0].frame.startswith(b"BM"))
+        self.assertEqual(results[0].frame, results[1].frame)
+        self.assertIsNone(results[2].frame)
+        self.assertIsNotNone(results[2].error)
+        mock_fetch_mta.assert_called_once()
+        mock_fetch_path.assert_called_once()
+
+    def test_failed_prefetch_is_not_retried_per_display(self, mock_fetch_mta, mock_fetch_path) -> None:
+        mock_fetch_mta.side_effect = OSError("connection reset")
+        with self.assertLogs("esp32_mta_display.services.display_pipeline", "WARNING"):
+            results = batch_render.render_displays(["example", "example"], workers=1)
+
+        self.assertTrue(all(result.frame.startswith(b"BM") for result in results))
+        mock_fetch_mta.assert_called_once()
+        status = feed_cache.feed_status()[MAIN_FEED]
+        self.assertEqual((status.circuit, status.last_error), ("open", "OSError: connection reset"))
+
+    def test_cli_writes_frames(self, mock_fetch_mta, mock_fetch_path) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exit_code = run_batch_render.main(["example", "--workers", "1", "--output-dir", tmp_dir])
+            self.assertEqual(exit_code, 0)
+            self.assertTrue((Path(tmp_dir) / "example.bmp").read_bytes().startswith(b"BM"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from esp32_mta_display.services import config_bundle, config_loader, feed_registry
+
+FEEDS_CSV = "feed_type,route,feed_url\nMTA,ACE,https://example.test/ace\n"
+DISPLAY_YML = "layout:\n  title: Lobby\n"
+
+
+class ConfigBundleTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / "displays").mkdir()
+        (self.root / "feeds.csv").write_text(FEEDS_CSV, encoding="utf-8")
+        (self.root / "aliases.yml").write_text("aliases:\n  lobby: \"MTA:A27N\"\n", encoding="utf-8")
+        (self.root / "displays" / "lobby.yml").write_text(DISPLAY_YML, encoding="utf-8")
+
+        for patcher in (
+            patch.object(config_bundle, "config_dir", return_value=str(self.root)),
+            patch.object(config_loader, "_displays_dir", return_value=str(self.root / "displays")),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        config_bundle.clear()
+        config_loader.clear_cache()
+        self.addCleanup(config_bundle.clear)
+        self.addCleanup(config_loader.clear_cache)
+        self.addCleanup(self._tmp.cleanup)
+
+    def _write_bundle(self) -> None:
+        config_bundle.write_bundle(config_bundle.build_bundle())
+        config_bundle.clear()
+
+    def test_bundle_serves_parsed_sources_without_yaml(self) -> None:
+        self._write_bundle()
+        with patch("yaml.safe_load", side_effect=AssertionError("parsed YAML")):
+            self.assertEqual(config_loader.load_display_config("lobby"), {"layout": {"title": "Lobby"}})
+            self.assertEqual(config_bundle.load_source("aliases.yml"), {"aliases": {"lobby": "MTA:A27N"}})
+        rows = config_bundle.load_source("feeds.csv")
+        self.assertEqual(feed_registry.build_registry(rows).find_feed("MTA", "C"), "https://example.test/ace")
+
+    def test_changed_source_falls_back_to_parsing(self) -> None:
+        self._write_bundle()
+        path = self.root / "displays" / "lobby.yml"
+        path.write_text("layout:\n  title: Edited lobby\n", encoding="utf-8")
+        self.assertIsNone(config_bundle.load_source("displays/lobby.yml"))
+        self.assertEqual(config_loader.load_display_config("lobby")["layout"]["title"], "Edited lobby")
+
+    def test_other_paths_and_bad_bundles_are_ignored(self) -> None:
+        self._write_bundle()
+        other = self.root / "copy.yml"
+        other.write_text(DISPLAY_YML, encoding="utf-8")
+        self.assertIsNone(config_bundle.load_source("displays/lobby.yml", path=str(other)))
+
+        (self.root / config_bundle.BUNDLE_FILENAME).write_bytes(b"\x00garbage")
+        config_bundle.clear()
+        self.assertIsNone(config_bundle.load_source("feeds.csv"))
+        with self.assertRaises(ValueError):
+            config_bundle.read_bundle(os.path.join(self.root, config_bundle.BUNDLE_FILENAME))
+
+
+if __name__ == "__main__":
+    unittest.main()
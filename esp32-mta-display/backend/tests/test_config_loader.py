@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from esp32_mta_display.services import config_loader
+
+
+class ConfigLoaderCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.displays_dir = Path(self.tmp_dir.name)
+        config_loader.clear_cache()
+        patcher = patch.object(config_loader, "_displays_dir", return_value=str(self.displays_dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(config_loader.clear_cache)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _write(self, display_id: str, title: str, mtime_ns: int) -> None:
+        path = self.displays_dir / f"{display_id}.yml"
+        path.write_text(f"layout:\n  title: {title}\n", encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_cached_config_is_reused_until_file_changes(self) -> None:
+        self._write("lobby", "First", 1_000_000_000)
+        with patch.object(config_loader, "RELOAD_CHECK_INTERVAL", 0.0):
+            first = config_loader.load_display_config("lobby")
+            with patch("yaml.safe_load") as mock_load:
+                self.assertIs(config_loader.load_display_config("lobby"), first)
+            mock_load.assert_not_called()
+
+            self._write("lobby", "Second", 2_000_000_000)
+            self.assertEqual(config_loader.load_display_config("lobby")["layout"]["title"], "Second")
+
+    def test_unknown_id_is_answered_from_index(self) -> None:
+        self._write("lobby", "First", 1_000_000_000)
+        self.assertEqual(config_loader.list_display_ids(), ["lobby"])
+        with patch("esp32_mta_display.services.config_loader.os.stat") as mock_stat:
+            with self.assertRaises(FileNotFoundError):
+                config_loader.load_display_config("missing")
+        mock_stat.assert_not_called()
+
+    def test_new_and_removed_profiles_are_picked_up(self) -> None:
+        with patch.object(config_loader, "RELOAD_CHECK_INTERVAL", 0.0):
+            with self.assertRaises(FileNotFoundError):
+                config_loader.load_display_config("kiosk")
+            self._write("kiosk", "Kiosk", 1_000_000_000)
+            os.utime(self.displays_dir, ns=(3_000_000_000, 3_000_000_000))
+            self.assertEqual(config_loader.load_display_config("kiosk")["layout"]["title"], "Kiosk")
+
+            (self.displays_dir / "kiosk.yml").unlink()
+            os.utime(self.displays_dir, ns=(4_000_000_000, 4_000_000_000))
+            with self.assertRaises(FileNotFoundError):
+                config_loader.load_display_config("kiosk")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from esp32_mta_display.services import display_plans
+
+MAIN_FEED = "https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs"
+ACE_FEED = "https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs-ace"
+PATH_FEED = "https://path.transitdata.nyc/gtfsrt"
+
+
+class DisplayPlanTests(unittest.TestCase):
+    def setUp(self) -> None:
+        display_plans.clear()
+
+    def test_example_plan_resolves_stations_and_feeds(self) -> None:
+        plan = display_plans.get_plan("example")
+        self.assertEqual(
+            plan.sources,
+            (
+                display_plans.FeedSource("mta", "123N", ("1", "2", "3"), MAIN_FEED),
+                display_plans.FeedSource("path", "33", ("JSQ-33",), PATH_FEED),
+            ),
+        )
+        self.assertIs(display_plans.get_plan("example"), plan)
+        self.assertEqual(display_plans.live_sources(), {MAIN_FEED: plan.sources[0], PATH_FEED: plan.sources[1]})
+        self.assertEqual(display_plans.live_sources(["example", "missing"]), display_plans.live_sources())
+
+    def test_mixed_route_section_gets_one_source_per_feed(self) -> None:
+        plan = display_plans.compile_plan("mixed", {"mta": {"station_id": "A32S", "lines": ["a", "1", "C"]}})
+        self.assertEqual(
+            [(source.feed_url, source.lines) for source in plan.sources],
+            [(ACE_FEED, ("A", "C")), (MAIN_FEED, ("1",))],
+        )
+
+    def test_invalid_configs_are_rejected(self) -> None:
+        invalid = {
+            "unknown_line": {"mta": {"station_id": "123N", "lines": ["XYZ"]}},
+            "bad_color": {"template": {"text_color": "green"}},
+            "bad_output": {"output": {"bits_per_pixel": 1, "compression": "rle"}},
+            "bad_lines": {"path": {"station_id": "33", "lines": "JSQ-33"}},
+            "bad_layout": {"layout": {"width": 0}},
+        }
+        for display_id, config in invalid.items():
+            with self.subTest(display_id=display_id):
+                with self.assertRaises(display_plans.DisplayConfigError):
+                    display_plans.compile_plan(display_id, config)
+
+    def test_compile_all_reports_no_errors_for_bundled_profiles(self) -> None:
+        self.assertEqual(display_plans.compile_all(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
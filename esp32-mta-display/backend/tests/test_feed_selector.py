@@ -1,5 +1,7 @@
 import unittest
 
+from esp32_mta_display.services.feed_lookup import find_feeds_for_routes
+from esp32_mta_display.services.feed_registry import get_registry
 from esp32_mta_display.services.feed_selector import find_mta_feed, find_path_feed
 
 ACE_FEED = "https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs-ace"
@@ -35,5 +37,23 @@ class FeedSelectorTests(unittest.TestCase):
         self.assertEqual(find_path_feed(["HOB-WTC"]), PATH_FEED)
 
 
+class FeedRegistryTests(unittest.TestCase):
+    def test_group_lines_map_directly_to_feeds(self) -> None:
+        registry = get_registry()
+        self.assertEqual(registry.find_feed("MTA", "e"), ACE_FEED)
+        self.assertEqual(registry.find_feed("MTA", "ACE"), ACE_FEED)
+        self.assertIsNone(registry.find_feed("PATH", "A"))
+
+    def test_first_match_follows_csv_order(self) -> None:
+        self.assertEqual(find_mta_feed(["1", "A"]), ACE_FEED)
+
+    def test_mixed_routes_return_every_feed(self) -> None:
+        self.assertEqual(find_feeds_for_routes(["A", "1", "C", "JSQ-33"]), [ACE_FEED, MAIN_FEED, PATH_FEED])
+        self.assertEqual(
+            get_registry().feeds_by_route("MTA", ["A", "1", "C"]),
+            {ACE_FEED: ["A", "C"], MAIN_FEED: ["1"]},
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+# pyright: reportMissingImports=false
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+BACKEND_SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Only imported on first use (rendering, fetching, parsing, YAML loading).
+HEAVY_MODULES = ("PIL", "google.protobuf", "google.transit", "httpx", "yaml")
+# The status CLI never serves HTTP, so it must not pull in the web stack either.
+WEB_MODULES = ("fastapi", "starlette", "pydantic")
+# Cumulative import time allowed for the status CLI path (ms), measured with
+# ``-X importtime``. It is about 55ms today; the limit is loose so slow CI
+# machines pass, yet pulling in fastapi (~280ms) alone would break it.
+STATUS_IMPORT_BUDGET_MS = 250.0
+
+
+def import_profile(statement: str) -> List[Tuple[int, str, int]]:
+    """Run ``statement`` in a fresh interpreter; return (cumulative_us, module, depth) rows."""
+
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_SRC))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative), name.strip(), depth))
+    return rows
+
+
+def heavy_imports(rows: List[Tuple[int, str, int]], heavy_modules: Sequence[str] = HEAVY_MODULES) -> Dict[str, int]:
+    return {
+        name: cumulative
+        for cumulative, name, _ in rows
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in heavy_modules)
+    }
+
+
+class ImportTimeTests(unittest.TestCase):
+    def test_router_and_cli_modules_defer_heavy_dependencies(self) -> None:
+        for module in (
+            "esp32_mta_display.routers.display",
+            "esp32_mta_display.services.status_compiler",
+            "esp32_mta_display.services.batch_render",
+        ):
+            with self.subTest(module=module):
+                self.assertEqual(heavy_imports(import_profile(f"import {module}")), {})
+
+    def test_status_cli_skips_heavy_and_web_dependencies(self) -> None:
+        rows = import_profile(
+            "import esp32_mta_display.services.status_compiler, esp32_mta_display.services.status_renderer"
+        )
+        self.assertIn("esp32_mta_display.services.status_renderer", [name for _, name, _ in rows])
+        self.assertEqual(heavy_imports(rows, HEAVY_MODULES + WEB_MODULES), {})
+
+    def test_status_cli_imports_fit_the_budget(self) -> None:
+        rows = import_profile(
+            "import esp32_mta_display.services.status_compiler, esp32_mta_display.services.status_renderer"
+        )
+        total_ms = sum(cumulative for cumulative, name, depth in rows if depth == 0 and name.startswith("esp32_mta_display"))
+        self.assertLess(total_ms / 1000.0, STATUS_IMPORT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
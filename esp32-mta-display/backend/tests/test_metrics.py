@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.main import app
+from esp32_mta_display.services import feed_cache, render_cache
+from esp32_mta_display.utils import metrics
+
+MAIN_FEED = "https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs"
+
+EMPTY_FEED = gtfs_realtime_pb2.FeedMessage()
+EMPTY_FEED.header.gtfs_realtime_version = "2.0"
+EMPTY_BYTES = EMPTY_FEED.SerializeToString()
+
+
+class MetricPrimitiveTests(unittest.TestCase):
+    def test_histogram_exposition_is_cumulative(self) -> None:
+        histogram = metrics.Histogram("test_latency_seconds", "Test latency.", ("feed",), (0.1, 1.0))
+        self.addCleanup(metrics._REGISTRY.remove, histogram)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, 'a"b')
+
+        text = metrics.render()
+        self.assertIn("# TYPE test_latency_seconds histogram", text)
+        self.assertIn('test_latency_seconds_bucket{feed="a\\"b",le="0.1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{feed="a\\"b",le="1"} 3', text)
+        self.assertIn('test_latency_seconds_bucket{feed="a\\"b",le="+Inf"} 4', text)
+        self.assertIn('test_latency_seconds_count{feed="a\\"b"} 4', text)
+        self.assertIn('test_latency_seconds_sum{feed="a\\"b"} 3.65', text)
+
+    def test_repeat_observations_skip_label_checks_and_allocation(self) -> None:
+        histogram = metrics.Histogram("test_overhead_seconds", "Test overhead.", ("display", "format"), (0.1, 1.0))
+        counter = metrics.Counter("test_overhead", "Test overhead.", ("display",))
+        self.addCleanup(metrics._REGISTRY.remove, histogram)
+        self.addCleanup(metrics._REGISTRY.remove, counter)
+        with patch.object(histogram, "_check", wraps=histogram._check) as histogram_check, patch.object(
+            counter, "_check", wraps=counter._check
+        ) as counter_check:
+            histogram.observe(0.2, "example", "bmp")
+            counter.inc("example")
+            row = histogram._values[("example", "bmp")]
+            for _ in range(100):
+                histogram.observe(0.2, "example", "bmp")
+                counter.inc("example")
+
+        self.assertEqual(histogram_check.call_count, 1)
+        self.assertEqual(counter_check.call_count, 1)
+        self.assertIs(histogram._values[("example", "bmp")], row)
+        self.assertEqual(histogram.count("example", "bmp"), 101)
+        self.assertEqual(counter.value("example"), 101)
+
+class MetricsEndpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+        metrics.reset()
+
+    def test_scrape_reports_request_path_metrics(self) -> None:
+        client = TestClient(app)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            client.get("/display/example.bmp")
+            client.get("/display/example.bmp")
+        response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        text = response.text
+        self.assertIn(f'feed_fetch_seconds_count{{feed="{MAIN_FEED}"}} 1', text)
+        self.assertIn(f'feed_entities_count{{feed="{MAIN_FEED}"}} 1', text)
+        self.assertIn('render_seconds_count{display="example",format="bmp"} 1', text)
+        self.assertIn('response_bytes_count{display="example",format="bmp"} 2', text)
+        self.assertIn('cache_requests_total{cache="render",result="hit"} 1', text)
+        self.assertIn('cache_hit_ratio{cache="render"} 0.5', text)
+        self.assertIn("http_requests_in_flight 1", text)
+        self.assertIn("display_builds_in_flight 0", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import httpx
+from fastapi.testclient import TestClient
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.main import app
+from esp32_mta_display.services import admission, display_plans, feed_cache, push, render_cache, subscriptions
+
+
+def build_feed(route_id: str | None = None, stop_id: str = "", when: datetime | None = None) -> bytes:
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    if route_id is None:
+        return feed.SerializeToString()
+    entity = feed.entity.add(id="0")
+    entity.trip_update.trip.route_id = route_id
+    update = entity.trip_update.stop_time_update.add(stop_id=stop_id)
+    update.arrival.time = int(when.timestamp())
+    return feed.SerializeToString()
+
+
+class SubscriptionMailboxTests(unittest.IsolatedAsyncioTestCase):
+    async def test_slow_client_skips_to_newest_payload(self) -> None:
+        subscription = push.Subscription("example")
+        for payload in (b"1", b"2", b"3"):
+            subscription.offer(payload)
+
+        self.assertEqual(await subscription.get(timeout=0), b"3")
+        self.assertEqual(subscription.dropped, 2)
+        self.assertIsNone(await subscription.get(timeout=0.01))
+
+
+class PushRefreshTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        for module in (display_plans, subscriptions, feed_cache, render_cache, push):
+            module.clear()
+        self.addCleanup(push.clear)
+        self.addCleanup(subscriptions.clear)
+        self.addCleanup(display_plans.clear)
+        self.now = datetime.now(timezone.utc).replace(second=0, microsecond=0) + timedelta(seconds=5)
+
+    async def test_pushes_only_when_visible_rows_change(self) -> None:
+        plan = display_plans.get_plan("example")
+        feed = {"bytes": build_feed()}
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", side_effect=lambda url: feed["bytes"]), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=build_feed()
+        ), patch("esp32_mta_display.services.display_pipeline.utc_now", return_value=self.now):
+            first = await push.open_subscription(plan)
+            second = await push.open_subscription(plan)
+            self.assertEqual(json.loads(await first.get(timeout=0))["rows"], [])
+            await second.get(timeout=0)
+
+            self.assertEqual(await push.refresh_once(now=self.now, max_feed_age=0), [])
+            self.assertIsNone(await first.get(timeout=0.01))
+
+            feed["bytes"] = build_feed("1", "123N", self.now + timedelta(minutes=4))
+            self.assertEqual(await push.refresh_once(now=self.now, max_feed_age=0), ["example"])
+
+        for subscription in (first, second):
+            rows = json.loads(await subscription.get(timeout=0))["rows"]
+            self.assertEqual([(row["line"], row["minutes"]) for row in rows], [("1", 4)])
+
+        push.close_subscription(first)
+        push.close_subscription(second)
+        self.assertEqual(push.streamed_displays(), frozenset())
+
+    def test_events_endpoint_rejects_unknown_display(self) -> None:
+        response = TestClient(app).get("/display/nope/events")
+        self.assertEqual(response.status_code, 404)
+
+    def test_events_endpoint_sheds_without_leaking_a_subscriber(self) -> None:
+        self.addCleanup(admission.configure, admission.MAX_CONCURRENT_RENDERS, admission.MAX_CONCURRENT_FETCHES)
+        admission.configure(max_fetches=0)
+        with patch.object(admission, "FETCH_WAIT_SECONDS", 0.0), patch(
+            "esp32_mta_display.services.mta.fetch_mta_feed", return_value=build_feed()
+        ) as fetch:
+            response = TestClient(app).get("/display/example/events")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["retry-after"], str(admission.RETRY_AFTER_SECONDS))
+        self.assertEqual(response.json()["detail"]["stage"], "fetch")
+        fetch.assert_not_called()
+        self.assertEqual(push.streamed_displays(), frozenset())
+
+
+class LongPollTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        for module in (display_plans, subscriptions, feed_cache, render_cache, push):
+            module.clear()
+        self.addCleanup(push.clear)
+        self.addCleanup(subscriptions.clear)
+        self.addCleanup(display_plans.clear)
+        self.now = datetime.now(timezone.utc).replace(second=0, microsecond=0) + timedelta(seconds=5)
+
+    async def test_waits_for_changed_frame_or_answers_304(self) -> None:
+        feed = {"bytes": build_feed()}
+        transport = httpx.ASGITransport(app=app)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", side_effect=lambda url: feed["bytes"]), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=build_feed()
+        ), patch("esp32_mta_display.services.display_pipeline.utc_now", return_value=self.now):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = await client.get("/display/example.bmp")
+                etag = first.headers["etag"]
+
+                unchanged = await client.get("/display/example.bmp", params={"wait": 0.05, "since": etag})
+                stale = await client.get("/display/example.bmp", params={"wait": 5, "since": '"0000"'})
+
+                waiting = asyncio.create_task(
+                    client.get("/display/example.bmp", params={"wait": 5, "since": etag})
+                )
+                while not push.streamed_displays():
+                    await asyncio.sleep(0.01)
+                feed["bytes"] = build_feed("1", "123N", self.now + timedelta(minutes=4))
+                await push.refresh_once(now=self.now, max_feed_age=0)
+                changed = await asyncio.wait_for(waiting, 2)
+
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.headers["etag"], etag)
+        self.assertEqual(unchanged.content, b"")
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.content, first.content)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+        self.assertTrue(changed.content.startswith(b"BM"))
+        self.assertEqual(push.streamed_displays(), frozenset())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from fastapi.testclient import TestClient
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.main import app
+from esp32_mta_display.services import feed_cache, mta, readiness
+
+FEED_A = "https://feeds.example/a"
+FEED_B = "https://feeds.example/b"
+
+
+def build_feed(timestamp: int) -> bytes:
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    feed.header.timestamp = timestamp
+    return feed.SerializeToString()
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        self.addCleanup(feed_cache.clear)
+
+    def test_circuit_opens_after_repeated_failures_and_probes_once(self) -> None:
+        failing = Mock(side_effect=OSError("connection refused"))
+        for _ in range(feed_cache.CIRCUIT_FAILURE_THRESHOLD):
+            with self.assertRaises(OSError):
+                feed_cache.get_snapshot(FEED_A, failing)
+
+        with self.assertRaises(feed_cache.CircuitOpenError):
+            feed_cache.get_snapshot(FEED_A, failing)
+        self.assertEqual(failing.call_count, feed_cache.CIRCUIT_FAILURE_THRESHOLD)
+        status = feed_cache.feed_status()[FEED_A]
+        self.assertEqual(status.circuit, "open")
+        self.assertEqual(status.error_streak, 3)
+        self.assertEqual(status.last_error, "OSError: connection refused")
+
+        later = time.time() + feed_cache.CIRCUIT_OPEN_SECONDS + 1
+        self.assertEqual(feed_cache.feed_status(later)[FEED_A].circuit, "half_open")
+        with patch("esp32_mta_display.services.feed_cache.time.time", return_value=later):
+            snapshot = feed_cache.get_snapshot(FEED_A, lambda url: build_feed(1700000000))
+        self.assertEqual(snapshot.url, FEED_A)
+        self.assertEqual(feed_cache.feed_status()[FEED_A].circuit, "closed")
+        self.assertEqual(feed_cache.feed_status()[FEED_A].error_streak, 0)
+
+
+class ReadinessTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        self.addCleanup(feed_cache.clear)
+
+    def test_reports_feed_freshness_without_fetching(self) -> None:
+        client = TestClient(app)
+        self.assertEqual(client.get("/health/ready").json(), {"status": "ok", "feeds": {}})
+
+        snapshot = feed_cache.get_snapshot(FEED_A, lambda url: build_feed(1700000000))
+        feed_cache.decoded(snapshot, mta.decode_feed)
+        failing = Mock(side_effect=OSError("timeout"))
+        with self.assertRaises(OSError):
+            feed_cache.get_snapshot(FEED_B, failing)
+
+        response = client.get("/health/ready")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["status"], "degraded")
+        fresh = body["feeds"][FEED_A]
+        self.assertEqual(fresh["header_timestamp"], 1700000000)
+        self.assertEqual(fresh["circuit"], "closed")
+        self.assertFalse(fresh["degraded"])
+        self.assertLess(fresh["age"], readiness.STALE_FEED_SECONDS)
+        self.assertIsNotNone(fresh["last_fetch_seconds"])
+        failed = body["feeds"][FEED_B]
+        self.assertEqual((failed["age"], failed["error_streak"], failed["degraded"]), (None, 1, True))
+
+        idle = time.time() + readiness.STALE_FEED_SECONDS + 1
+        with patch("esp32_mta_display.services.readiness.time.time", return_value=idle):
+            response = client.get("/health/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "degraded")
+        self.assertEqual(
+            (response.json()["feeds"][FEED_A]["stale"], response.json()["feeds"][FEED_A]["degraded"]), (True, False)
+        )
+
+        with self.assertRaises(OSError):
+            feed_cache.get_snapshot(FEED_A, failing, max_age=0)
+        response = client.get("/health/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertEqual(failing.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
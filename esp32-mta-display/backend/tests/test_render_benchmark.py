@@ -0,0 +1,46 @@
+# pyright: reportMissingImports=false
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import run_render_benchmark
+
+
+class RenderBenchmarkTests(unittest.TestCase):
+    def test_matrix_covers_every_output_format(self) -> None:
+        formats = {case.output_format for case in run_render_benchmark.build_cases()}
+        self.assertEqual(formats, set(run_render_benchmark.FORMATS))
+
+    def test_report_is_machine_readable_and_compares_to_baseline(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = Path(tmp_dir) / "bench.json"
+            exit_code = run_render_benchmark.main(
+                ["--iterations", "1", "--filter", "truncation/", "--output", str(output_path)]
+            )
+            self.assertEqual(exit_code, 0)
+            report = json.loads(output_path.read_text(encoding="utf-8"))
+
+        self.assertEqual(len(report["results"]), 2)
+        for entry in report["results"]:
+            self.assertGreater(entry["fps"], 0)
+            self.assertGreater(entry["frame_bytes"], 0)
+            self.assertGreaterEqual(entry["mean_peak_bytes_per_frame"], 0)
+
+        faster = {"results": [{**entry, "fps": entry["fps"] * 2} for entry in report["results"]]}
+        regressions = run_render_benchmark.compare_to_baseline(report, faster, threshold=0.1)
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(run_render_benchmark.compare_to_baseline(report, report, threshold=0.1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
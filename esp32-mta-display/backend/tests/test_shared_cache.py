@@ -0,0 +1,169 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.services import display_pipeline, display_plans, feed_cache, render_cache, shared_cache
+
+FEED = "https://feeds.example/a"
+
+EMPTY_FEED = gtfs_realtime_pb2.FeedMessage()
+EMPTY_FEED.header.gtfs_realtime_version = "2.0"
+EMPTY_BYTES = EMPTY_FEED.SerializeToString()
+
+
+class FakeRedis:
+    """Just enough of redis-py's client for ``RedisStore``."""
+
+    def __init__(self) -> None:
+        self.backing = shared_cache.MemoryStore()
+
+    def get(self, key):
+        return self.backing.get(key)
+
+    def set(self, key, value, px=None, nx=False):
+        if nx:
+            return self.backing.add(key, value, px / 1000)
+        self.backing.set(key, value, px / 1000)
+        return True
+
+    def delete(self, key):
+        self.backing.delete(key)
+
+    def eval(self, script, numkeys, key, value):
+        # Only the compare-and-delete script is ever sent.
+        return int(self.backing.delete_if(key, value))
+
+
+class StoreTests(unittest.TestCase):
+    def check_store(self, store) -> None:
+        store.set("k", b"value", ttl=60)
+        self.assertEqual(bytes(store.get("k")), b"value")
+        self.assertIsNone(store.get("missing"))
+
+        self.assertTrue(store.add("lease", b"a", ttl=60))
+        self.assertFalse(store.add("lease", b"b", ttl=60))
+        store.delete("lease")
+        self.assertTrue(store.add("lease", b"c", ttl=0.01))
+        time.sleep(0.02)
+        self.assertIsNone(store.get("lease"))
+        self.assertTrue(store.add("lease", b"d", ttl=60))
+        self.assertEqual(bytes(store.get("lease")), b"d")
+
+        self.assertFalse(store.delete_if("lease", b"someone else"))
+        self.assertEqual(bytes(store.get("lease")), b"d")
+        self.assertTrue(store.delete_if("lease", b"d"))
+        self.assertIsNone(store.get("lease"))
+
+    def test_memory_store(self) -> None:
+        self.check_store(shared_cache.MemoryStore())
+
+    def test_file_store_maps_values(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = shared_cache.FileStore(tmp)
+            self.check_store(store)
+            self.assertIsInstance(store.get("k"), memoryview)
+            self.assertIsInstance(shared_cache.store_from_url(f"file://{tmp}"), shared_cache.FileStore)
+
+    def test_file_store_removes_expired_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = shared_cache.FileStore(tmp)
+            for bucket in range(60):
+                store.set(f"frame:example:bmp:{bucket}", b"frame", ttl=0.001)
+            store.set("fresh", b"value", ttl=60)
+            abandoned = os.path.join(tmp, "crashed-writer.tmp")
+            open(abandoned, "wb").close()
+            os.utime(abandoned, (0, 0))
+            time.sleep(0.01)
+
+            self.assertIsNone(store.get("frame:example:bmp:0"))
+            self.assertEqual(len(os.listdir(tmp)), 61)
+            with patch.object(shared_cache, "SWEEP_INTERVAL_SECONDS", 0.0):
+                store._next_sweep = 0.0
+                store.set("fresh", b"value", ttl=60)
+
+            self.assertEqual(os.listdir(tmp), [os.path.basename(store._path("fresh"))])
+            self.assertEqual(bytes(store.get("fresh")), b"value")
+
+    def test_file_store_lease_in_progress_is_held(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = shared_cache.FileStore(tmp)
+            path = store._path("lease")
+            with open(path, "wb") as handle:
+                handle.write(b"\x00")  # another worker mid-write
+
+            self.assertFalse(store.add("lease", b"b", ttl=60))
+            with open(path, "rb") as handle:
+                self.assertEqual(handle.read(), b"\x00")
+            self.assertEqual(os.listdir(tmp), [os.path.basename(path)])
+
+    def test_redis_store_uses_nx_and_px(self) -> None:
+        self.check_store(shared_cache.RedisStore(client=FakeRedis()))
+
+
+class CrossWorkerTests(unittest.TestCase):
+    """Clearing the local caches stands in for a second worker process."""
+
+    def setUp(self) -> None:
+        for module in (feed_cache, render_cache, display_plans):
+            module.clear()
+        self.store = shared_cache.MemoryStore()
+        shared_cache.configure(self.store)
+        self.addCleanup(shared_cache.clear)
+        self.addCleanup(feed_cache.clear)
+
+    def test_second_worker_adopts_the_shared_snapshot(self) -> None:
+        first = feed_cache.get_snapshot(FEED, lambda url: b"payload")
+        feed_cache.clear()
+        fetch = Mock(return_value=b"other")
+
+        second = feed_cache.get_snapshot(FEED, fetch)
+
+        fetch.assert_not_called()
+        self.assertEqual((second.payload, second.fetched_at), (b"payload", first.fetched_at))
+        self.assertIsNone(self.store.get(f"lease:{FEED}"))
+
+    def test_worker_without_the_lease_waits_for_the_fetcher(self) -> None:
+        self.assertTrue(self.store.add(f"lease:{FEED}", b"other-worker", ttl=5))
+        publisher = threading.Timer(0.1, shared_cache.publish_snapshot, (FEED, b"fetched elsewhere", time.time()))
+        publisher.start()
+        self.addCleanup(publisher.cancel)
+        fetch = Mock(return_value=b"mine")
+
+        snapshot = feed_cache.get_snapshot(FEED, fetch)
+
+        fetch.assert_not_called()
+        self.assertEqual(snapshot.payload, b"fetched elsewhere")
+
+    def test_release_keeps_a_lease_taken_over_by_another_worker(self) -> None:
+        self.assertTrue(shared_cache.acquire_fetch(FEED))
+        # Our fetch outlived the lease and another worker was elected.
+        self.store.set(f"lease:{FEED}", b"next-worker", ttl=5)
+
+        shared_cache.release_fetch(FEED)
+
+        self.assertEqual(self.store.get(f"lease:{FEED}"), b"next-worker")
+
+    def test_frames_rendered_by_one_worker_are_reused(self) -> None:
+        plan = display_plans.get_plan("example")
+        now = datetime(2025, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            first = bytes(display_pipeline.build_display_frame(plan, now=now))
+            feed_cache.clear()
+            render_cache.clear()
+            with patch("esp32_mta_display.services.renderer.render_display_frame") as render:
+                second = bytes(display_pipeline.build_display_frame(plan, now=now))
+
+        render.assert_not_called()
+        self.assertEqual(second, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
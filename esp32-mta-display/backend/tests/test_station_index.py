@@ -0,0 +1,103 @@
+# pyright: reportMissingImports=false
+
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from esp32_mta_display.services import alias_resolver, station_index, status_compiler
+import run_import_gtfs
+
+GTFS_FILES = {
+    "stops.txt": (
+        "stop_id,stop_name,stop_lat,stop_lon,location_type,parent_station\n"
+        "D18,23 St,40.74,-73.99,1,\n"
+        "D18N,23 St,40.74,-73.99,0,D18\n"
+        "D18S,23 St,40.74,-73.99,0,D18\n"
+        "130,23 St,40.74,-73.99,1,\n"
+        "130N,23 St,40.74,-73.99,0,130\n"
+        "130S,23 St,40.74,-73.99,0,130\n"
+        "A32,W 4 St-Wash Sq,40.73,-74.00,1,\n"
+        "A32N,W 4 St-Wash Sq,40.73,-74.00,0,A32\n"
+    ),
+    "routes.txt": "route_id,route_short_name,route_long_name\nF,F,6 Av Local\n1,1,Broadway Local\nA,A,8 Av Express\n",
+    "trips.txt": "route_id,service_id,trip_id\nF,W,tF\n1,W,t1\nA,W,tA\n",
+    "stop_times.txt": (
+        "trip_id,arrival_time,departure_time,stop_id,stop_sequence\n"
+        "tF,08:00:00,08:00:00,D18N,1\n"
+        "t1,08:00:00,08:00:00,130S,1\n"
+        "tA,08:00:00,08:00:00,A32N,1\n"
+    ),
+}
+
+
+def write_gtfs_zip(path: Path) -> Path:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in GTFS_FILES.items():
+            archive.writestr(name, content)
+    return path
+
+
+class StationIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self._tmp.name)
+        self.index = station_index.build_index(write_gtfs_zip(self.tmp_dir / "gtfs.zip"))
+        station_index.clear()
+        alias_resolver._canonical_label.cache_clear()
+
+    def tearDown(self) -> None:
+        station_index.clear()
+        alias_resolver._canonical_label.cache_clear()
+        self._tmp.cleanup()
+
+    def test_build_index_records_parents_directions_and_routes(self) -> None:
+        platform = self.index.get("D18N")
+        self.assertEqual(platform.parent_station, "D18")
+        self.assertEqual(platform.direction, "N")
+        self.assertEqual(self.index.get("D18").routes, ("F",))
+        self.assertEqual(self.index.get("130").routes, ("1",))
+        self.assertEqual(self.index.route_names["A"], "A")
+
+    def test_resolve_stop_uses_route_to_pick_between_same_named_stations(self) -> None:
+        self.assertIsNone(self.index.resolve_stop("23rd Street"))
+        self.assertEqual(self.index.resolve_stop("23rd Street", route="F"), "D18N")
+        self.assertEqual(self.index.resolve_stop("23 st", route="1", direction="S"), "130S")
+        self.assertEqual(self.index.resolve_stop("w 4th st wash square"), "A32N")
+        self.assertIsNone(self.index.resolve_stop("nowhere"))
+
+    def test_binary_round_trip_and_bad_file_fallback(self) -> None:
+        path = self.tmp_dir / "station_index.bin"
+        station_index.write_index(self.index, path)
+        loaded = station_index.load_index(path)
+        self.assertEqual(loaded, self.index)
+
+        path.write_bytes(b"not an index")
+        with patch("esp32_mta_display.services.station_index._default_index_path", return_value=path):
+            self.assertEqual(len(station_index.get_index()), 0)
+
+    def test_unknown_mta_names_resolve_through_index(self) -> None:
+        with patch("esp32_mta_display.services.station_index.get_index", return_value=self.index):
+            self.assertEqual(status_compiler._resolve_station_id("MTA", "23rd St", "F"), "D18N")
+            self.assertIsNone(status_compiler._resolve_station_id("MTA", "Nowhere", "F"))
+            self.assertEqual(alias_resolver.resolve_station("W 4 St-Wash Sq"), ("MTA", "A32N"))
+            self.assertEqual(alias_resolver.canonical_to_human("MTA", "A32N"), "W 4 St-Wash Sq (MTA)")
+
+    def test_cli_writes_loadable_index(self) -> None:
+        output = self.tmp_dir / "out.bin"
+        exit_code = run_import_gtfs.main([str(self.tmp_dir / "gtfs.zip"), "--output", str(output)])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(len(station_index.load_index(output)), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
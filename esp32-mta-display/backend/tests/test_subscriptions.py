@@ -0,0 +1,51 @@
+import unittest
+from datetime import datetime, timezone
+
+from esp32_mta_display.services import display_plans, feed_cache, render_cache, subscriptions
+
+MAIN_FEED = "https://api-endpoint.mta.info/Dataservice/mtagtfsfeeds/nyct%2Fgtfs"
+PATH_FEED = "https://path.transitdata.nyc/gtfsrt"
+
+
+class SubscriptionIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        for module in (display_plans, subscriptions, feed_cache, render_cache):
+            module.clear()
+        self.addCleanup(subscriptions.clear)
+        self.addCleanup(display_plans.clear)
+
+    def test_plans_populate_reverse_index(self) -> None:
+        display_plans.get_plan("example")
+        self.assertEqual(subscriptions.displays_for_feed(MAIN_FEED), {"example"})
+        self.assertEqual(subscriptions.displays_for_stop(PATH_FEED, "33"), {"example"})
+        self.assertEqual(subscriptions.displays_for_stop(PATH_FEED, "HOB"), frozenset())
+
+        subscriptions.update_display("example", [(PATH_FEED, "HOB")])
+        self.assertEqual(subscriptions.displays_for_feed(MAIN_FEED), frozenset())
+        self.assertEqual(subscriptions.displays_for_stop(PATH_FEED, "HOB"), {"example"})
+
+    def test_changed_snapshot_invalidates_only_dependent_displays(self) -> None:
+        subscriptions.update_display("lobby", [(MAIN_FEED, "123N")])
+        subscriptions.update_display("kiosk", [(PATH_FEED, "33")])
+        bucket = render_cache.minute_bucket(datetime.now(timezone.utc))
+        for display_id in ("lobby", "kiosk"):
+            render_cache.put(display_id, bucket, (), memoryview(b"BM"))
+
+        notified = []
+        subscriptions.add_listener(lambda feed_url, display_ids: notified.append((feed_url, display_ids)))
+
+        feed_cache.get_snapshot(MAIN_FEED, lambda url: b"one")
+        self.assertEqual(notified, [])  # first snapshot is not a change
+        feed_cache.get_snapshot(MAIN_FEED, lambda url: b"one", max_age=-1.0)
+        self.assertEqual(notified, [])  # identical payload is not a change
+        feed_cache.get_snapshot(MAIN_FEED, lambda url: b"two", max_age=-1.0)
+
+        self.assertEqual(notified, [(MAIN_FEED, frozenset({"lobby"}))])
+        self.assertIsNone(render_cache.get("lobby", bucket, ()))
+        self.assertIsNotNone(render_cache.get("kiosk", bucket, ()))
+        # Shedding still has the last good frame to fall back on.
+        self.assertEqual(bytes(render_cache.latest("lobby")), b"BM")
+
+
+if __name__ == "__main__":
+    unittest.main()
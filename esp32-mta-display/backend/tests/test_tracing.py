@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from google.transit import gtfs_realtime_pb2
+
+from esp32_mta_display.main import app
+from esp32_mta_display.services import feed_cache, render_cache
+from esp32_mta_display.utils import tracing
+
+EMPTY_FEED = gtfs_realtime_pb2.FeedMessage()
+EMPTY_FEED.header.gtfs_realtime_version = "2.0"
+EMPTY_BYTES = EMPTY_FEED.SerializeToString()
+
+
+class ServerTimingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        feed_cache.clear()
+        render_cache.clear()
+        self.addCleanup(tracing.configure, None)
+
+    def _get(self, client: TestClient, url: str):
+        with patch("esp32_mta_display.services.mta.fetch_mta_feed", return_value=EMPTY_BYTES), patch(
+            "esp32_mta_display.services.path.fetch_path_feed", return_value=EMPTY_BYTES
+        ):
+            return client.get(url)
+
+    def test_bitmap_reports_each_stage(self) -> None:
+        client = TestClient(app)
+        cold = self._get(client, "/display/example.bmp")
+        warm = self._get(client, "/display/example.bmp")
+
+        stages = [entry.split(";")[0] for entry in cold.headers["server-timing"].split(", ")]
+        self.assertEqual(stages, ["config", "fetch", "parse", "render", "total"])
+        self.assertNotIn("render;", warm.headers["server-timing"])
+        self.assertIn("total;dur=", warm.headers["server-timing"])
+
+    def test_trace_log_gets_one_line_per_request(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.jsonl")
+            tracing.configure(path)
+            client = TestClient(app)
+            self._get(client, "/display/example.bmp")
+            self._get(client, "/display/nope.bmp")
+            tracing.configure(None)  # flush the writer thread
+            with open(path, "rb") as handle:
+                records = [json.loads(line) for line in handle]
+
+        self.assertEqual(
+            [(record["request"], record["status"]) for record in records],
+            [("GET /display/example.bmp", 200), ("GET /display/nope.bmp", 404)],
+        )
+        self.assertIn("render", records[0]["spans_ms"])
+        self.assertGreaterEqual(records[0]["total_ms"], records[0]["spans_ms"]["render"])
+
+    def test_trace_log_is_written_off_the_calling_thread(self) -> None:
+        writers = []
+        emit = logging.FileHandler.emit
+
+        def record_writer(handler, record) -> None:
+            writers.append(threading.get_ident())
+            emit(handler, record)
+
+        with tempfile.TemporaryDirectory() as tmp, patch.object(logging.FileHandler, "emit", record_writer):
+            tracing.configure(os.path.join(tmp, "trace.jsonl"))
+            tracing.write_log(tracing.Trace("GET /display/example.bmp"), 200)
+            tracing.configure(None)
+
+        self.assertEqual(len(writers), 1)
+        self.assertNotEqual(writers[0], threading.get_ident())
+
+    def test_span_outside_a_request_is_a_no_op(self) -> None:
+        with tracing.span("fetch"):
+            pass
+        self.assertIsNone(tracing.current())
+
+
+if __name__ == "__main__":
+    unittest.main()
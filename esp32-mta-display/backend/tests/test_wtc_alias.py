@@ -16,7 +16,8 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from esp32_mta_display.models.arrivals import Arrival
-from esp32_mta_display.services import alias_resolver, status_renderer
+from esp32_mta_display.services import alias_resolver, status_compiler, status_renderer
+from esp32_mta_display.utils.trigram import TrigramIndex
 import run_from_txt
 
 
@@ -30,6 +31,20 @@ class WTCAliasTests(unittest.TestCase):
         self.assertEqual(mta_type, "MTA")
         self.assertEqual(mta_station, "137S")
 
+    def test_alias_lookup_ignores_case_spacing_and_separators(self) -> None:
+        expected = alias_resolver.resolve_station_with_type("wtc", "PATH")
+        for variant in ("WTC", " w-t-c ", "W_T C"):
+            self.assertEqual(alias_resolver.resolve_station_with_type(variant, "PATH"), expected)
+        with self.assertRaises(ValueError):
+            alias_resolver.resolve_station_with_type("not a station", "PATH")
+
+    def test_canonical_to_human_is_memoized(self) -> None:
+        first = alias_resolver.canonical_to_human("PATH", "WTC")
+        self.assertEqual(first, "World Trade Center (PATH)")
+        hits = alias_resolver._canonical_label.cache_info().hits
+        self.assertEqual(alias_resolver.canonical_to_human("PATH", "WTC"), first)
+        self.assertEqual(alias_resolver._canonical_label.cache_info().hits, hits + 1)
+
     def test_run_from_txt_outputs_human_labels_for_wtc(self) -> None:
         with tempfile.TemporaryDirectory() as tmp_dir:
             input_path = Path(tmp_dir) / "stations.txt"
@@ -93,5 +108,33 @@ wtc, 1
             self.assertIn("World Trade Center (MTA)", formatted[1])
 
 
+class FuzzyStationSearchTests(unittest.TestCase):
+    def test_typo_resolves_to_the_closest_station_for_each_agency(self) -> None:
+        self.assertEqual(alias_resolver.resolve_station_with_type("worltrtrade center", "PATH"), ("PATH", "WTC"))
+        self.assertEqual(alias_resolver.resolve_station_with_type("worltrtrade center", "MTA"), ("MTA", "137S"))
+        self.assertEqual(alias_resolver.resolve_station("hobokn"), ("PATH", "HOB"))
+        self.assertEqual(status_compiler._resolve_alias_station("worltrtrade center", "PATH"), ("PATH", "WTC"))
+
+    def test_unresolvable_alias_suggests_candidates(self) -> None:
+        matches = alias_resolver.search_stations("rectr st")
+        self.assertEqual((matches[0].type_code, matches[0].station_id), ("MTA", "130S"))
+        self.assertEqual(len({(match.type_code, match.station_id) for match in matches}), len(matches))
+        with self.assertRaisesRegex(ValueError, "did you mean Grove"):
+            alias_resolver.resolve_station("grovee wtc")
+        with self.assertRaisesRegex(ValueError, r"Unknown station alias: xyz$"):
+            alias_resolver.resolve_station("xyz")
+
+    def test_trigram_search_finds_misspellings_in_a_large_corpus(self) -> None:
+        words = (
+            "atlantic bedford canal delancey essex fulton grand houston jay kingston lafayette myrtle "
+            "nostrand ocean prospect queens rector spring tremont union vernon wall york bowery chambers "
+            "cortlandt dekalb euclid flushing gates hewes junction knickerbocker lorimer marcy nassau "
+            "parsons rockaway sutter utica woodhaven"
+        ).split()
+        index = TrigramIndex((first + second, first) for first in words for second in words if first != second)
+        self.assertGreater(len(index), 1500)
+        self.assertEqual(index.search("canalfultn", limit=1)[0][1], "canalfulton")
+
+
 if __name__ == "__main__":
     unittest.main()
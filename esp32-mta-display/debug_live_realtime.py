@@ -13,7 +13,7 @@ BACKEND_SRC = ROOT / "backend" / "src"
 if str(BACKEND_SRC) not in sys.path:
     sys.path.insert(0, str(BACKEND_SRC))
 
-from esp32_mta_display.services import alias_resolver, realtime, status_renderer  # type: ignore
+from esp32_mta_display.services import agencies, alias_resolver, realtime, status_renderer  # type: ignore
 from esp32_mta_display.utils import time as time_utils  # type: ignore
 
 ALIAS_REQUESTS = [
@@ -81,7 +81,7 @@ def _build_live_requests() -> list[dict]:
         if not lines:
             continue
         alias = entry.get("station") or ""
-        preferred_type = _infer_type_from_lines(lines)
+        preferred_type = agencies.infer_agency(lines)
         try:
             resolved_type, resolved_station = alias_resolver.resolve_station_with_type(alias, preferred_type)
         except ValueError as exc:
@@ -98,13 +98,5 @@ def _build_live_requests() -> list[dict]:
     return built
 
 
-def _infer_type_from_lines(lines: list[str]) -> str | None:
-    for line in lines:
-        token = line.upper()
-        if "-" in token or token in {"JSQ-33", "HOB-33", "HOB-WTC", "NWK-WTC", "JSQ-HOB"}:
-            return "PATH"
-    return "MTA"
-
-
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -8,8 +8,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import List
 
-import yaml
-
 ROOT = Path(__file__).resolve().parent
 BACKEND_SRC = ROOT / "backend" / "src"
 if str(BACKEND_SRC) not in sys.path:
@@ -19,6 +17,8 @@ from esp32_mta_display.services import realtime  # type: ignore[import]
 
 
 def load_config(path: Path) -> List[dict]:
+    import yaml
+
     with path.open("r", encoding="utf-8") as handle:
         data = yaml.safe_load(handle) or {}
     stations = data.get("stations") or []
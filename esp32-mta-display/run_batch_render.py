@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""CLI that renders many display profiles in parallel and reports throughput."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Sequence
+
+ROOT = Path(__file__).resolve().parent
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+from esp32_mta_display.services import batch_render  # type: ignore[import]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Render display profiles across a process pool")
+    parser.add_argument(
+        "displays",
+        nargs="*",
+        help="Display ids to render (defaults to every profile in config/displays/)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument("--output-dir", type=str, help="Optional directory to write <display_id>.bmp frames into")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    output_dir = Path(args.output_dir).expanduser().resolve() if args.output_dir else None
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    results = batch_render.render_displays(args.displays or None, workers=args.workers)
+    total_elapsed = time.perf_counter() - started
+
+    rendered = 0
+    total_bytes = 0
+    for result in results:
+        if result.frame is None:
+            print(f"- {result.display_id}: ERROR {result.error}")
+            continue
+        rendered += 1
+        total_bytes += len(result.frame)
+        print(f"- {result.display_id}: {len(result.frame)} bytes in {result.elapsed * 1000:.1f} ms")
+        if output_dir is not None:
+            (output_dir / f"{result.display_id}.bmp").write_bytes(result.frame)
+
+    rate = rendered / total_elapsed if total_elapsed > 0 else 0.0
+    print(f"\nRendered {rendered}/{len(results)} displays ({total_bytes} bytes) in {total_elapsed:.2f} s ({rate:.1f} frames/s)")
+    return 0 if rendered == len(results) else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""CLI that precompiles the backend config files into a single binary bundle."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Sequence
+
+ROOT = Path(__file__).resolve().parent
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+from esp32_mta_display.services import config_bundle  # type: ignore[import]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compile feeds.csv, aliases.yml and config/displays/*.yml into one bundle"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help=f"Where to write the bundle (default: backend config/{config_bundle.BUNDLE_FILENAME})",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    started = time.perf_counter()
+    try:
+        entries = config_bundle.build_bundle()
+    except Exception as exc:  # pragma: no cover - config safety
+        print(f"Failed to compile config bundle: {exc}", file=sys.stderr)
+        return 1
+    output = str(Path(args.output).expanduser().resolve()) if args.output else None
+    output_path = config_bundle.write_bundle(entries, output)
+    elapsed = time.perf_counter() - started
+
+    for relname in entries:
+        print(f"- {relname}")
+    print(f"Wrote {len(entries)} files to {output_path} ({os.path.getsize(output_path)} bytes) in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
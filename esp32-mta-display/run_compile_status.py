@@ -8,8 +8,6 @@ import sys
 from pathlib import Path
 from typing import List
 
-import yaml
-
 ROOT = Path(__file__).resolve().parent
 BACKEND_SRC = ROOT / "backend" / "src"
 if str(BACKEND_SRC) not in sys.path:
@@ -45,6 +43,8 @@ SAMPLE_STATUSES = [
 
 
 def load_requests(config_path: Path) -> List[dict]:
+    import yaml
+
     with config_path.open("r", encoding="utf-8") as handle:
         data = yaml.safe_load(handle) or {}
 
@@ -126,10 +126,6 @@ def main() -> int:
     return 0
 
 
-if __name__ == "__main__":
-    raise SystemExit(main())
-
-
 def _inject_alias_metadata(requests: List[dict]) -> List[dict]:
     enriched: List[dict] = []
     for entry in requests:
@@ -148,3 +144,7 @@ def _inject_alias_metadata(requests: List[dict]) -> List[dict]:
                 normalized.setdefault("station_id", resolved_station)
         enriched.append(normalized)
     return enriched
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,7 +13,7 @@ BACKEND_SRC = ROOT / "backend" / "src"
 if str(BACKEND_SRC) not in sys.path:
     sys.path.insert(0, str(BACKEND_SRC))
 
-from esp32_mta_display.services import alias_resolver, realtime, status_renderer  # type: ignore[import]
+from esp32_mta_display.services import agencies, alias_resolver, realtime, status_renderer  # type: ignore[import]
 from esp32_mta_display.utils import time as time_utils  # type: ignore[import]
 
 DEFAULT_OUTPUT = ROOT / "output" / "realtime_status.txt"
@@ -36,7 +36,7 @@ def parse_input_file(path: Path) -> List[dict]:
                 raise ValueError(f"Line {idx}: missing line identifier")
 
             normalized_line = line_token.strip().upper()
-            preferred_type = _infer_type_from_line(normalized_line)
+            preferred_type = agencies.infer_agency([normalized_line])
             try:
                 system, station_id = alias_resolver.resolve_station_with_type(alias, preferred_type)
             except ValueError as exc:
@@ -139,13 +139,6 @@ def main(argv: Sequence[str] | None = None) -> int:
     return 0
 
 
-def _infer_type_from_line(line_token: str) -> str | None:
-    token = line_token.upper()
-    if "-" in token or token in {"JSQ-33", "HOB-33", "HOB-WTC", "NWK-WTC", "JSQ-HOB"}:
-        return "PATH"
-    return "MTA"
-
-
 def _find_matching_arrival(arrivals: Iterable, match_line: str):
     for arrival in arrivals:
         if arrival.line.upper() != match_line.upper():
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""CLI that compiles a static GTFS zip into the backend's station index."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Sequence
+
+ROOT = Path(__file__).resolve().parent
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+from esp32_mta_display.services import station_index  # type: ignore[import]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the station index from a local static GTFS zip")
+    parser.add_argument("zip", type=str, help="Path to the GTFS zip (e.g. the MTA subway google_transit.zip)")
+    parser.add_argument(
+        "--output",
+        type=str,
+        help=f"Where to write the index (default: backend config/{station_index.INDEX_FILENAME})",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    zip_path = Path(args.zip).expanduser().resolve()
+    if not zip_path.exists():
+        print(f"Missing GTFS zip: {zip_path}", file=sys.stderr)
+        return 1
+    output_path = Path(args.output).expanduser().resolve() if args.output else station_index._default_index_path()
+
+    started = time.perf_counter()
+    try:
+        index = station_index.build_index(zip_path)
+    except (ValueError, KeyError) as exc:
+        print(f"Failed to import {zip_path}: {exc}", file=sys.stderr)
+        return 1
+    station_index.write_index(index, output_path)
+    elapsed = time.perf_counter() - started
+
+    stations = sum(len(ids) for ids in index.names.values())
+    print(f"Indexed {len(index)} stops ({stations} stations, {len(index.route_names)} routes) in {elapsed:.2f}s")
+    print(f"Wrote {output_path} ({output_path.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,8 +10,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, List
 
-import yaml
-
 ROOT = Path(__file__).resolve().parent
 BACKEND_SRC = ROOT / "backend" / "src"
 if str(BACKEND_SRC) not in sys.path:
@@ -21,6 +19,8 @@ from esp32_mta_display.services import realtime  # type: ignore[import]
 
 
 def load_stations(config_path: Path) -> List[dict]:
+    import yaml
+
     with config_path.open("r", encoding="utf-8") as handle:
         data = yaml.safe_load(handle) or {}
     stations = data.get("stations") or []
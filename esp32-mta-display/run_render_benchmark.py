@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Offline micro-benchmarks for the BMP render pipeline.
+
+Renders synthetic arrivals through ``renderer.render_display_frame`` across
+layout sizes, row counts, truncation-heavy destinations and every output
+format, then reports frames per second and memory allocated per frame as
+JSON. Pass ``--baseline`` with an earlier result file to flag regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parent
+BACKEND_SRC = ROOT / "backend" / "src"
+if str(BACKEND_SRC) not in sys.path:
+    sys.path.insert(0, str(BACKEND_SRC))
+
+import PIL  # noqa: E402
+
+from esp32_mta_display import __version__  # type: ignore[import]  # noqa: E402
+from esp32_mta_display.models.arrivals import Arrival  # type: ignore[import]  # noqa: E402
+from esp32_mta_display.services import renderer  # type: ignore[import]  # noqa: E402
+
+BENCH_NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+FORMATS: Dict[str, dict] = {
+    "bmp24": {"bits_per_pixel": 24},
+    "bmp8": {"bits_per_pixel": 8},
+    "bmp8-rle": {"bits_per_pixel": 8, "compression": "rle"},
+    "bmp4": {"bits_per_pixel": 4},
+    "bmp4-rle": {"bits_per_pixel": 4, "compression": "rle"},
+    "bmp1": {"bits_per_pixel": 1},
+}
+
+LAYOUTS = {
+    "240x320": (240, 320),
+    "320x480": (320, 480),
+    "480x800": (480, 800),
+}
+
+SHORT_DESTINATIONS = ["Uptown", "Brooklyn", "JSQ", "WTC", "Queens", "Bronx"]
+LONG_DESTINATIONS = [
+    "Van Cortlandt Park - 242 St via Broadway Local",
+    "Far Rockaway - Mott Av via Fulton St Express",
+    "Newark Penn Station via Journal Square and Harrison",
+    "Coney Island - Stillwell Av via Culver Line Local",
+]
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    name: str
+    layout: str
+    rows: int
+    destinations: str
+    output_format: str
+
+
+@dataclass
+class BenchResult:
+    name: str
+    layout: str
+    rows: int
+    destinations: str
+    output_format: str
+    iterations: int
+    fps: float
+    mean_ms: float
+    p95_ms: float
+    frame_bytes: int
+    mean_peak_bytes_per_frame: int
+    peak_alloc_bytes: int
+
+
+def build_cases() -> List[BenchCase]:
+    """Return the benchmark matrix; every case uses synthetic data only."""
+
+    cases: List[BenchCase] = []
+    for output_format in FORMATS:
+        for layout in LAYOUTS:
+            cases.append(BenchCase(f"format/{output_format}/{layout}", layout, 6, "short", output_format))
+    for rows in (0, 1, 3, 6, 12):
+        cases.append(BenchCase(f"rows/{rows}", "240x320", rows, "short", "bmp24"))
+    for output_format in ("bmp24", "bmp4-rle"):
+        cases.append(BenchCase(f"truncation/{output_format}", "240x320", 6, "long", output_format))
+    return cases
+
+
+def synthetic_arrivals(rows: int, destinations: str) -> List[Arrival]:
+    names = LONG_DESTINATIONS if destinations == "long" else SHORT_DESTINATIONS
+    lines = ["1", "2", "3", "A", "JSQ-33", "NWK-WTC"]
+    return [
+        Arrival(
+            line=lines[index % len(lines)],
+            destination=names[index % len(names)],
+            arrival_time=BENCH_NOW + timedelta(minutes=2 + 3 * index),
+        )
+        for index in range(rows)
+    ]
+
+
+def case_config(case: BenchCase) -> dict:
+    width, height = LAYOUTS[case.layout]
+    return {
+        "layout": {"width": width, "height": height, "title": "Benchmark Station"},
+        "template": {"background": "#000000", "text_color": "#00FF00", "max_rows": max(case.rows, 1)},
+        "output": FORMATS[case.output_format],
+    }
+
+
+def run_case(case: BenchCase, iterations: int, warmup: int = 2) -> BenchResult:
+    config = case_config(case)
+    arrivals = synthetic_arrivals(case.rows, case.destinations)
+
+    def render() -> memoryview:
+        return renderer.render_display_frame("bench", config, arrivals=arrivals, now=BENCH_NOW)
+
+    for _ in range(warmup):
+        render()
+
+    timings: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        frame = render()
+        timings.append(time.perf_counter() - started)
+
+    # Allocation tracking slows rendering down, so it runs separately. Each
+    # frame records the traced-memory high-water mark above the starting
+    # level: the most memory live at once, not the total bytes allocated.
+    alloc_iterations = max(1, min(iterations, 5))
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        peaks = 0
+        max_peak = 0
+        for _ in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            render()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks += peak - before
+            max_peak = max(max_peak, peak - before)
+    finally:
+        tracemalloc.stop()
+
+    total = sum(timings)
+    ordered = sorted(timings)
+    return BenchResult(
+        name=case.name,
+        layout=case.layout,
+        rows=case.rows,
+        destinations=case.destinations,
+        output_format=case.output_format,
+        iterations=iterations,
+        fps=round(iterations / total, 2) if total > 0 else 0.0,
+        mean_ms=round(statistics.fmean(timings) * 1000, 3),
+        p95_ms=round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        frame_bytes=len(frame),
+        mean_peak_bytes_per_frame=peaks // alloc_iterations,
+        peak_alloc_bytes=max_peak,
+    )
+
+
+def run_benchmarks(iterations: int = 50, name_filter: str | None = None) -> dict:
+    cases = [case for case in build_cases() if not name_filter or name_filter in case.name]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "package_version": __version__,
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "results": [asdict(run_case(case, iterations)) for case in cases],
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """Return descriptions of cases whose fps dropped more than ``threshold``."""
+
+    previous = {entry["name"]: entry for entry in baseline.get("results", [])}
+    regressions: List[str] = []
+    for entry in report["results"]:
+        old = previous.get(entry["name"])
+        if not old or not old.get("fps"):
+            continue
+        change = (entry["fps"] - old["fps"]) / old["fps"]
+        if change < -threshold:
+            regressions.append(f"{entry['name']}: {old['fps']:.1f} -> {entry['fps']:.1f} fps ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the BMP render pipeline with synthetic arrivals")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed renders per case")
+    parser.add_argument("--filter", dest="name_filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare frames per second against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Fractional fps drop that counts as a regression (default 0.10)",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    report = run_benchmarks(iterations=max(args.iterations, 1), name_filter=args.name_filter)
+    contents = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).expanduser().resolve().write_text(contents + "\n", encoding="utf-8")
+    else:
+        print(contents)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).expanduser().read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 3
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())